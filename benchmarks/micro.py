@@ -0,0 +1,408 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ICON Foundation Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Microbenchmarks of icondbtools hot functions with synthetic fixtures
+
+Each benchmark reports operations per second (the best of --repeat rounds)
+and the peak bytes allocated by tracemalloc during one operation.
+Benchmarks which need a package that is not installed (iconservice) are skipped.
+
+usage: python benchmarks/micro.py [--save baseline.json] [--compare baseline.json] [--threshold 0.2] [name ...]
+       exit code is 1 if a benchmark regresses by more than the threshold against the baseline
+"""
+
+import argparse
+import gc
+import hashlib
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TX_COUNT = 100
+BLOCK_COUNT = 200
+STATE_ROWS = 10000
+EVENT_LOG_COUNT = 10
+# peak bytes may differ slightly between runs because of free lists
+PEAK_BYTES_SLACK = 512
+
+
+def create_transaction(height: int, index: int) -> dict:
+    """Transaction v3 calling transfer() of an IRC2 token like most transactions on mainnet
+
+    """
+    return {
+        'version': '0x3',
+        'from': f'hx{index:040x}',
+        'to': f'cx{height:040x}',
+        'value': '0x0',
+        'stepLimit': '0x30d40',
+        'timestamp': hex(1_550_000_000_000_000 + height * 2_000_000 + index),
+        'nid': '0x1',
+        'nonce': hex(index),
+        'signature': 'A' * 86 + '==',
+        'txHash': hashlib.sha3_256(f'{height}:{index}'.encode()).hexdigest(),
+        'dataType': 'call',
+        'data': {
+            'method': 'transfer',
+            'params': {'_to': f'hx{height + index:040x}', '_value': hex(10 ** 18 * index)}}}
+
+
+def create_block(height: int, tx_count: int = TX_COUNT) -> dict:
+    """Block in loopchain 0.3 schema
+
+    """
+    return {
+        'version': '0.3',
+        'prevHash': '0x' + hashlib.sha3_256(str(height - 1).encode()).hexdigest(),
+        'transactionsHash': '0x' + hashlib.sha3_256(f'tx{height}'.encode()).hexdigest(),
+        'stateHash': '0x' + '00' * 32,
+        'receiptsHash': '0x' + '00' * 32,
+        'repsHash': '0x' + '00' * 32,
+        'leaderVotesHash': '0x' + '00' * 32,
+        'prevVotesHash': '0x' + '00' * 32,
+        'logsBloom': '0x' + '00' * 256,
+        'timestamp': hex(1_550_000_000_000_000 + height * 2_000_000),
+        'transactions': [create_transaction(height, i) for i in range(tx_count)],
+        'leaderVotes': [],
+        'prevVotes': [],
+        'hash': '0x' + hashlib.sha3_256(str(height).encode()).hexdigest(),
+        'height': hex(height),
+        'leader': 'hx' + '11' * 20,
+        'signature': 'B' * 86 + '==',
+        'nextLeader': 'hx' + '22' * 20}
+
+
+class Fixtures(object):
+    """Temporary leveldbs shared by benchmarks
+
+    """
+
+    def __init__(self):
+        self._temp_dir: Optional[str] = None
+
+    def __enter__(self):
+        self._temp_dir = tempfile.mkdtemp(prefix='icondbtools-micro-')
+        return self
+
+    def __exit__(self, *args):
+        shutil.rmtree(self._temp_dir, ignore_errors=True)
+
+    def create_block_db(self) -> str:
+        import plyvel
+        from icondbtools.block_database_reader import BlockDatabaseReader
+
+        path: str = os.path.join(self._temp_dir, 'block_db')
+        if os.path.isdir(path):
+            return path
+
+        db = plyvel.DB(path, create_if_missing=True)
+        for height in range(BLOCK_COUNT):
+            block: dict = create_block(height)
+            key: bytes = block['hash'][2:].encode()
+            db.put(key, json.dumps(block).encode())
+            db.put(BlockDatabaseReader.create_block_height_key(height), key)
+        db.close()
+
+        return path
+
+    def create_empty_db(self, name: str) -> str:
+        import plyvel
+
+        path: str = os.path.join(self._temp_dir, name)
+        plyvel.DB(path, create_if_missing=True).close()
+        return path
+
+
+def setup_loopchain_block_from_dict(_fixtures: 'Fixtures') -> tuple:
+    from icondbtools.loopchain_block import LoopchainBlock
+
+    block: dict = create_block(1000)
+    return (lambda: LoopchainBlock.from_dict(block)), TX_COUNT
+
+
+def setup_loopchain_block_from_bytes(_fixtures: 'Fixtures') -> tuple:
+    from icondbtools.loopchain_block import LoopchainBlock
+
+    value: bytes = json.dumps(create_block(1000)).encode()
+    return (lambda: LoopchainBlock.from_bytes(value)), TX_COUNT
+
+
+def setup_create_transaction_requests(_fixtures: 'Fixtures') -> tuple:
+    from icondbtools import utils
+    from icondbtools.loopchain_block import LoopchainBlock
+
+    loopchain_block = LoopchainBlock.from_dict(create_block(1000))
+    return (lambda: utils.create_transaction_requests(loopchain_block)), TX_COUNT
+
+
+def setup_convert_transaction_to_request(_fixtures: 'Fixtures') -> tuple:
+    from icondbtools import utils
+    from icondbtools.loopchain_block import LoopchainBlock
+
+    loopchain_block = LoopchainBlock.from_dict(create_block(1000, tx_count=1))
+    tx: dict = loopchain_block.transactions[0]
+    return (lambda: utils.convert_transaction_to_request(loopchain_block, tx)), 1
+
+
+def setup_check_event_logs(_fixtures: 'Fixtures') -> tuple:
+    from iconservice.base.address import Address
+    from icondbtools.icon_service_syncer import IconServiceSyncer
+
+    score_address = Address.from_string('cx' + '33' * 20)
+
+    class EventLog(object):
+        """Event log of a transaction result which returns a new dict like iconservice does
+
+        """
+
+        def __init__(self, index: int):
+            self._index: int = index
+
+        def to_dict(self) -> dict:
+            return {
+                'score_address': score_address,
+                'indexed': [
+                    'Transfer(Address,Address,int,bytes)',
+                    Address.from_string(f'hx{self._index:040x}'),
+                    Address.from_string(f'hx{self._index + 1:040x}'),
+                    10 ** 18 * self._index],
+                'data': [b'transfer data']}
+
+    event_logs = [EventLog(i) for i in range(EVENT_LOG_COUNT)]
+    event_logs_in_db = []
+    for event_log in event_logs:
+        value: dict = event_log.to_dict()
+        event_logs_in_db.append({
+            'scoreAddress': str(value.pop('score_address')),
+            'indexed': [value['indexed'][0]] + [str(address) for address in value['indexed'][1:3]] +
+                       [hex(value['indexed'][3])],
+            'data': ['0x' + value['data'][0].hex()]})
+
+    def check():
+        if not IconServiceSyncer._check_event_logs(event_logs_in_db, event_logs):
+            raise AssertionError('event logs differ')
+
+    return check, EVENT_LOG_COUNT
+
+
+def setup_create_state_hash(_fixtures: 'Fixtures') -> tuple:
+    from icondbtools.state_database_reader import StateDatabaseReader
+
+    # SCORE DictDB entries: score address|0x01|name|key -> value
+    rows = [
+        (b'\x01' + b'\x33' * 20 + b'|\x01|balances|' + i.to_bytes(20, 'big'), (10 ** 18 * i).to_bytes(16, 'big'))
+        for i in range(STATE_ROWS)]
+    return (lambda: StateDatabaseReader._create_state_hash(rows)), STATE_ROWS
+
+
+def setup_get_block_by_block_height(fixtures: 'Fixtures') -> tuple:
+    from icondbtools.block_database_reader import BlockDatabaseReader
+
+    reader = BlockDatabaseReader()
+    reader.open(fixtures.create_block_db())
+    heights = iter(range(10 ** 12))
+
+    def get():
+        return reader.get_block_by_block_height(next(heights) % BLOCK_COUNT)
+
+    return get, 1, reader.close
+
+
+def setup_score_db_keys(fixtures: 'Fixtures') -> tuple:
+    from iconservice.base.address import Address
+    from icondbtools.score_database_manager import ScoreDatabaseManager
+
+    manager = ScoreDatabaseManager()
+    manager.open(fixtures.create_empty_db('score_db'), Address.from_string('cx' + '33' * 20))
+    addresses = [Address.from_string(f'hx{i:040x}') for i in range(1000)]
+
+    def create_keys():
+        for address in addresses:
+            manager._create_dict_db_key('balances', address)
+
+    return create_keys, len(addresses), manager.close
+
+
+BENCHMARKS = {
+    'loopchain_block_from_dict': setup_loopchain_block_from_dict,
+    'loopchain_block_from_bytes': setup_loopchain_block_from_bytes,
+    'create_transaction_requests': setup_create_transaction_requests,
+    'convert_transaction_to_request': setup_convert_transaction_to_request,
+    'check_event_logs': setup_check_event_logs,
+    'create_state_hash': setup_create_state_hash,
+    'get_block_by_block_height': setup_get_block_by_block_height,
+    'score_db_keys': setup_score_db_keys,
+}
+
+
+def measure_time(func: Callable, min_time: float, repeat: int) -> float:
+    """Return the best seconds per call
+
+    The number of calls per round is increased until a round takes min_time
+    """
+    number: int = 1
+    while True:
+        elapsed: float = _time_calls(func, number)
+        if elapsed >= min_time:
+            break
+        number *= 2 if elapsed <= 0 else max(2, min(10, int(min_time / elapsed) + 1))
+
+    best: float = elapsed
+    for _ in range(repeat - 1):
+        best = min(best, _time_calls(func, number))
+
+    return best / number
+
+
+def _time_calls(func: Callable, number: int) -> float:
+    gc_enabled: bool = gc.isenabled()
+    gc.disable()
+    try:
+        start: float = time.perf_counter()
+        for _ in range(number):
+            func()
+        return time.perf_counter() - start
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def measure_peak_bytes(func: Callable, calls: int = 5) -> int:
+    """Return the largest peak of memory which one call allocates
+
+    Tracing restarts on every call, so only the memory allocated by the call is counted
+    """
+    func()
+    peak_bytes: int = 0
+
+    for _ in range(calls):
+        tracemalloc.start()
+        try:
+            func()
+            peak_bytes = max(peak_bytes, tracemalloc.get_traced_memory()[1])
+        finally:
+            tracemalloc.stop()
+
+    return peak_bytes
+
+
+def run_benchmark(name: str, fixtures: 'Fixtures', min_time: float, repeat: int) -> dict:
+    try:
+        setup_result: tuple = BENCHMARKS[name](fixtures)
+    except ImportError as e:
+        return {'skipped': str(e)}
+
+    func, items = setup_result[:2]
+    try:
+        seconds: float = measure_time(func, min_time, repeat)
+        peak_bytes: int = measure_peak_bytes(func)
+    finally:
+        if len(setup_result) > 2:
+            setup_result[2]()
+
+    return {
+        'ops_per_sec': 1 / seconds,
+        'items_per_op': items,
+        'us_per_item': seconds * 1_000_000 / items,
+        'peak_bytes': peak_bytes}
+
+
+def find_regressions(results: dict, baseline: dict, threshold: float) -> list:
+    """Compare results with a baseline saved by --save
+
+    :param results: name -> result
+    :param baseline: name -> result
+    :param threshold: allowed ratio of regression. 0.2: 20% slower or 20% more peak bytes
+    :return: list of messages
+    """
+    regressions = []
+
+    for name, result in results.items():
+        base: Optional[dict] = baseline.get(name)
+        if base is None or 'skipped' in result or 'skipped' in base:
+            continue
+
+        if result['ops_per_sec'] < base['ops_per_sec'] * (1 - threshold):
+            regressions.append(
+                f'{name}: ops_per_sec {base["ops_per_sec"]:.1f} -> {result["ops_per_sec"]:.1f} '
+                f'({result["ops_per_sec"] / base["ops_per_sec"] - 1:+.1%})')
+
+        if result['peak_bytes'] > base['peak_bytes'] * (1 + threshold) + PEAK_BYTES_SLACK:
+            regressions.append(f'{name}: peak_bytes {base["peak_bytes"]} -> {result["peak_bytes"]}')
+
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='icondbtools microbenchmarks')
+    parser.add_argument('--min-time', type=float, default=0.2, help='minimum seconds of a round')
+    parser.add_argument('--repeat', type=int, default=5, help='rounds per benchmark. The best round is used')
+    parser.add_argument('--save', type=str, default=None, help='write results to a json baseline file')
+    parser.add_argument('--compare', type=str, default=None, help='json baseline file to compare with')
+    parser.add_argument('--threshold', type=float, default=0.2, help='allowed ratio of regression')
+    parser.add_argument('names', nargs='*', default=list(BENCHMARKS), help=', '.join(BENCHMARKS))
+    args = parser.parse_args()
+
+    for name in args.names:
+        if name not in BENCHMARKS:
+            parser.error(f'unknown benchmark: {name}')
+
+    baseline: dict = {}
+    if args.compare is not None:
+        with open(args.compare, 'rt') as f:
+            baseline = json.load(f)['benchmarks']
+
+    print(f'{"benchmark":<32} {"ops/s":>12} {"us/item":>10} {"peak bytes":>12} {"baseline":>9}')
+
+    results = {}
+    with Fixtures() as fixtures:
+        for name in args.names:
+            result: dict = run_benchmark(name, fixtures, args.min_time, args.repeat)
+            results[name] = result
+
+            if 'skipped' in result:
+                print(f'{name:<32} skipped: {result["skipped"]}')
+                continue
+
+            base: Optional[dict] = baseline.get(name)
+            change: str = '' if base is None or 'skipped' in base \
+                else f'{result["ops_per_sec"] / base["ops_per_sec"] - 1:+.1%}'
+            print(f'{name:<32} {result["ops_per_sec"]:>12.1f} {result["us_per_item"]:>10.3f} '
+                  f'{result["peak_bytes"]:>12} {change:>9}')
+
+    if args.save is not None:
+        with open(args.save, 'wt') as f:
+            json.dump({
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'benchmarks': results}, f, indent=2)
+
+    regressions: list = find_regressions(results, baseline, args.threshold)
+    for message in regressions:
+        print(f'regression: {message}')
+
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
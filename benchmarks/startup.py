@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ICON Foundation Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Measure the import cost of each icondbtools command
+
+Each command runs in a fresh interpreter with -X importtime against a db path which does not exist,
+so that only startup (argument parsing and imports) is measured.
+
+usage: python benchmarks/startup.py [--repeat 5] [command ...]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+NO_DB = os.path.join(tempfile.gettempdir(), 'icondbtools-startup-benchmark-no-db')
+
+COMMANDS = {
+    'lastblock': ['lastblock', '--db', NO_DB],
+    'block': ['block', '--db', NO_DB, '--height', '0'],
+    'txresult': ['txresult', '--db', NO_DB, '--hash', '0x00'],
+    'statehash': ['statehash', '--db', NO_DB],
+    'account': ['account', '--db', NO_DB, '--address', 'hx0000000000000000000000000000000000000000'],
+    'tps': ['tps', '--db', NO_DB],
+    'sync': ['sync', '--db', NO_DB, '--count', '0'],
+}
+
+
+def parse_importtime(stderr: str) -> tuple:
+    """Parse the output of -X importtime
+
+    :return: (cumulative import time of top-level modules in microseconds, imported module names)
+    """
+    total_us: int = 0
+    modules = set()
+
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            # header line
+            continue
+
+        name: str = fields[2].rstrip()
+        modules.add(name.strip())
+        # Top-level imports have no indentation; their cumulative time includes nested imports
+        if name.startswith(' ') and not name.startswith('  '):
+            total_us += int(fields[1])
+
+    return total_us, modules
+
+
+def measure(args: list) -> tuple:
+    """Run a command in a fresh interpreter
+
+    :return: (wall time in seconds, cumulative import time in microseconds, imported module names)
+    """
+    start: float = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-m', 'icondbtools'] + args,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        universal_newlines=True)
+    elapsed: float = time.perf_counter() - start
+
+    total_us, modules = parse_importtime(completed.stderr)
+    return elapsed, total_us, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description='icondbtools startup benchmark')
+    parser.add_argument('--repeat', type=int, default=5, help='runs per command')
+    parser.add_argument('commands', nargs='*', default=list(COMMANDS), help=', '.join(COMMANDS))
+    args = parser.parse_args()
+
+    print(f'{"command":<12} {"wall(ms)":>10} {"import(ms)":>11} {"modules":>8}  iconservice')
+
+    for command in args.commands:
+        walls = []
+        imports = []
+        modules = set()
+
+        for _ in range(args.repeat):
+            wall, import_us, modules = measure(COMMANDS[command])
+            walls.append(wall * 1000)
+            imports.append(import_us / 1000)
+
+        print(f'{command:<12} {statistics.median(walls):>10.1f} {statistics.median(imports):>11.1f} '
+              f'{len(modules):>8}  {"yes" if "iconservice" in modules else "no"}')
+
+
+if __name__ == '__main__':
+    main()
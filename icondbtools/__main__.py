@@ -14,27 +14,29 @@
 # limitations under the License.
 
 import argparse
+import csv
+import json
+import os
 import shutil
 import sys
 from datetime import datetime
-from typing import TYPE_CHECKING
-
-from iconservice.base.address import Address
-from iconservice.utils import int_to_bytes
-from .block_database_reader import BlockDatabaseReader
-from .icon_service_syncer import IconServiceSyncer
-from .invalid_transaction_checker import InvalidTransactionChecker
-from .score_database_manager import ScoreDatabaseManager
-from .state_database_reader import StateDatabaseReader, StateHash
-from .timer import Timer
-from .tps_calculator import TPSCalculator
+from typing import TYPE_CHECKING, Optional
+
+from . import tracing
 
 if TYPE_CHECKING:
     from iconservice.base.block import Block
     from iconservice.icx.icx_account import Account
+    from .state_database_reader import StateHash
+
+
+# Each command imports what it needs inside its own function
+# so that light commands like 'block' and 'txresult' do not import iconservice
 
 
 def print_last_block(args):
+    from .block_database_reader import BlockDatabaseReader
+
     db_path: str = args.db
 
     block_reader = BlockDatabaseReader()
@@ -42,10 +44,12 @@ def print_last_block(args):
     block: dict = block_reader.get_last_block()
     block_reader.close()
 
-    print(block)
+    print(json.dumps(block))
 
 
 def print_block(args):
+    from .block_database_reader import BlockDatabaseReader
+
     db_path: str = args.db
     height: int = args.height
     block_hash: str = args.hash
@@ -59,10 +63,12 @@ def print_block(args):
         block: dict = block_reader.get_block_by_block_height(height)
     block_reader.close()
 
-    print(block)
+    print(json.dumps(block))
 
 
 def print_transaction_result(args):
+    from .block_database_reader import BlockDatabaseReader
+
     db_path: str = args.db
     tx_hash: str = args.tx_hash
 
@@ -71,11 +77,30 @@ def print_transaction_result(args):
     tx_result: dict = block_reader.get_transaction_result_by_hash(tx_hash)
     block_reader.close()
 
-    print(tx_result)
+    print(json.dumps(tx_result))
+
+
+def get_state_last_height(state_db_path: str) -> int:
+    """Return the height of the last block committed to statedb. -1 if there is no block
+
+    """
+    from .state_database_reader import StateDatabaseReader
+
+    reader = StateDatabaseReader()
+    try:
+        reader.open(state_db_path)
+        block: 'Block' = reader.get_last_block()
+        return block.height
+    except:
+        return -1
+    finally:
+        reader.close()
 
 
 def sync(args):
-    db_path: str = args.db
+    from .icon_service_syncer import IconServiceSyncer
+
+    db_path: str = args.db if args.source is None else args.source
     start: int = args.start
     end: int = args.end
     count: int = args.count
@@ -91,19 +116,15 @@ def sync(args):
     backup_period: int = args.backup_period
     iconservice_config_path: str = args.is_config
 
-    reader = StateDatabaseReader()
+    state_db_path = '.statedb/icon_dex'
+    if args.diff_against is not None:
+        from .diff_replayer import BASE_STATE_DIR_NAME
+
+        state_db_path = os.path.join(args.diff_state_dir, BASE_STATE_DIR_NAME, state_db_path)
 
     # If --start option is not present, set start point to the last block height from statedb
     if start < 0:
-        try:
-            state_db_path = '.statedb/icon_dex'
-            reader.open(state_db_path)
-            block: 'Block' = reader.get_last_block()
-            start = block.height + 1
-        except:
-            start = 0
-        finally:
-            reader.close()
+        start = get_state_last_height(state_db_path) + 1
 
     if end > -1:
         if end < start:
@@ -119,23 +140,133 @@ def sync(args):
           f'deployerWhitelist: {deployer_whitelist}\n'
           f'scorePackageValidator: {score_package_validator}\n')
 
+    engine_params = {
+        'config_path': iconservice_config_path,
+        'fee': fee,
+        'audit': audit,
+        'deployer_whitelist': deployer_whitelist,
+        'score_package_validator': score_package_validator,
+        'builtin_score_owner': builtin_score_owner}
+
+    if args.diff_against is not None:
+        return sync_diff(args, db_path, start, count, engine_params)
+
     syncer = IconServiceSyncer()
     try:
-        syncer.open(
-            config_path=iconservice_config_path,
-            fee=fee,
-            audit=audit,
-            deployer_whitelist=deployer_whitelist,
-            score_package_validator=score_package_validator,
-            builtin_score_owner=builtin_score_owner)
-        return syncer.run(
+        syncer.open(**engine_params)
+        ret: int = syncer.run(
             db_path, channel, start_height=start, count=count,
             stop_on_error=stop_on_error, no_commit=no_commit,
             write_precommit_data=write_precommit_data,
-            backup_period=backup_period)
+            backup_period=backup_period,
+            write_profile_period=args.write_profile_period,
+            write_profile_path=args.write_profile_output,
+            follow=args.follow,
+            snapshot=args.snapshot,
+            poll_interval=args.poll_interval,
+            max_poll_interval=args.max_poll_interval,
+            compact_backup=args.compact_backup)
     finally:
         syncer.close()
 
+    # IconServiceEngine is closed in syncer.run(), so no block is being committed
+    if args.compact:
+        from .db_compactor import compact_database, print_compaction_report
+
+        print_compaction_report(state_db_path, compact_database(state_db_path))
+
+    return ret
+
+
+def sync_diff(args, source: str, start: int, count: int, engine_params: dict) -> int:
+    """Replay blocks with the installed iconservice and another build, and stop at the first divergence
+
+    :return: 0(no divergence), 1(divergence)
+    """
+    from .diff_replayer import DiffReplayer, TARGET_STATE_DIR_NAME
+
+    unsupported = [
+        option for option, value in (
+            ('--follow', args.follow),
+            ('--backup-period', args.backup_period > 0),
+            ('--write-precommit-data', args.write_precommit_data),
+            ('--write-profile-period', args.write_profile_period > 0),
+            ('--compact', args.compact),
+            ('--compact-backup', args.compact_backup)) if value]
+    if unsupported:
+        raise ValueError(f'{", ".join(unsupported)} can not be used with --diff-against')
+
+    target_state_db_path: str = os.path.join(args.diff_state_dir, TARGET_STATE_DIR_NAME, '.statedb', 'icon_dex')
+    target_start: int = get_state_last_height(target_state_db_path) + 1
+    if args.start < 0 and target_start != start:
+        raise ValueError(f'The states of base({start - 1}) and target({target_start - 1}) are at different heights')
+
+    replayer = DiffReplayer()
+    try:
+        replayer.open(source, args.diff_state_dir, args.diff_against, engine_params, snapshot=args.snapshot)
+        summary: dict = replayer.run(start, count, no_commit=args.no_commit)
+    finally:
+        replayer.close()
+
+    divergence = summary.pop('divergence')
+    for key, value in summary.items():
+        print(f'{key}: {value}')
+
+    if divergence is None:
+        print('divergence: none')
+        return 0
+
+    print(f'divergence: {json.dumps(divergence, indent=4)}')
+    return 1
+
+
+def open_snapshots(args) -> list:
+    """Replace the db paths of args with hard-linked checkpoints of them
+
+    :param args:
+    :return: list of DatabaseSnapshot to close after running a command
+    """
+    from .db_snapshot import DatabaseSnapshot
+
+    snapshots = []
+
+    def _open(db_path: str) -> str:
+        snapshot = DatabaseSnapshot()
+        path: str = snapshot.open(db_path)
+        snapshots.append(snapshot)
+        print(f'snapshot: {db_path} -> {path}', file=sys.stderr)
+        return path
+
+    try:
+        for name in ('db', 'state_db'):
+            value = getattr(args, name, None)
+            if isinstance(value, list):
+                setattr(args, name, [_open(db_path) for db_path in value])
+            elif value is not None:
+                setattr(args, name, _open(value))
+    except BaseException:
+        for snapshot in snapshots:
+            snapshot.close()
+        raise
+
+    return snapshots
+
+
+def writes_to_db(args) -> bool:
+    """Check whether a command writes to --db or --state-db
+
+    A command with --snapshot would write to a checkpoint which is removed at exit
+
+    :param args:
+    :return:
+    """
+    if args.func is run_command_compact:
+        return not args.stats
+    if args.func is run_command_token:
+        return args.import_csv is not None or (args.user is not None and args.balance >= 0)
+
+    return False
+
 
 def clear(_args):
     """Clear .score and .statedb
@@ -157,6 +288,8 @@ def run_command_state_hash(args):
     :param args:
     :return:
     """
+    from .state_database_reader import StateDatabaseReader
+
     db_path: str = args.db
     prefix: str = args.prefix
 
@@ -182,6 +315,8 @@ def run_command_state_last_block(args):
     :param args:
     :return:
     """
+    from .state_database_reader import StateDatabaseReader
+
     db_path: str = args.db
     reader = StateDatabaseReader()
 
@@ -205,7 +340,14 @@ def run_command_account(args):
     :param args:
     :return:
     """
+    from iconservice.base.address import Address
+    from .state_database_reader import StateDatabaseReader
+
     db_path: str = args.db
+
+    if args.addresses_file is not None:
+        return run_command_bulk_account(args)
+
     address: 'Address' = Address.from_string(args.address)
     reader = StateDatabaseReader()
 
@@ -223,14 +365,234 @@ def run_command_account(args):
         reader.close()
 
 
+def run_command_bulk_account(args):
+    """Print the account info of addresses listed in a file or stdin
+
+    One address per line. Empty lines and lines starting with '#' are ignored
+
+    :param args:
+    :return:
+    """
+    from iconservice.base.address import Address
+    from iconservice.base.exception import InvalidParamsException
+    from .record_writer import RecordWriter
+    from .state_database_reader import StateDatabaseReader
+
+    db_path: str = args.db
+    path: str = args.addresses_file
+
+    if path == '-':
+        lines: list = sys.stdin.readlines()
+    else:
+        with open(path, 'rt') as f:
+            lines: list = f.readlines()
+
+    writer = RecordWriter(args.format, ['address', 'found', 'balance', 'stake', 'error'])
+    writer.open(args.output)
+
+    addresses = []
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+
+        try:
+            addresses.append(Address.from_string(line))
+        except InvalidParamsException:
+            writer.write({'address': line, 'found': False, 'error': 'invalid address'})
+
+    reader = StateDatabaseReader()
+
+    try:
+        reader.open(db_path)
+
+        for address, account in reader.get_accounts(addresses):
+            if account is None:
+                writer.write({'address': str(address), 'found': False})
+            else:
+                writer.write({
+                    'address': str(address),
+                    'found': True,
+                    'balance': str(account.balance),
+                    'stake': str(getattr(account, 'stake', 0))})
+    finally:
+        reader.close()
+        writer.close()
+
+
+def setup_accounts(subparsers):
+    parser = subparsers.add_parser('accounts')
+    accounts_subparsers = parser.add_subparsers(title='accounts subcommands', dest='accounts_command', required=True)
+
+    parser_scan = accounts_subparsers.add_parser(
+        'scan', help='Aggregate all accounts in statedb: supply, top holders and balance histogram')
+    parser_scan.add_argument('--db', type=str, required=True)
+    parser_scan.add_argument('--top', type=int, default=100, help='The number of top holders to report')
+    parser_scan.add_argument(
+        '--workers', type=int, default=0, help='The number of worker processes decoding accounts')
+    parser_scan.add_argument(
+        '--chunk-size', type=int, default=10000, help='The number of accounts passed to a worker at once')
+    parser_scan.add_argument('--format', type=str, default='ndjson', choices=('ndjson', 'csv'))
+    parser_scan.add_argument('--output', type=str, default=None, help='output file path. default: stdout')
+    parser_scan.set_defaults(func=run_command_accounts_scan)
+
+
+def run_command_accounts_scan(args):
+    """Scan all accounts in statedb and print aggregates in one pass
+
+    :param args:
+    :return:
+    """
+    from .account_scanner import AccountScanner
+
+    scanner = AccountScanner()
+    try:
+        scanner.open(args.db)
+        scanner.run(
+            top_n=args.top,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+            fmt=args.format,
+            output_path=args.output)
+    finally:
+        scanner.close()
+
+
+def setup_state_stats(subparsers):
+    parser = subparsers.add_parser(
+        'statestats', help='Rank statedb key groups (SCORE address|db type|db name) by key count and bytes')
+    parser.add_argument('--db', type=str, required=True)
+    parser.add_argument(
+        '--mode', type=str, default='fast', choices=('fast', 'exact'),
+        help='fast: approximate sizes and sampling, exact: one full streaming pass')
+    parser.add_argument(
+        '--depth', type=int, default=3, choices=(1, 2, 3),
+        help='group by 1(score address), 2(+ db type), 3(+ db name)')
+    parser.add_argument(
+        '--sample-size', type=int, default=1000, help='The number of items sampled per group in fast mode')
+    parser.add_argument('--sort', type=str, default='bytes', choices=('bytes', 'keys'))
+    parser.add_argument('--top', type=int, default=30, help='The number of groups to print. 0 means all')
+    parser.add_argument('--format', type=str, default='table', choices=('table', 'ndjson', 'csv'))
+    parser.add_argument('--output', type=str, default=None, help='output file path. default: stdout')
+    parser.set_defaults(func=run_command_state_stats)
+
+
+def run_command_state_stats(args):
+    """Profile the keyspace of statedb
+
+    :param args:
+    :return:
+    """
+    from .keyspace_profiler import KeyspaceProfiler
+    from .record_writer import RecordWriter
+
+    profiler = KeyspaceProfiler()
+    try:
+        profiler.open(args.db)
+        groups: list = profiler.run(mode=args.mode, depth=args.depth, sample_size=args.sample_size)
+    finally:
+        profiler.close()
+
+    if args.sort == 'keys':
+        groups.sort(key=lambda group: (group.keys, group.size), reverse=True)
+    else:
+        groups.sort(key=lambda group: (group.size, group.keys), reverse=True)
+
+    total_keys: int = sum(group.keys for group in groups)
+    total_size: int = sum(group.size for group in groups)
+
+    if args.top > 0:
+        groups = groups[:args.top]
+
+    if args.format != 'table':
+        writer = RecordWriter(args.format, ['rank', 'group', 'keys', 'bytes', 'key_size', 'value_size', 'estimated'])
+        writer.open(args.output)
+        try:
+            for rank, group in enumerate(groups, start=1):
+                writer.write({'rank': rank, **group.to_dict()})
+        finally:
+            writer.close()
+        return
+
+    print(f'{"rank":>4} | {"keys":>12} | {"bytes":>14} | {"bytes %":>7} | group')
+    print('-' * 100)
+    for rank, group in enumerate(groups, start=1):
+        ratio: float = group.size * 100 / total_size if total_size > 0 else 0
+        mark: str = '~' if group.estimated else ' '
+        print(f'{rank:>4} | {mark}{group.keys:>11} | {mark}{group.size:>13} | {ratio:>6.2f}% | {group.label}')
+    print('-' * 100)
+    print(f'total keys: {total_keys}\n'
+          f'total bytes: {total_size}\n'
+          f'mode: {args.mode} (~: estimated from on-disk approximate sizes)')
+
+
 def setup_invalid_transaction(subparsers):
     parser = subparsers.add_parser('invalidtx')
     parser.add_argument('--db', type=str, required=True)
     parser.add_argument('--start', type=int, default=1, required=False)
     parser.add_argument('--end', type=int, default=-1, required=False)
+    add_time_range_arguments(parser)
+    add_worker_arguments(parser)
     parser.set_defaults(func=run_command_invalid_transaction)
 
 
+def add_time_range_arguments(parser):
+    parser.add_argument(
+        '--since', type=str, default=None,
+        help='start time in ISO 8601 (local time if no timezone). ex) "2018-12-19 14:00". overrides --start')
+    parser.add_argument(
+        '--until', type=str, default=None, help='end time in ISO 8601, inclusive. overrides --end')
+    parser.add_argument(
+        '--time-index', type=str, default=None,
+        help='json file caching block timestamps probed while resolving --since and --until')
+
+
+def resolve_time_range(args):
+    """Convert --since and --until to block heights with binary search over block timestamps
+
+    :param args: args.start and args.end are overwritten
+    :return:
+    """
+    from .block_database_reader import BlockDatabaseReader
+    from .block_time_index import BlockTimeIndex, parse_datetime_to_us
+
+    if args.since is None and args.until is None:
+        return
+
+    reader = BlockDatabaseReader()
+    reader.open(args.db)
+
+    # The genesis block hash tells the chain which the cached timestamps belong to
+    genesis_block_key: Optional[bytes] = reader.get_block_key_by_block_height(0)
+    db_id: str = genesis_block_key.decode() if genesis_block_key else os.path.abspath(args.db)
+    time_index = BlockTimeIndex(args.time_index, db_id)
+
+    try:
+        time_index.load()
+        reader.set_time_index(time_index)
+
+        if args.since is not None:
+            args.start = reader.find_block_height_by_timestamp(parse_datetime_to_us(args.since))
+        if args.until is not None:
+            args.end = reader.find_block_height_by_timestamp(parse_datetime_to_us(args.until), right=True) - 1
+    finally:
+        reader.close()
+        time_index.save()
+
+    if args.until is not None and args.end < args.start:
+        raise ValueError(f'No blocks between {args.since} and {args.until}')
+
+    print(f'start: {args.start}, end: {args.end}', file=sys.stderr)
+
+
+def add_worker_arguments(parser):
+    parser.add_argument(
+        '--workers', type=int, default=0,
+        help='The number of worker processes decoding blocks by chunk. 0 means no worker')
+    parser.add_argument(
+        '--chunk-size', type=int, default=1000, help='The number of blocks passed to a worker at once')
+
+
 def run_command_invalid_transaction(args):
     """Check whether invalid transaction are present or not
     for example transactions that are processed without any fees
@@ -238,6 +600,10 @@ def run_command_invalid_transaction(args):
     :param args:
     :return:
     """
+    from .invalid_transaction_checker import InvalidTransactionChecker
+
+    resolve_time_range(args)
+
     db_path: str = args.db
     start: int = args.start
     end: int = args.end
@@ -245,7 +611,7 @@ def run_command_invalid_transaction(args):
     checker = InvalidTransactionChecker()
     try:
         checker.open(db_path)
-        checker.run(start, end)
+        checker.run(start, end, workers=args.workers, chunk_size=args.chunk_size)
     finally:
         checker.close()
 
@@ -256,6 +622,16 @@ def setup_tps_calculation(subparsers):
     parser.add_argument('--start', type=int, default=0, required=False)
     parser.add_argument('--end', type=int, default=-1, required=False)
     parser.add_argument('--span', type=int, default=-1, required=False, help="unit: second")
+    add_time_range_arguments(parser)
+    add_worker_arguments(parser)
+    parser.add_argument(
+        '--analyze', action='store_true',
+        help='report rolling window tps, peak windows, block interval percentiles '
+             'and hourly/daily aggregates (numpy required)')
+    parser.add_argument('--window', type=int, default=60, help='rolling window size for --analyze. unit: second')
+    parser.add_argument('--peaks', type=int, default=10, help='The number of peak windows to report for --analyze')
+    parser.add_argument('--format', type=str, default='json', choices=('json', 'csv'), help='report format for --analyze')
+    parser.add_argument('--output', type=str, default=None, help='report file path for --analyze')
     parser.set_defaults(func=run_command_tps_calculation)
 
 
@@ -266,62 +642,525 @@ def run_command_tps_calculation(args):
     :param args:
     :return:
     """
+    from .tps_calculator import TPSCalculator
+
+    resolve_time_range(args)
+
     db_path: str = args.db
     start: int = args.start
     end: int = args.end
     span_us: int = args.span * 10 ** 6
 
+    if args.analyze:
+        return run_command_tps_analysis(args)
+
     calculator = TPSCalculator()
     try:
         calculator.open(db_path)
-        calculator.run(start, end, span_us)
+        calculator.run(start, end, span_us, workers=args.workers, chunk_size=args.chunk_size)
     finally:
         calculator.close()
 
 
+def run_command_tps_analysis(args):
+    """Analyze tps over a range of blocks with numpy
+
+    :param args:
+    :return:
+    """
+    # numpy is an optional dependency only for this command
+    from .tps_analyzer import TPSAnalyzer
+
+    span_us: int = args.span * 10 ** 6 if args.span >= 0 else -1
+
+    analyzer = TPSAnalyzer()
+    try:
+        analyzer.open(args.db)
+        analyzer.run(
+            args.start, args.end, span_us,
+            window_s=args.window,
+            peak_count=args.peaks,
+            fmt=args.format,
+            output_path=args.output)
+    finally:
+        analyzer.close()
+
+
+def setup_scan(subparsers):
+    parser = subparsers.add_parser(
+        'scan', help='Run many rules over blocks and transaction results in one streaming pass')
+    parser.add_argument('--db', type=str, required=True)
+    parser.add_argument('--start', type=int, default=0, required=False)
+    parser.add_argument('--end', type=int, default=-1, required=False)
+    add_time_range_arguments(parser)
+    parser.add_argument(
+        '--rules', type=str, default='zerofee',
+        help='comma separated rule names (failedtx, tps, zerofee) '
+             'or module:ClassName of ScanRule plugins')
+    parser.add_argument(
+        '--output-dir', type=str, default=None,
+        help='write findings of each rule to {output-dir}/{rule}.txt and summaries to summary.json. '
+             'default: stdout')
+    parser.set_defaults(func=run_command_scan)
+
+
+def run_command_scan(args):
+    """Feed blocks and transaction results to all given rules in one pass
+
+    :param args:
+    :return:
+    """
+    from .chain_scanner import ChainScanner, create_rule
+
+    resolve_time_range(args)
+
+    output_dir: str = args.output_dir
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+
+    scanner = ChainScanner()
+    try:
+        scanner.open(args.db)
+        for name in args.rules.split(','):
+            scanner.add_rule(create_rule(name.strip()), output_dir)
+
+        summaries: dict = scanner.run(args.start, args.end)
+    finally:
+        scanner.close()
+
+    for name, summary in summaries.items():
+        print(f'{name}: {json.dumps(summary)}')
+
+    if output_dir is not None:
+        with open(os.path.join(output_dir, 'summary.json'), 'wt') as f:
+            json.dump(summaries, f, indent=2)
+
+
+def setup_index(subparsers):
+    parser = subparsers.add_parser('index')
+    index_subparsers = parser.add_subparsers(title='index subcommands', dest='index_command', required=True)
+
+    parser_addresses = index_subparsers.add_parser(
+        'addresses', help='Build or update the index of transactions by address')
+    parser_addresses.add_argument('--db', type=str, required=True, help='loopchain db path')
+    parser_addresses.add_argument('--index', type=str, required=True, help='index db path')
+    parser_addresses.add_argument(
+        '--end', type=int, default=-1, help='end height to index, inclusive. -1 means the last block')
+    add_worker_arguments(parser_addresses)
+    parser_addresses.set_defaults(func=run_command_index_addresses)
+
+    parser_query = index_subparsers.add_parser('query', help='Print transactions of an address from the index')
+    parser_query.add_argument('--index', type=str, required=True, help='index db path')
+    parser_query.add_argument(
+        '--address', type=str, required=True, help='ex) hx677133298ed5319607a321a38169031a8867085c')
+    parser_query.add_argument('--limit', type=int, default=100, help='The maximum number of transactions in a page')
+    parser_query.add_argument('--cursor', type=str, default=None, help='next_cursor printed with the previous page')
+    parser_query.add_argument('--reverse', action='store_true', help='newest first')
+    parser_query.set_defaults(func=run_command_index_query)
+
+
+def run_command_index_addresses(args):
+    """Index transactions by address from the next height of the last indexed block
+
+    :param args:
+    :return:
+    """
+    from .address_indexer import AddressIndexer
+
+    indexer = AddressIndexer()
+    try:
+        indexer.open(args.db, args.index)
+        start, end, count = indexer.run(end=args.end, workers=args.workers, chunk_size=args.chunk_size)
+    finally:
+        indexer.close()
+
+    print(f'start: {start}\n'
+          f'end: {end}\n'
+          f'entries: {count}')
+
+
+def run_command_index_query(args):
+    """Print a page of transactions of an address in ndjson
+
+    :param args:
+    :return:
+    """
+    from .address_indexer import AddressIndexReader
+    from .record_writer import RecordWriter
+
+    reader = AddressIndexReader()
+    try:
+        reader.open(args.index)
+        items, next_cursor = reader.query(args.address, args.limit, args.cursor, args.reverse)
+    finally:
+        reader.close()
+
+    writer = RecordWriter('ndjson')
+    writer.open()
+    for item in items:
+        writer.write(item)
+    writer.close()
+
+    print(f'next_cursor: {next_cursor}', file=sys.stderr)
+
+
+def setup_compact(subparsers):
+    parser = subparsers.add_parser(
+        'compact', help='Compact a leveldb and report its level statistics before and after')
+    parser.add_argument('--db', type=str, required=True, help='leveldb path. ex) .statedb/icon_dex')
+    parser.add_argument('--start', type=str, default=None, help='first key to compact in hexa string')
+    parser.add_argument('--stop', type=str, default=None, help='last key to compact in hexa string')
+    parser.add_argument(
+        '--prefix', type=str, default=None, help='compact keys starting with this hexa string')
+    parser.add_argument('--stats', action='store_true', help='Report level statistics without compaction')
+    parser.set_defaults(func=run_command_compact)
+
+
+def run_command_compact(args):
+    """Compact keys in [start, stop] of a leveldb which no other process opens
+
+    :param args:
+    :return:
+    """
+    from .db_compactor import DatabaseCompactor, print_compaction_report, print_database_stats
+    from .keyspace_profiler import get_upper_bound
+
+    if args.prefix is not None:
+        if args.start is not None or args.stop is not None:
+            raise ValueError('--prefix can not be used with --start or --stop')
+        prefix: bytes = bytes.fromhex(args.prefix)
+        start, stop = prefix, get_upper_bound(prefix)
+    else:
+        start = None if args.start is None else bytes.fromhex(args.start)
+        stop = None if args.stop is None else bytes.fromhex(args.stop)
+
+    compactor = DatabaseCompactor()
+    try:
+        compactor.open(args.db)
+        if args.stats:
+            print_database_stats(args.db, compactor.get_stats())
+        else:
+            print_compaction_report(args.db, compactor.run(start, stop))
+    finally:
+        compactor.close()
+
+
+def setup_verify_chain(subparsers):
+    parser = subparsers.add_parser('verify-chain', help='Verify the integrity of blocks in loopchain db')
+    parser.add_argument('--db', type=str, required=True, help='loopchain db path')
+    parser.add_argument('--start', type=int, default=0, help='start height')
+    parser.add_argument('--end', type=int, default=-1, help='end height, inclusive. -1 means the last block')
+    add_worker_arguments(parser)
+    parser.set_defaults(func=run_command_verify_chain)
+
+
+def run_command_verify_chain(args):
+    """Print the issues and gaps of blocks in [start, end]
+
+    :param args:
+    :return: 0(no issue and no gap), 1(otherwise)
+    """
+    from .chain_verifier import ChainVerifier
+
+    verifier = ChainVerifier()
+    try:
+        verifier.open(args.db)
+        summary: dict = verifier.run(args.start, args.end, workers=args.workers, chunk_size=args.chunk_size)
+    finally:
+        verifier.close()
+
+    for key, value in summary.items():
+        print(f'{key}: {value}')
+
+    return 0 if summary['issues'] == 0 and summary['gaps'] == 0 else 1
+
+
+def setup_compare_nodes(subparsers):
+    parser = subparsers.add_parser(
+        'compare-nodes', help='Compare block hashes of loopchain dbs of several nodes')
+    parser.add_argument(
+        '--db', type=str, action='append', required=True, help='loopchain db path. Repeat for each node')
+    parser.add_argument('--start', type=int, default=0, help='start height')
+    parser.add_argument(
+        '--end', type=int, default=-1, help='end height, inclusive. -1 means the lowest last height among nodes')
+    parser.add_argument(
+        '--chunk-size', type=int, default=10000, help='The number of heights read from each db at once')
+    parser.add_argument(
+        '--commit-state', action='store_true',
+        help='Compare commit_state of every height as well. Whole blocks are read')
+    parser.set_defaults(func=run_command_compare_nodes)
+
+
+def run_command_compare_nodes(args):
+    """Print heights where blocks differ among nodes
+
+    :param args:
+    :return: 0(all nodes agree), 1(otherwise)
+    """
+    from .node_comparator import NodeComparator
+
+    comparator = NodeComparator()
+    try:
+        comparator.open(args.db)
+        summary: dict = comparator.run(
+            args.start, args.end, chunk_size=args.chunk_size, commit_state=args.commit_state)
+    finally:
+        comparator.close()
+
+    for key, value in summary.items():
+        print(f'{key}: {value}')
+
+    return 0 if summary['different_heights'] == 0 else 1
+
+
+def setup_export(subparsers):
+    parser = subparsers.add_parser(
+        'export', help='Export blocks and transaction results to ndjson or gzip chunk files')
+    parser.add_argument('--db', type=str, required=True, help='loopchain db path')
+    parser.add_argument('--output', type=str, required=True, help='output directory')
+    parser.add_argument('--start', type=int, default=0, help='start height')
+    parser.add_argument('--end', type=int, default=-1, help='end height, inclusive. -1 means the last block')
+    parser.add_argument('--format', type=str, default='ndjson', choices=('ndjson', 'gzip'))
+    parser.add_argument('--chunk-size', type=int, default=10000, help='the number of blocks in a chunk file')
+    parser.add_argument(
+        '--frame-size', type=int, default=100,
+        help='the number of blocks in a frame which is the unit of compression and seek')
+    parser.add_argument('--tx-results', action='store_true', help='include transaction results')
+    parser.add_argument('--workers', type=int, default=0, help='the number of worker processes. 0: no worker')
+    add_time_range_arguments(parser)
+    parser.set_defaults(func=run_command_export)
+
+
+def run_command_export(args):
+    """Export blocks in [start, end]. Chunks which were exported before are skipped
+
+    :param args:
+    :return:
+    """
+    from .block_exporter import BlockExporter
+
+    resolve_time_range(args)
+
+    exporter = BlockExporter()
+    try:
+        exporter.open(args.db)
+        exported, skipped = exporter.run(
+            args.output,
+            args.start,
+            args.end,
+            fmt=args.format,
+            chunk_size=args.chunk_size,
+            frame_size=args.frame_size,
+            include_tx_results=args.tx_results,
+            workers=args.workers)
+    finally:
+        exporter.close()
+
+    print(f'exported chunks: {exported}\n'
+          f'skipped chunks: {skipped}')
+
+
+def setup_serve(subparsers):
+    parser = subparsers.add_parser(
+        'serve', help='Answer JSON-RPC queries over a unix domain socket with databases kept open')
+    parser.add_argument('--db', type=str, default=None, help='loopchain db path')
+    parser.add_argument('--state-db', type=str, default=None, help='statedb path. ex) .statedb/icon_dex')
+    parser.add_argument('--socket', type=str, required=True, help='unix domain socket path')
+    parser.add_argument('--workers', type=int, default=8, help='the number of threads handling requests')
+    parser.add_argument(
+        '--cache-size', type=int, default=10000, help='the number of cached blocks and transaction results')
+    parser.set_defaults(func=run_command_serve)
+
+
+def run_command_serve(args):
+    from .query_server import QueryHandler, QueryServer
+
+    if args.db is None and args.state_db is None:
+        print('--db or --state-db is required', file=sys.stderr)
+        return 1
+
+    handler = QueryHandler(cache_size=args.cache_size)
+    server = QueryServer(handler)
+
+    try:
+        handler.open(args.db, args.state_db)
+        server.open(args.socket, workers=args.workers)
+        print(f'serving on {args.socket}', file=sys.stderr)
+        server.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        handler.close()
+
+
+def setup_batch(subparsers):
+    parser = subparsers.add_parser(
+        'batch', help='Execute queries read line by line from stdin and write results in ndjson')
+    parser.add_argument('--db', type=str, default=None, help='loopchain db path')
+    parser.add_argument('--state-db', type=str, default=None, help='statedb path. ex) .statedb/icon_dex')
+    parser.add_argument('--input', type=str, default='-', help='query file path. default: stdin')
+    parser.add_argument('--output', type=str, default=None, help='output file path. default: stdout')
+    parser.set_defaults(func=run_command_batch)
+
+
+def run_command_batch(args):
+    """Execute queries like 'block 1000', 'txresult 0x...' and 'account hx...' one per line
+
+    Each result is written as {"id": line number, "query": line, "result" or "error": ...}
+
+    :param args:
+    :return:
+    """
+    from .query_server import QueryError, QueryHandler, parse_query_line
+    from .record_writer import RecordWriter
+
+    if args.db is None and args.state_db is None:
+        print('--db or --state-db is required', file=sys.stderr)
+        return 1
+
+    handler = QueryHandler(cache_size=0)
+    writer = RecordWriter('ndjson')
+    f = sys.stdin if args.input == '-' else open(args.input, 'rt')
+
+    try:
+        handler.open(args.db, args.state_db)
+        writer.open(args.output)
+
+        for line_number, line in enumerate(f, start=1):
+            query: str = line.strip()
+            if not query or query.startswith('#'):
+                continue
+
+            try:
+                method, params = parse_query_line(query)
+            except QueryError as e:
+                response = {'id': line_number, 'error': {'code': e.code, 'message': e.message}}
+            else:
+                response = handler.handle({'id': line_number, 'method': method, 'params': params})
+
+            response.pop('jsonrpc', None)
+            writer.write({'query': query, **response})
+    finally:
+        if f is not sys.stdin:
+            f.close()
+        writer.close()
+        handler.close()
+
+
 def setup_token(subparsers):
     parser = subparsers.add_parser('token')
     parser.add_argument('--db', type=str, required=True)
     parser.add_argument(
         '--score', type=str, required=True, help='score address ex) cx63af7f2e073985a9e9965765e809f66da3b0f238')
-    parser.add_argument(
-        '--user', type=str, required=True, help='user address ex) hxd7cf2f6bcbbfa542a08e9cd0e48bf848018a2ec7')
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument(
+        '--user', type=str, help='user address ex) hxd7cf2f6bcbbfa542a08e9cd0e48bf848018a2ec7')
+    group.add_argument(
+        '--import-csv', type=str,
+        help='write all balances in a csv file (address,balance) with one atomic write batch. "-" means stdin')
+    group.add_argument(
+        '--export-csv', type=str, help='write all token holders and their balances to a csv file. "-" means stdout')
     parser.add_argument('--balance', type=int, default=-1, required=False, help='token balance to write. ex) 100')
+    parser.add_argument('--name', type=str, default='balances', help='name of DictDB holding balances')
     parser.set_defaults(func=run_command_token)
 
 
 def run_command_token(args):
+    from iconservice.base.address import Address
+    from iconservice.utils import int_to_bytes
+    from .score_database_manager import ScoreDatabaseManager
+
     db_path: str = args.db
     score_address: 'Address' = Address.from_string(args.score)
-    address: 'Address' = Address.from_string(args.user)
     balance: int = args.balance
     # Name of DictDB in Standard Token
-    name: str = 'balances'
+    name: str = args.name
 
     manager = ScoreDatabaseManager()
     manager.open(db_path, score_address)
 
-    if balance < 0:
-        value: bytes = manager.read_from_dict_db(name, address)
-        balance: int = int.from_bytes(value, 'big')
-        print(f'token balance: {balance}')
-    else:
-        value: bytes = int_to_bytes(balance)
-        manager.write_to_dict_db(name, address, value)
+    try:
+        if args.import_csv is not None:
+            count: int = manager.write_batch_to_dict_db(name, _read_balances_from_csv(args.import_csv))
+            print(f'imported balances: {count}')
+        elif args.export_csv is not None:
+            _write_balances_to_csv(args.export_csv, manager.iterate_dict_db(name))
+        elif balance < 0:
+            address: 'Address' = Address.from_string(args.user)
+            value: bytes = manager.read_from_dict_db(name, address)
+            balance: int = int.from_bytes(value, 'big')
+            print(f'token balance: {balance}')
+        else:
+            address: 'Address' = Address.from_string(args.user)
+            value: bytes = int_to_bytes(balance)
+            manager.write_to_dict_db(name, address, value)
+    finally:
+        manager.close()
+
+
+def _read_balances_from_csv(path: str):
+    """Read (address, balance) rows from a csv file
 
-    manager.close()
+    The header row is skipped if present. A balance can be a decimal or 0x-prefixed hexa string
+
+    :param path: csv file path. '-' means stdin
+    :return: (Address, bytes) generator
+    """
+    from iconservice.base.address import Address
+    from iconservice.utils import int_to_bytes
+    from . import utils
+
+    f = sys.stdin if path == '-' else open(path, 'rt', newline='')
+
+    try:
+        for i, row in enumerate(csv.reader(f)):
+            if not row or (i == 0 and row[0].strip() == 'address'):
+                continue
+
+            address: 'Address' = Address.from_string(row[0].strip())
+            balance: int = utils.str_to_int(row[1].strip())
+            yield address, int_to_bytes(balance)
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def _write_balances_to_csv(path: str, items):
+    from .record_writer import RecordWriter
+
+    writer = RecordWriter('csv', ['address', 'balance'])
+    writer.open(path)
+
+    try:
+        for address, value in items:
+            writer.write({'address': str(address), 'balance': int.from_bytes(value, 'big')})
+    finally:
+        writer.close()
 
 
 def main():
     mainnet_builtin_score_owner = 'hx677133298ed5319607a321a38169031a8867085c'
 
     parser = argparse.ArgumentParser(prog='icondbtools', description='icon db tools')
+    parser.add_argument(
+        '--snapshot', action='store_true',
+        help='Read hard-linked checkpoints of --db and --state-db. Used for dbs which a running node holds. '
+             'Not allowed for commands which write to them')
+    parser.add_argument(
+        '--trace', type=str, default=None, metavar='PATH',
+        help='Write spans of the command to a json file in Chrome trace format. '
+             'Open it with chrome://tracing or https://ui.perfetto.dev')
 
-    subparsers = parser.add_subparsers(title='subcommands')
+    subparsers = parser.add_subparsers(title='subcommands', dest='command')
 
     # create the parser for the 'sync' command
     parser_sync = subparsers.add_parser('sync')
-    parser_sync.add_argument('--db', type=str, required=True)
+    sync_source_group = parser_sync.add_mutually_exclusive_group(required=True)
+    sync_source_group.add_argument('--db', type=str, help='loopchain db path')
+    sync_source_group.add_argument(
+        '--source', type=str,
+        help="block source. 'archive:<directory written by export command>' or 'db:<loopchain db path>'")
     parser_sync.add_argument('-s', '--start', type=int, default=-1, help='start height to sync')
     parser_sync.add_argument('--end', type=int, default=-1, help='end height to sync, inclusive')
     parser_sync.add_argument(
@@ -348,6 +1187,29 @@ def main():
         default='icon_dex', help='channel name used as a key of commit_state in block data')
     parser_sync.add_argument('--backup-period', type=int, default=0, help="Backup statedb every this period blocks")
     parser_sync.add_argument('--is-config', type=str, default="", help="iconservice_config.json filepath")
+    parser_sync.add_argument(
+        '--write-profile-period', type=int, default=0,
+        help='Report states written per SCORE and the hottest keys every this period blocks and at exit')
+    parser_sync.add_argument(
+        '--write-profile-output', type=str, default=None, help='ndjson file path of the latest write profile')
+    parser_sync.add_argument(
+        '--follow', action='store_true', help='Keep running and sync new blocks as they are appended')
+    parser_sync.add_argument(
+        '--poll-interval', type=float, default=0.5, help='Seconds between polls for new blocks in follow mode')
+    parser_sync.add_argument(
+        '--max-poll-interval', type=float, default=30.0,
+        help='Poll interval doubles while no new block arrives, up to this seconds')
+    parser_sync.add_argument(
+        '--diff-against', type=str, default=None,
+        help='python interpreter, virtualenv or module path of another iconservice build. '
+             'Each block is invoked by both builds and sync stops at the first difference')
+    parser_sync.add_argument(
+        '--diff-state-dir', type=str, default='.diff',
+        help="directory which has the state directories of both builds ('base' and 'target')")
+    parser_sync.add_argument(
+        '--compact', action='store_true', help='Compact statedb after sync and report its level statistics')
+    parser_sync.add_argument(
+        '--compact-backup', action='store_true', help='Compact statedb backups made by --backup-period')
     parser_sync.set_defaults(func=sync)
 
     # create the parser for lastblock
@@ -391,16 +1253,43 @@ def main():
     # create the parser for account
     parser_account = subparsers.add_parser('account')
     parser_account.add_argument('--db', type=str, required=True)
-    parser_account.add_argument(
-        '--address', type=str, required=True,
+    account_group = parser_account.add_mutually_exclusive_group(required=True)
+    account_group.add_argument(
+        '--address', type=str,
         help='EOA or SCORE address. ex) hx21a0f22e65ad8cd76c282b8b7fb35ba0368aa9bd')
+    account_group.add_argument(
+        '--addresses-file', type=str,
+        help='file containing one address per line. "-" means stdin')
+    parser_account.add_argument(
+        '--format', type=str, default='ndjson', choices=('ndjson', 'csv'), help='output format for --addresses-file')
+    parser_account.add_argument('--output', type=str, default=None, help='output file path. default: stdout')
     parser_account.set_defaults(func=run_command_account)
 
+    setup_accounts(subparsers)
+
+    setup_state_stats(subparsers)
+
     # create the parser for invalid tx checker
     setup_invalid_transaction(subparsers)
 
     setup_tps_calculation(subparsers)
 
+    setup_scan(subparsers)
+
+    setup_index(subparsers)
+
+    setup_verify_chain(subparsers)
+
+    setup_compare_nodes(subparsers)
+
+    setup_export(subparsers)
+
+    setup_compact(subparsers)
+
+    setup_serve(subparsers)
+
+    setup_batch(subparsers)
+
     setup_token(subparsers)
 
     if len(sys.argv) == 1:
@@ -408,13 +1297,33 @@ def main():
         return 1
 
     args = parser.parse_args()
-    print(args)
+    print(args, file=sys.stderr)
+
+    if args.snapshot and writes_to_db(args):
+        print(f'--snapshot can not be used for {args.command} which writes to the db', file=sys.stderr)
+        return 1
+
+    if args.trace:
+        tracing.enable()
+
+    command_span = tracing.Span(args.command, tracing.CATEGORY_COMMAND)
+    try:
+        with command_span:
+            # sync creates a checkpoint whenever it opens the block db, which is reopened in follow mode
+            with tracing.span('open_snapshots', tracing.CATEGORY_IO):
+                snapshots: list = open_snapshots(args) if args.snapshot and args.func is not sync else []
+
+            try:
+                ret: int = args.func(args)
+            finally:
+                for snapshot in snapshots:
+                    snapshot.close()
+    finally:
+        if args.trace:
+            count: int = tracing.write_chrome_trace(args.trace)
+            print(f'trace: {count} spans written to {args.trace}', file=sys.stderr)
 
-    timer = Timer()
-    timer.start()
-    ret: int = args.func(args)
-    timer.stop()
-    print(f'elapsedTime: {timer.duration()} seconds')
+    print(f'elapsedTime: {command_span.duration_s} seconds', file=sys.stderr)
 
     return ret
 
@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ICON Foundation Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import heapq
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Iterator
+
+from iconservice.base.address import Address
+from iconservice.icx.icx_account import Account
+
+from .parallel import map_in_order
+from .record_writer import RecordWriter
+from .state_database_reader import StateDatabaseReader
+from .tracing import CATEGORY_COMPUTE, traced
+
+ICX_IN_LOOP = 10 ** 18
+
+
+class AccountAggregator(object):
+    """Streaming aggregates over accounts in bounded memory
+
+    Holding means balance + stake.
+    Memory usage is bounded by top_n and the number of histogram buckets
+    """
+
+    def __init__(self, top_n: int = 100):
+        self.top_n: int = top_n
+        self.accounts: int = 0
+        self.skipped: int = 0
+        self.total_balance: int = 0
+        self.total_stake: int = 0
+        # min-heap of (holding, address, balance, stake)
+        self.top_holders: list = []
+        # digits of holding in icx -> [count, holding]
+        self.histogram: dict = {}
+
+    def add(self, address: str, balance: int, stake: int = 0):
+        holding: int = balance + stake
+
+        self.accounts += 1
+        self.total_balance += balance
+        self.total_stake += stake
+
+        bucket: int = self.get_bucket(holding)
+        stats: list = self.histogram.setdefault(bucket, [0, 0])
+        stats[0] += 1
+        stats[1] += holding
+
+        self._push_top_holder((holding, address, balance, stake))
+
+    def merge(self, other: 'AccountAggregator'):
+        self.accounts += other.accounts
+        self.skipped += other.skipped
+        self.total_balance += other.total_balance
+        self.total_stake += other.total_stake
+
+        for bucket, (count, holding) in other.histogram.items():
+            stats: list = self.histogram.setdefault(bucket, [0, 0])
+            stats[0] += count
+            stats[1] += holding
+
+        for item in other.top_holders:
+            self._push_top_holder(item)
+
+    def _push_top_holder(self, item: tuple):
+        if self.top_n <= 0:
+            return
+
+        if len(self.top_holders) < self.top_n:
+            heapq.heappush(self.top_holders, item)
+        elif item > self.top_holders[0]:
+            heapq.heapreplace(self.top_holders, item)
+
+    @staticmethod
+    def get_bucket(holding: int) -> int:
+        """Return the number of decimal digits of holding in icx
+
+        0: holding < 1 icx, -1: holding == 0
+        """
+        if holding <= 0:
+            return -1
+
+        icx: int = holding // ICX_IN_LOOP
+        return len(str(icx)) if icx > 0 else 0
+
+    @staticmethod
+    def get_bucket_label(bucket: int) -> str:
+        if bucket < 0:
+            return '0'
+        if bucket == 0:
+            return '(0, 1)'
+
+        return f'[1e{bucket - 1}, 1e{bucket})'
+
+    def to_records(self) -> Iterator[dict]:
+        """Convert aggregates to report records
+
+        :return: records with type, key, count and value fields
+        """
+        summary = (
+            ('accounts', self.accounts),
+            ('skipped', self.skipped),
+            ('total_balance', self.total_balance),
+            ('total_stake', self.total_stake),
+            ('circulating_supply', self.total_balance + self.total_stake))
+        for key, value in summary:
+            yield {'type': 'summary', 'key': key, 'value': str(value)}
+
+        for rank, item in enumerate(sorted(self.top_holders, reverse=True), start=1):
+            holding, address, balance, stake = item
+            yield {
+                'type': 'top', 'key': address, 'rank': rank,
+                'value': str(holding), 'balance': str(balance), 'stake': str(stake)}
+
+        for bucket in sorted(self.histogram):
+            count, holding = self.histogram[bucket]
+            yield {
+                'type': 'histogram', 'key': self.get_bucket_label(bucket),
+                'count': count, 'value': str(holding)}
+
+
+@traced('accounts.aggregate_accounts', CATEGORY_COMPUTE)
+def _aggregate_accounts(items: list, top_n: int) -> 'AccountAggregator':
+    """Decode a chunk of raw accounts and aggregate them
+
+    Run in a worker process
+
+    :param items: list of (key, value)
+    :param top_n:
+    :return:
+    """
+    aggregator = AccountAggregator(top_n)
+
+    for key, value in items:
+        try:
+            account: 'Account' = Account.from_bytes(value)
+            address: 'Address' = Address.from_bytes(key)
+        except Exception:
+            aggregator.skipped += 1
+            continue
+
+        aggregator.add(str(address), account.balance, getattr(account, 'stake', 0))
+
+    return aggregator
+
+
+class AccountScanner(object):
+    """Scan all accounts in statedb and report aggregates in one pass
+
+    """
+    FIELDNAMES = ('type', 'key', 'rank', 'count', 'value', 'balance', 'stake')
+
+    def __init__(self):
+        self._state_reader = StateDatabaseReader()
+
+    def open(self, db_path: str):
+        self._state_reader.open(db_path)
+
+    def run(self,
+            top_n: int = 100,
+            workers: int = 0,
+            chunk_size: int = 10000,
+            fmt: str = 'ndjson',
+            output_path: str = None) -> 'AccountAggregator':
+        """Aggregate all accounts and write the report
+
+        :param top_n: the number of top holders to report
+        :param workers: the number of worker processes decoding accounts. 0: no worker
+        :param chunk_size: the number of accounts passed to a worker at once
+        :param fmt: 'ndjson' or 'csv'
+        :param output_path: None or '-' means stdout
+        :return: aggregator
+        """
+        if workers > 0:
+            aggregator = self._scan_in_parallel(top_n, workers, chunk_size)
+        else:
+            aggregator = _aggregate_accounts(self._state_reader.iterate_account_items(), top_n)
+
+        writer = RecordWriter(fmt, list(self.FIELDNAMES))
+        writer.open(output_path)
+        try:
+            for record in aggregator.to_records():
+                writer.write(record)
+        finally:
+            writer.close()
+
+        return aggregator
+
+    def _scan_in_parallel(self, top_n: int, workers: int, chunk_size: int) -> 'AccountAggregator':
+        aggregator = AccountAggregator(top_n)
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # Limit the number of chunks in flight to keep memory usage bounded
+            results = map_in_order(
+                executor, partial(_aggregate_accounts, top_n=top_n), self._iterate_chunks(chunk_size), workers * 2)
+
+            for result in results:
+                aggregator.merge(result)
+
+        return aggregator
+
+    def _iterate_chunks(self, chunk_size: int) -> Iterator[list]:
+        chunk = []
+
+        for item in self._state_reader.iterate_account_items():
+            chunk.append(item)
+
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+
+        if chunk:
+            yield chunk
+
+    def close(self):
+        self._state_reader.close()
@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ICON Foundation Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, Optional
+
+import plyvel
+
+from .block_database_reader import BlockDatabaseReader
+from .invalid_transaction_checker import get_tx_hash, is_genesis_tx
+from .parallel import map_in_order, split_range
+from .tracing import CATEGORY_COMPUTE, CATEGORY_IO, traced
+
+LAST_HEIGHT_KEY = b'\x00last_height'
+ADDRESS_KEY_PREFIX = b'a'
+
+DIRECTION_FROM = 'from'
+DIRECTION_TO = 'to'
+DIRECTION_SELF = 'self'
+
+
+def _create_address_prefix(address: str) -> bytes:
+    return ADDRESS_KEY_PREFIX + address.encode() + b'|'
+
+
+def _create_index_key(address: str, height: int, tx_index: int) -> bytes:
+    return _create_address_prefix(address) + height.to_bytes(8, 'big') + tx_index.to_bytes(4, 'big')
+
+
+@traced('index.get_index_entries', CATEGORY_COMPUTE)
+def _get_index_entries(raw_blocks: list) -> tuple:
+    """Decode raw blocks and extract index entries: (address, height, tx_index, tx_hash, direction)
+
+    Run in a worker process
+
+    :param raw_blocks: list of (height, bytes)
+    :return: (the last height in raw_blocks, list of index entries)
+    """
+    if not raw_blocks:
+        return None, []
+
+    entries = []
+
+    for height, value in raw_blocks:
+        block: dict = json.loads(value)
+
+        for tx_index, tx in enumerate(BlockDatabaseReader.get_block_transactions(block)):
+            tx_hash: str = '' if is_genesis_tx(tx) else get_tx_hash(tx)
+            from_: Optional[str] = tx.get('from')
+            to: Optional[str] = tx.get('to')
+
+            if from_ is not None and from_ == to:
+                entries.append((from_, height, tx_index, tx_hash, DIRECTION_SELF))
+                continue
+
+            if from_ is not None:
+                entries.append((from_, height, tx_index, tx_hash, DIRECTION_FROM))
+            if to is not None:
+                entries.append((to, height, tx_index, tx_hash, DIRECTION_TO))
+
+            # genesis transaction
+            for account in tx.get('accounts', []):
+                entries.append((account['address'], height, tx_index, tx_hash, DIRECTION_TO))
+
+    return raw_blocks[-1][0], entries
+
+
+class AddressIndexer(object):
+    """Build a sidecar leveldb mapping address -> (height, tx_index, tx_hash)
+
+    key: b'a' + address + b'|' + height(8 bytes) + tx_index(4 bytes)
+    value: direction + b'|' + tx_hash
+
+    The index is updated incrementally from the next height of the last indexed block.
+    Each chunk of blocks is written with one write batch together with the last indexed height
+    """
+
+    def __init__(self):
+        self._block_reader = BlockDatabaseReader()
+        self._index_db = None
+
+    def open(self, db_path: str, index_path: str):
+        self._block_reader.open(db_path)
+        self._index_db = plyvel.DB(index_path, create_if_missing=True)
+
+    def get_last_indexed_height(self) -> int:
+        value: bytes = self._index_db.get(LAST_HEIGHT_KEY)
+        if value is None:
+            return -1
+
+        return int.from_bytes(value, 'big')
+
+    def run(self, end: int = -1, workers: int = 0, chunk_size: int = 1000) -> tuple:
+        """Index blocks from the next height of the last indexed block to end
+
+        :param end: end height, inclusive. negative value means the last block
+        :param workers: the number of worker processes decoding blocks. 0: no worker
+        :param chunk_size: the number of blocks written with one write batch
+        :return: (start height, end height, the number of index entries)
+        """
+        start: int = self.get_last_indexed_height() + 1
+        if end < 0:
+            end = self._block_reader.get_block_height(self._block_reader.get_last_block())
+
+        raw_block_chunks = (
+            self._block_reader.get_raw_blocks(chunk_start, chunk_end)
+            for chunk_start, chunk_end in split_range(start, end, chunk_size))
+
+        if workers > 0:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = map_in_order(executor, _get_index_entries, raw_block_chunks, workers * 2)
+                last_height, entry_count = self._write_index_entries(results)
+        else:
+            results = map(_get_index_entries, raw_block_chunks)
+            last_height, entry_count = self._write_index_entries(results)
+
+        return start, last_height, entry_count
+
+    def _write_index_entries(self, results: Iterator[tuple]) -> tuple:
+        """Write index entries of each chunk with its last height in one write batch
+
+        :param results: (last height of chunk, entries) in height order
+        :return: (last indexed height, the number of written entries)
+        """
+        last_height: int = self.get_last_indexed_height()
+        entry_count: int = 0
+
+        for chunk_last_height, entries in results:
+            if chunk_last_height is None:
+                # Reached the last block in the middle of the range
+                break
+
+            with self._index_db.write_batch(transaction=True) as write_batch:
+                for address, height, tx_index, tx_hash, direction in entries:
+                    key: bytes = _create_index_key(address, height, tx_index)
+                    write_batch.put(key, f'{direction}|{tx_hash}'.encode())
+
+                write_batch.put(LAST_HEIGHT_KEY, chunk_last_height.to_bytes(8, 'big'))
+
+            last_height = chunk_last_height
+            entry_count += len(entries)
+            print(f'indexed: {last_height}, entries: {entry_count}')
+
+        return last_height, entry_count
+
+    def close(self):
+        self._block_reader.close()
+
+        if self._index_db is not None:
+            self._index_db.close()
+            self._index_db = None
+
+
+class AddressIndexReader(object):
+    """Page through transactions of an address in the index built by AddressIndexer
+
+    """
+
+    def __init__(self):
+        self._index_db = None
+
+    def open(self, index_path: str):
+        self._index_db = plyvel.DB(index_path, create_if_missing=False)
+
+    @traced('index.query', CATEGORY_IO)
+    def query(self, address: str, limit: int = 100, cursor: str = None, reverse: bool = False) -> tuple:
+        """Return a page of transactions which an address sent or received
+
+        :param address: ex) hx677133298ed5319607a321a38169031a8867085c
+        :param limit: the maximum number of transactions in a page
+        :param cursor: next_cursor of the previous page
+        :param reverse: newest first
+        :return: (list of dict, next_cursor) next_cursor is None at the last page
+        """
+        prefix: bytes = _create_address_prefix(address)
+        # b'}' follows b'|'
+        start: bytes = prefix
+        stop: bytes = prefix[:-1] + b'}'
+
+        if cursor is not None:
+            height, tx_index = (int(value) for value in cursor.split(':'))
+            key: bytes = _create_index_key(address, height, tx_index)
+            if reverse:
+                stop = key
+            else:
+                start = key + b'\x00'
+
+        items = []
+        next_cursor: Optional[str] = None
+
+        with self._index_db.iterator(start=start, stop=stop, reverse=reverse) as it:
+            for key, value in it:
+                if len(items) >= limit:
+                    last: dict = items[-1]
+                    next_cursor = f'{last["height"]}:{last["tx_index"]}'
+                    break
+
+                items.append(self._create_item(key[len(prefix):], value))
+
+        return items, next_cursor
+
+    @staticmethod
+    def _create_item(suffix: bytes, value: bytes) -> dict:
+        direction, tx_hash = value.decode().split('|', 1)
+        return {
+            'height': int.from_bytes(suffix[:8], 'big'),
+            'tx_index': int.from_bytes(suffix[8:12], 'big'),
+            'tx_hash': tx_hash,
+            'direction': direction}
+
+    def iterate(self, address: str, reverse: bool = False) -> Iterator[dict]:
+        cursor: Optional[str] = None
+
+        while True:
+            items, cursor = self.query(address, cursor=cursor, reverse=reverse)
+            yield from items
+
+            if cursor is None:
+                break
+
+    def close(self):
+        if self._index_db is not None:
+            self._index_db.close()
+            self._index_db = None
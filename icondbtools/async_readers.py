@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ICON Foundation Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import TYPE_CHECKING, Optional
+
+from .block_database_reader import BlockDatabaseReader
+
+if TYPE_CHECKING:
+    from iconservice.base.address import Address
+    from iconservice.base.block import Block
+    from iconservice.icx.icx_account import Account
+
+
+class AsyncReader(object):
+    """Run lookups of a synchronous reader on a bounded thread pool for asyncio callers
+
+    * At most max_workers lookups run at once and at most max_pending are submitted to the pool.
+      Callers beyond them wait without blocking the event loop
+    * Concurrent lookups of the same key share one call to the reader
+    * A cancelled caller stops waiting. The lookup itself is cancelled
+      if it has not started yet and no other caller is waiting for it
+    """
+
+    def __init__(self, reader, max_workers: int = 8, max_pending: int = 1000):
+        self._reader = reader
+        self._max_workers: int = max_workers
+        self._max_pending: int = max_pending
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        # (method name, args) -> [future, the number of waiting callers]
+        self._pending: dict = {}
+
+    def open(self, *args, **kwargs):
+        self._reader.open(*args, **kwargs)
+        self._executor = ThreadPoolExecutor(max_workers=self._max_workers)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+        self._reader.close()
+        self._pending = {}
+
+    async def _call(self, name: str, *args):
+        key = (name, args)
+        entry: Optional[list] = self._pending.get(key)
+
+        if entry is None:
+            if self._semaphore is None:
+                self._semaphore = asyncio.Semaphore(self._max_pending)
+
+            entry = [asyncio.ensure_future(self._run(name, args)), 0]
+            self._pending[key] = entry
+            entry[0].add_done_callback(lambda _: self._pending.pop(key, None))
+
+        future, _ = entry
+        entry[1] += 1
+
+        try:
+            # shield: one cancelled caller must not cancel the lookup shared with others
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            if entry[1] == 1 and not future.done():
+                future.cancel()
+            raise
+        finally:
+            entry[1] -= 1
+
+    async def _run(self, name: str, args: tuple):
+        async with self._semaphore:
+            loop = asyncio.get_event_loop()
+            return await loop.run_in_executor(self._executor, partial(getattr(self._reader, name), *args))
+
+
+class AsyncBlockDatabaseReader(AsyncReader):
+    """asyncio wrapper of BlockDatabaseReader
+
+    """
+
+    def __init__(self, max_workers: int = 8, max_pending: int = 1000):
+        super().__init__(BlockDatabaseReader(), max_workers, max_pending)
+
+    async def get_block_by_block_height(self, block_height: int) -> Optional[dict]:
+        return await self._call('get_block_by_block_height', block_height)
+
+    async def get_block_by_block_hash(self, block_hash: str) -> Optional[dict]:
+        return await self._call('get_block_by_block_hash', block_hash)
+
+    async def get_last_block(self) -> Optional[dict]:
+        return await self._call('get_last_block')
+
+    async def get_transaction_result_by_hash(self, tx_hash: str) -> Optional[dict]:
+        return await self._call('get_transaction_result_by_hash', tx_hash)
+
+
+class AsyncStateDatabaseReader(AsyncReader):
+    """asyncio wrapper of StateDatabaseReader
+
+    """
+
+    def __init__(self, max_workers: int = 8, max_pending: int = 1000):
+        from .state_database_reader import StateDatabaseReader
+
+        super().__init__(StateDatabaseReader(), max_workers, max_pending)
+
+    async def get_account(self, address: 'Address') -> Optional['Account']:
+        return await self._call('get_account', address)
+
+    async def get_last_block(self) -> Optional['Block']:
+        return await self._call('get_last_block')
+
+    async def get_dict_db_value(
+            self, score_address: 'Address', dict_db_name: str, address: 'Address') -> Optional[bytes]:
+        return await self._call('get_dict_db_value', score_address, dict_db_name, address)
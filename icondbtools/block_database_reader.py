@@ -16,10 +16,16 @@
 import json
 import sys
 import time
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 import plyvel
 
+from . import tracing
+from .tracing import CATEGORY_DECODE, CATEGORY_IO, traced
+
+if TYPE_CHECKING:
+    from .block_time_index import BlockTimeIndex
+
 
 class BlockDatabaseReader(object):
     """Read block data from leveldb managed by loopchain
@@ -27,6 +33,7 @@ class BlockDatabaseReader(object):
 
     def __init__(self):
         self._db = None
+        self._time_index: Optional['BlockTimeIndex'] = None
 
     def open(self, db_path: str):
         self._db = plyvel.DB(db_path)
@@ -36,16 +43,113 @@ class BlockDatabaseReader(object):
             self._db.close()
             self._db = None
 
-    def get_block_by_block_height(self, block_height: int) -> Optional[dict]:
-        key_prefix = b'block_height_key'
-        block_height_key = key_prefix + block_height.to_bytes(12, 'big')
+    @staticmethod
+    def create_block_height_key(block_height: int) -> bytes:
+        """Return the key of which value is the key of the block at a height
 
-        key: bytes = self._db.get(block_height_key)
+        """
+        return b'block_height_key' + block_height.to_bytes(12, 'big')
+
+    @traced('block_db.get_block_by_block_height', CATEGORY_IO)
+    def get_block_by_block_height(self, block_height: int) -> Optional[dict]:
+        key: bytes = self.get_block_key_by_block_height(block_height)
         if key is None:
             return
 
         return self.get_block_by_key(key)
 
+    @traced('block_db.get_raw_block_by_block_height', CATEGORY_IO)
+    def get_raw_block_by_block_height(self, block_height: int) -> Optional[bytes]:
+        """Get block data without decoding it
+
+        :param block_height:
+        :return: utf-8 encoded text in json format
+        """
+        key: bytes = self.get_block_key_by_block_height(block_height)
+        if key is None:
+            return
+
+        return self._db.get(key)
+
+    def get_block_key_by_block_height(self, block_height: int) -> Optional[bytes]:
+        """Get the key of a block which block_height_key points to
+
+        :param block_height:
+        :return: utf-8 encoded bytes of block_hash hexa string
+        """
+        return self._db.get(self.create_block_height_key(block_height))
+
+    @traced('block_db.get_raw_blocks', CATEGORY_IO)
+    def get_raw_blocks(self, start: int, end: int) -> list:
+        """Get block data in [start, end] without decoding them
+
+        Stop at the first missing height
+
+        :return: list of (height, bytes)
+        """
+        blocks = []
+
+        for height in range(start, end + 1):
+            value: bytes = self.get_raw_block_by_block_height(height)
+            if value is None:
+                break
+
+            blocks.append((height, value))
+
+        return blocks
+
+    def set_time_index(self, time_index: Optional['BlockTimeIndex']):
+        """Set the cache of block timestamps used by find_block_height_by_timestamp()
+
+        """
+        self._time_index = time_index
+
+    def get_block_timestamp_by_block_height(self, block_height: int) -> Optional[int]:
+        if self._time_index is not None:
+            timestamp_us: Optional[int] = self._time_index.get(block_height)
+            if timestamp_us is not None:
+                return timestamp_us
+
+        block: dict = self.get_block_by_block_height(block_height)
+        if block is None:
+            return None
+
+        timestamp_us: int = self.get_block_timestamp(block)
+        if self._time_index is not None:
+            self._time_index.put(block_height, timestamp_us)
+
+        return timestamp_us
+
+    def find_block_height_by_timestamp(self, timestamp_us: int, right: bool = False) -> int:
+        """Find a block height by binary search over monotonic block timestamps
+
+        left: the first height of which timestamp >= timestamp_us
+        right: the first height of which timestamp > timestamp_us
+
+        :param timestamp_us: timestamp in microseconds
+        :param right:
+        :return: last block height + 1 if there is no such block
+        :raise ValueError: a block probed by the search is missing
+        """
+        lo: int = 0
+        hi: int = self.get_block_height(self.get_last_block()) + 1
+
+        if self._time_index is not None:
+            lo, hi = self._time_index.get_bounds(timestamp_us, lo, hi, right)
+
+        while lo < hi:
+            mid: int = (lo + hi) // 2
+            block_timestamp_us: Optional[int] = self.get_block_timestamp_by_block_height(mid)
+            if block_timestamp_us is None:
+                raise ValueError(f'Block not found: height({mid}). Can not search blocks by timestamp')
+
+            if block_timestamp_us < timestamp_us or (right and block_timestamp_us == timestamp_us):
+                lo = mid + 1
+            else:
+                hi = mid
+
+        return lo
+
     def get_block_by_block_hash(self, block_hash: str) -> Optional[dict]:
         """Get block data with hexa string representing block hash
 
@@ -54,6 +158,14 @@ class BlockDatabaseReader(object):
         """
         return self.get_block_by_key(block_hash.encode())
 
+    def get_raw_block_by_block_hash(self, block_hash: str) -> Optional[bytes]:
+        """Get block data with hexa string representing block hash without decoding it
+
+        :param block_hash: hexa string without '0x' prefix
+        :return: utf-8 encoded text in json format
+        """
+        return self._db.get(block_hash.encode())
+
     def get_block_by_key(self, key: bytes) -> Optional[dict]:
         """key is utf-8 encoded bytes of block_hash hexa string
 
@@ -61,8 +173,10 @@ class BlockDatabaseReader(object):
         :return:
         """
 
-        value: bytes = self._db.get(key)
-        block: dict = json.loads(value)
+        with tracing.span('block_db.get', CATEGORY_IO):
+            value: bytes = self._db.get(key)
+        with tracing.span('block_db.json_loads', CATEGORY_DECODE):
+            block: dict = json.loads(value)
         return block
 
     def get_last_block(self) -> Optional[dict]:
@@ -75,10 +189,24 @@ class BlockDatabaseReader(object):
             tx_hash = tx_hash[2:]
 
         key: bytes = tx_hash.encode()
-        value: bytes = self._db.get(key)
-        tx_result: dict = json.loads(value)
+        with tracing.span('block_db.get', CATEGORY_IO):
+            value: bytes = self._db.get(key)
+        with tracing.span('block_db.json_loads', CATEGORY_DECODE):
+            tx_result: dict = json.loads(value)
         return tx_result
 
+    @traced('block_db.get_raw_transaction_result_by_hash', CATEGORY_IO)
+    def get_raw_transaction_result_by_hash(self, tx_hash: str) -> Optional[bytes]:
+        """Get transaction result without decoding it
+
+        :param tx_hash: hexa string with or without '0x' prefix
+        :return: utf-8 encoded text in json format
+        """
+        if tx_hash.startswith('0x'):
+            tx_hash = tx_hash[2:]
+
+        return self._db.get(tx_hash.encode())
+
     def get_state_root_hash_by_block_height(
             self, block_height: int) -> Optional[bytes]:
         block: dict = self.get_block_by_block_height(block_height)
@@ -88,6 +216,53 @@ class BlockDatabaseReader(object):
         block: dict = self.get_block_by_block_hash(block_hash)
         return self.get_commit_state(block)
 
+    @staticmethod
+    def get_block_height(block: dict) -> int:
+        """Return the height of a block in v0.1a (int) or newer (hexa string) schema"""
+        height = block['height']
+        return height if isinstance(height, int) else int(height, 16)
+
+    @staticmethod
+    def get_block_timestamp(block: dict) -> int:
+        """Return the timestamp in microseconds of a block in v0.1a ('time_stamp') or newer ('timestamp') schema"""
+        timestamp = block.get('timestamp')
+        if timestamp is None:
+            return block['time_stamp']
+
+        return timestamp if isinstance(timestamp, int) else int(timestamp, 16)
+
+    @staticmethod
+    def get_block_hash(block: dict) -> str:
+        """Return the hash of a block in v0.1a ('block_hash') or newer ('hash') schema without '0x' prefix"""
+        block_hash: str = block.get('block_hash')
+        if block_hash is None:
+            block_hash = block['hash']
+
+        return block_hash[2:] if block_hash.startswith('0x') else block_hash
+
+    @staticmethod
+    def get_prev_block_hash(block: dict) -> str:
+        """Return the previous block hash in v0.1a ('prev_block_hash') or newer ('prevHash') schema without '0x' prefix
+
+        Empty string for the genesis block
+        """
+        prev_hash: Optional[str] = block.get('prev_block_hash')
+        if prev_hash is None:
+            prev_hash = block.get('prevHash')
+        if not prev_hash:
+            return ''
+
+        return prev_hash[2:] if prev_hash.startswith('0x') else prev_hash
+
+    @staticmethod
+    def get_block_transactions(block: dict) -> list:
+        """Return the transactions of a block in v0.1a ('confirmed_transaction_list') or newer ('transactions') schema"""
+        transactions = block.get('transactions')
+        if transactions is None:
+            return block['confirmed_transaction_list']
+
+        return transactions
+
     @staticmethod
     def get_commit_state(block: dict, channel: str='icon_dex', default_value: bytes=None) -> Optional[bytes]:
         try:
@@ -124,7 +299,7 @@ def read_blocks(reader, start_height: int, count: int):
             if i % 100 == 0:
                 print(f'block: {i}')
 
-            f.write(f'{block}\n')
+            f.write(f'{json.dumps(block)}\n')
 
     end_time = time.time()
     print(f'elapsed time: {end_time - start_time}')
@@ -0,0 +1,355 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ICON Foundation Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import bisect
+import glob
+import gzip
+import itertools
+import json
+import os
+import struct
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Iterator, Optional
+
+from . import tracing
+from .block_database_reader import BlockDatabaseReader
+from .invalid_transaction_checker import get_tx_hashes
+from .parallel import map_in_order, split_range
+from .tracing import CATEGORY_COMPUTE, CATEGORY_DECODE, CATEGORY_IO, traced
+
+MANIFEST_FILE_NAME = 'manifest.json'
+FORMATS = ('ndjson', 'gzip')
+FILE_EXTENSIONS = {'ndjson': '.ndjson', 'gzip': '.ndjson.gz'}
+
+# Index entry of a frame: the height of the first block in the frame, byte offset, byte length
+INDEX_ENTRY = struct.Struct('>QQI')
+
+
+def get_chunk_file_name(chunk_start: int, chunk_end: int, fmt: str) -> str:
+    return f'blocks-{chunk_start:012d}-{chunk_end:012d}{FILE_EXTENSIONS[fmt]}'
+
+
+def _to_single_line(value: bytes) -> bytes:
+    if b'\n' in value or b'\r' in value:
+        return json.dumps(json.loads(value), separators=(',', ':')).encode()
+    return value
+
+
+def _create_record_line(height: int, raw_block: bytes, raw_tx_results: Optional[list]) -> bytes:
+    """Create one ndjson line: {"height": int, "block": {...}, "tx_results": [...]}
+
+    Values read from loopchain db are already json. They are embedded as they are without decoding
+    """
+    line: bytes = b'{"height":%d,"block":%s' % (height, _to_single_line(raw_block))
+
+    if raw_tx_results is not None:
+        tx_results = [b'null' if value is None else _to_single_line(value) for value in raw_tx_results]
+        line += b',"tx_results":[' + b','.join(tx_results) + b']'
+
+    return line + b'}\n'
+
+
+@traced('export.encode_chunk', CATEGORY_COMPUTE)
+def _encode_chunk(args: tuple) -> tuple:
+    """Encode the records of a chunk into frames
+
+    Run in a worker process.
+    Each gzip frame is an independent gzip member, so a frame can be read with its byte range
+    and the whole file is still a valid gzip stream
+
+    :param args: (records, fmt, frame_size) records: list of (height, raw_block, raw_tx_results or None)
+    :return: (the number of records, data, list of index entries (first height, offset, length))
+    """
+    records, fmt, frame_size = args
+    data = bytearray()
+    index = []
+
+    for i in range(0, len(records), frame_size):
+        frame: bytes = b''.join(_create_record_line(*record) for record in records[i:i + frame_size])
+        if fmt == 'gzip':
+            frame = gzip.compress(frame)
+
+        index.append((records[i][0], len(data), len(frame)))
+        data += frame
+
+    return len(records), bytes(data), index
+
+
+class BlockExporter(object):
+    """Export blocks and transaction results in a height range to chunk files
+
+    output_dir/
+        manifest.json: export parameters
+        blocks-{chunk start}-{chunk end}.ndjson(.gz): records of blocks in the chunk
+        blocks-{chunk start}-{chunk end}.ndjson(.gz).idx: INDEX_ENTRY of each frame
+
+    A chunk file and its index are renamed from temporary files when completed.
+    Export is resumed by skipping chunks of which index files exist
+    """
+
+    def __init__(self):
+        self._block_reader = BlockDatabaseReader()
+
+    def open(self, db_path: str):
+        self._block_reader.open(db_path)
+
+    def close(self):
+        self._block_reader.close()
+
+    def run(self,
+            output_dir: str,
+            start: int,
+            end: int,
+            fmt: str = 'ndjson',
+            chunk_size: int = 10000,
+            frame_size: int = 100,
+            include_tx_results: bool = False,
+            workers: int = 0) -> tuple:
+        """Export blocks in [start, end]
+
+        :param output_dir:
+        :param start: start height. Chunks are aligned from start
+        :param end: end height, inclusive. negative value means the last block
+        :param fmt: 'ndjson' or 'gzip'
+        :param chunk_size: the number of blocks in a chunk file
+        :param frame_size: the number of blocks in a frame which is the unit of compression and seek
+        :param include_tx_results: add the transaction results of each block
+        :param workers: the number of worker processes encoding chunks. 0: no worker
+        :return: (the number of exported chunks, the number of skipped chunks)
+        """
+        if fmt not in FORMATS:
+            raise ValueError(f'Invalid format: {fmt}')
+
+        if end < 0:
+            end = self._block_reader.get_block_height(self._block_reader.get_last_block())
+
+        os.makedirs(output_dir, exist_ok=True)
+        self._check_manifest(output_dir, {
+            'start': start,
+            'format': fmt,
+            'chunk_size': chunk_size,
+            'frame_size': frame_size,
+            'include_tx_results': include_tx_results})
+
+        chunks = []
+        skipped: int = 0
+        for chunk_start, chunk_end in split_range(start, end, chunk_size):
+            path: str = os.path.join(output_dir, get_chunk_file_name(chunk_start, chunk_end, fmt))
+            if os.path.exists(f'{path}.idx'):
+                skipped += 1
+            else:
+                chunks.append((chunk_start, chunk_end))
+
+        if workers > 0:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                exported: int = self._export_chunks(
+                    output_dir, chunks, fmt, frame_size, include_tx_results, executor, workers * 2)
+        else:
+            exported: int = self._export_chunks(output_dir, chunks, fmt, frame_size, include_tx_results)
+
+        return exported, skipped
+
+    @staticmethod
+    def _check_manifest(output_dir: str, manifest: dict):
+        path: str = os.path.join(output_dir, MANIFEST_FILE_NAME)
+
+        if os.path.exists(path):
+            with open(path, 'rt') as f:
+                prev_manifest: dict = json.load(f)
+
+            if prev_manifest != manifest:
+                raise ValueError(f'Export parameters differ from {path}: {prev_manifest}')
+            return
+
+        with open(path, 'wt') as f:
+            json.dump(manifest, f, indent=2)
+
+    def _export_chunks(self,
+                       output_dir: str,
+                       chunks: list,
+                       fmt: str,
+                       frame_size: int,
+                       include_tx_results: bool,
+                       executor: Optional['Executor'] = None,
+                       max_pending: int = 0) -> int:
+        records = self._iterate_chunk_records(chunks, include_tx_results, executor, max_pending)
+        tasks = ((chunk_records, fmt, frame_size) for chunk_records in records)
+
+        if executor is None:
+            results = map(_encode_chunk, tasks)
+        else:
+            results = map_in_order(executor, _encode_chunk, tasks, max_pending)
+
+        exported: int = 0
+
+        for (chunk_start, chunk_end), (count, data, index) in zip(chunks, results):
+            if count < chunk_end - chunk_start + 1:
+                # Reached the last block in the middle of the chunk.
+                # Only full chunks are written so that file names stay valid on resume
+                print(f'last block: {chunk_start + count - 1}')
+                break
+
+            self._remove_chunk(output_dir, chunk_start, fmt)
+            self._write_chunk(os.path.join(output_dir, get_chunk_file_name(chunk_start, chunk_end, fmt)), data, index)
+            exported += 1
+            print(f'exported: {chunk_start} ~ {chunk_end}')
+
+        return exported
+
+    def _iterate_chunk_records(self,
+                               chunks: list,
+                               include_tx_results: bool,
+                               executor: Optional['Executor'],
+                               max_pending: int) -> Iterator[list]:
+        """Read raw blocks and raw transaction results of each chunk
+
+        :return: list of (height, raw_block, raw_tx_results or None) generator
+        """
+        raw_block_chunks = (self._block_reader.get_raw_blocks(chunk_start, chunk_end)
+                            for chunk_start, chunk_end in chunks)
+
+        if not include_tx_results:
+            for raw_blocks in raw_block_chunks:
+                yield [(height, raw_block, None) for height, raw_block in raw_blocks]
+            return
+
+        if executor is None:
+            raw_block_chunks, tx_hash_chunks = raw_block_chunks, None
+        else:
+            # Decoding blocks to get transaction hashes is done in workers
+            raw_block_chunks, raw_block_chunks_copy = itertools.tee(raw_block_chunks)
+            tx_hash_chunks = map_in_order(executor, get_tx_hashes, raw_block_chunks_copy, max_pending)
+
+        for raw_blocks in raw_block_chunks:
+            tx_hashes: list = get_tx_hashes(raw_blocks) if tx_hash_chunks is None else next(tx_hash_chunks)
+
+            tx_results = {height: [] for height, _ in raw_blocks}
+            for height, tx_hash in tx_hashes:
+                tx_results[height].append(self._block_reader.get_raw_transaction_result_by_hash(tx_hash))
+
+            yield [(height, raw_block, tx_results[height]) for height, raw_block in raw_blocks]
+
+    @staticmethod
+    def _remove_chunk(output_dir: str, chunk_start: int, fmt: str):
+        """Remove the shorter chunk exported before with an earlier end height
+
+        """
+        pattern: str = os.path.join(output_dir, f'blocks-{chunk_start:012d}-*{FILE_EXTENSIONS[fmt]}')
+        for path in glob.glob(pattern):
+            os.remove(path)
+            if os.path.exists(f'{path}.idx'):
+                os.remove(f'{path}.idx')
+
+    @staticmethod
+    @traced('export.write_chunk', CATEGORY_IO)
+    def _write_chunk(path: str, data: bytes, index: list):
+        with open(f'{path}.tmp', 'wb') as f:
+            f.write(data)
+        os.replace(f'{path}.tmp', path)
+
+        with open(f'{path}.idx.tmp', 'wb') as f:
+            for entry in index:
+                f.write(INDEX_ENTRY.pack(*entry))
+        os.replace(f'{path}.idx.tmp', f'{path}.idx')
+
+
+class BlockArchiveReader(object):
+    """Read records from chunk files written by BlockExporter
+
+    Only the frames which contain requested heights are read, by their byte ranges in the chunk index
+    """
+
+    def __init__(self):
+        self._archive_dir: Optional[str] = None
+        self._manifest: dict = {}
+        # list of (chunk start, chunk end, path) sorted by chunk start
+        self._chunks: list = []
+
+    def open(self, archive_dir: str):
+        with open(os.path.join(archive_dir, MANIFEST_FILE_NAME), 'rt') as f:
+            self._manifest = json.load(f)
+
+        self._archive_dir = archive_dir
+        self._chunks = []
+
+        extension: str = FILE_EXTENSIONS[self._manifest['format']]
+        for index_path in glob.glob(os.path.join(archive_dir, f'blocks-*{extension}.idx')):
+            path: str = index_path[:-len('.idx')]
+            chunk_start, chunk_end = os.path.basename(path)[len('blocks-'):-len(extension)].split('-')
+            self._chunks.append((int(chunk_start), int(chunk_end), path))
+
+        self._chunks.sort()
+
+    def close(self):
+        self._archive_dir = None
+        self._chunks = []
+
+    @property
+    def manifest(self) -> dict:
+        return self._manifest
+
+    def get_last_height(self) -> int:
+        """Return the end height of the last chunk. -1 if no chunk is present
+
+        """
+        return self._chunks[-1][1] if self._chunks else -1
+
+    def get_record(self, height: int) -> Optional[dict]:
+        for record in self.iterate_records(height, height):
+            return record
+
+        return None
+
+    def iterate_records(self, start: int, end: int) -> Iterator[dict]:
+        """Iterate over records of blocks in [start, end]. Stop at the first missing height
+
+        :return: {"height": int, "block": dict, "tx_results": list} generator
+        """
+        height: int = start
+
+        while height <= end:
+            i: int = bisect.bisect_right(self._chunks, (height, float('inf'))) - 1
+            if i < 0 or self._chunks[i][1] < height:
+                return
+
+            chunk_end, path = self._chunks[i][1:]
+            for record in self._read_chunk(path, height, min(end, chunk_end)):
+                yield record
+
+            height = chunk_end + 1
+
+    def _read_chunk(self, path: str, start: int, end: int) -> Iterator[dict]:
+        with open(f'{path}.idx', 'rb') as f:
+            index = list(INDEX_ENTRY.iter_unpack(f.read()))
+
+        i: int = max(bisect.bisect_right([entry[0] for entry in index], start) - 1, 0)
+
+        with open(path, 'rb') as f:
+            for first_height, offset, length in index[i:]:
+                if first_height > end:
+                    break
+
+                with tracing.span('archive.read_frame', CATEGORY_IO, height=first_height):
+                    f.seek(offset)
+                    frame: bytes = f.read(length)
+                if self._manifest['format'] == 'gzip':
+                    with tracing.span('archive.decompress', CATEGORY_DECODE):
+                        frame = gzip.decompress(frame)
+
+                for line in frame.splitlines():
+                    with tracing.span('archive.json_loads', CATEGORY_DECODE):
+                        record: dict = json.loads(line)
+                    if start <= record['height'] <= end:
+                        yield record
@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ICON Foundation Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import queue
+import threading
+from typing import Iterator, Optional
+
+from .block_database_reader import BlockDatabaseReader
+from .block_exporter import BlockArchiveReader
+from .db_snapshot import DatabaseSnapshot
+from .invalid_transaction_checker import get_block_tx_hashes
+
+ARCHIVE_SOURCE_PREFIX = 'archive:'
+DATABASE_SOURCE_PREFIX = 'db:'
+
+
+class BlockSource(object):
+    """Blocks and transaction results which IconServiceSyncer replays
+
+    """
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def iterate_blocks(self, start: int, end: int) -> Iterator[dict]:
+        """Iterate over blocks in [start, end] in height order. Stop at the first missing height
+
+        :return: block dict generator
+        """
+        raise NotImplementedError()
+
+    def follow_blocks(self,
+                      start: int,
+                      end: int,
+                      stop_event: 'threading.Event',
+                      min_interval: float = 0.5,
+                      max_interval: float = 30.0) -> Iterator[dict]:
+        """Iterate over blocks in [start, end] waiting for missing heights to be appended
+
+        When no block is left, the source is closed and opened again after an interval
+        which doubles on every empty poll up to max_interval and is reset when a block arrives.
+        Reopening makes blocks written by other processes visible
+        and the source holds no db lock while waiting
+
+        :param start: start height
+        :param end: end height, inclusive
+        :param stop_event: stop waiting and return when it is set
+        :param min_interval: seconds to wait after a poll which found blocks
+        :param max_interval: the longest seconds to wait between polls
+        :return: block dict generator
+        """
+        height: int = start
+        empty_polls: int = 0
+
+        while True:
+            found: bool = False
+            for block in self.iterate_blocks(height, end):
+                yield block
+                height += 1
+                found = True
+
+            if height > end:
+                return
+
+            empty_polls = 0 if found else empty_polls + 1
+            interval: float = min(min_interval * 2 ** max(empty_polls - 1, 0), max_interval)
+            self.close()
+            if stop_event.wait(interval):
+                return
+
+            self.open()
+
+    def get_transaction_result_by_hash(self, tx_hash: str) -> Optional[dict]:
+        """Get the transaction result of a transaction in the block yielded last
+
+        :param tx_hash: hexa string with or without '0x' prefix
+        :return:
+        """
+        raise NotImplementedError()
+
+
+class DatabaseBlockSource(BlockSource):
+    """Read blocks from leveldb managed by loopchain with random gets
+
+    """
+
+    def __init__(self, db_path: str, snapshot: bool = False):
+        """
+        :param db_path: loopchain db path
+        :param snapshot: open a hard-linked checkpoint of db_path created on every open()
+        """
+        self._db_path: str = db_path
+        self._block_reader = BlockDatabaseReader()
+        self._snapshot: Optional['DatabaseSnapshot'] = DatabaseSnapshot() if snapshot else None
+
+    def open(self):
+        if self._snapshot is None:
+            self._block_reader.open(self._db_path)
+        else:
+            self._block_reader.open(self._snapshot.open(self._db_path))
+
+    def close(self):
+        self._block_reader.close()
+        if self._snapshot is not None:
+            self._snapshot.close()
+
+    def iterate_blocks(self, start: int, end: int) -> Iterator[dict]:
+        for height in range(start, end + 1):
+            block: Optional[dict] = self._block_reader.get_block_by_block_height(height)
+            if block is None:
+                break
+
+            yield block
+
+    def get_transaction_result_by_hash(self, tx_hash: str) -> Optional[dict]:
+        return self._block_reader.get_transaction_result_by_hash(tx_hash)
+
+
+class ArchiveBlockSource(BlockSource):
+    """Read blocks sequentially from chunk files written by BlockExporter
+
+    A background thread reads and decompresses records ahead of the consumer into a bounded queue
+    """
+    _END = object()
+
+    def __init__(self, archive_dir: str, readahead: int = 1000):
+        """
+        :param archive_dir: output directory of export command
+        :param readahead: the maximum number of records read ahead
+        """
+        self._archive_dir: str = archive_dir
+        self._readahead: int = readahead
+        self._reader = BlockArchiveReader()
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        # tx_hash without '0x' -> transaction result of the block yielded last
+        self._tx_results: dict = {}
+
+    def open(self):
+        self._reader.open(self._archive_dir)
+
+    def close(self):
+        self._stop_reading()
+        self._reader.close()
+
+    def iterate_blocks(self, start: int, end: int) -> Iterator[dict]:
+        self._stop_reading()
+
+        records = queue.Queue(maxsize=self._readahead)
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(
+            target=self._read_records, args=(start, end, records, self._stop_event), daemon=True)
+        self._thread.start()
+
+        include_tx_results: bool = self._reader.manifest.get('include_tx_results', False)
+
+        while True:
+            record = records.get()
+            if record is self._END:
+                break
+            if isinstance(record, Exception):
+                raise record
+
+            block: dict = record['block']
+            if include_tx_results:
+                self._tx_results = {
+                    self._remove_hex_prefix(tx_hash): tx_result
+                    for tx_hash, tx_result in zip(get_block_tx_hashes(block), record['tx_results'])}
+
+            yield block
+
+    def _read_records(self, start: int, end: int, records: 'queue.Queue', stop_event: 'threading.Event'):
+        try:
+            for record in self._reader.iterate_records(start, end):
+                if not self._put(records, record, stop_event):
+                    return
+        except Exception as e:
+            self._put(records, e, stop_event)
+            return
+
+        self._put(records, self._END, stop_event)
+
+    @staticmethod
+    def _put(records: 'queue.Queue', item, stop_event: 'threading.Event') -> bool:
+        while not stop_event.is_set():
+            try:
+                records.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+
+        return False
+
+    def _stop_reading(self):
+        if self._thread is None:
+            return
+
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+
+    def get_transaction_result_by_hash(self, tx_hash: str) -> Optional[dict]:
+        if not self._reader.manifest.get('include_tx_results', False):
+            raise ValueError(f'{self._archive_dir} was exported without transaction results')
+
+        return self._tx_results.get(self._remove_hex_prefix(tx_hash))
+
+    @staticmethod
+    def _remove_hex_prefix(value: str) -> str:
+        return value[2:] if value.startswith('0x') else value
+
+
+def create_block_source(source: str, snapshot: bool = False) -> 'BlockSource':
+    """Create a block source from its description
+
+    :param source: 'archive:<export directory>', 'db:<loopchain db path>' or loopchain db path
+    :param snapshot: read hard-linked checkpoints of loopchain db. Ignored for archives
+    :return:
+    """
+    if source.startswith(ARCHIVE_SOURCE_PREFIX):
+        return ArchiveBlockSource(source[len(ARCHIVE_SOURCE_PREFIX):])
+    if source.startswith(DATABASE_SOURCE_PREFIX):
+        return DatabaseBlockSource(source[len(DATABASE_SOURCE_PREFIX):], snapshot)
+
+    return DatabaseBlockSource(source, snapshot)
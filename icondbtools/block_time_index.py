@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ICON Foundation Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import bisect
+import json
+import os
+from datetime import datetime
+from typing import Optional
+
+
+def parse_datetime_to_us(value: str) -> int:
+    """Convert ISO 8601 datetime string to timestamp in microseconds
+
+    Naive datetime is regarded as local time
+
+    :param value: ex) '2018-12-19 14:00', '2018-12-19T14:00:00+09:00'
+    :return:
+    """
+    return int(datetime.fromisoformat(value).timestamp() * 10 ** 6)
+
+
+class BlockTimeIndex(object):
+    """Sparse cache of (height, timestamp) pairs probed by binary searches over blocks
+
+    Block timestamps are monotonic, so cached pairs narrow the bounds of later searches.
+    The cache can be saved to a json file and reused by the next run on the same db
+    """
+
+    def __init__(self, path: str = None, db_id: str = None):
+        """
+        :param path: json file path
+        :param db_id: identity of the db which the cache is built from. ex) genesis block hash
+            The cache saved from another db is not loaded
+        """
+        self._path: Optional[str] = path
+        self._db_id: Optional[str] = db_id
+        self._heights: list = []
+        self._timestamps: list = []
+        self._dirty: bool = False
+
+    def load(self):
+        if self._path is None or not os.path.exists(self._path):
+            return
+
+        with open(self._path, 'rt') as f:
+            data: dict = json.load(f)
+
+        if data.get('db_id') != self._db_id:
+            return
+
+        self._heights = data['heights']
+        self._timestamps = data['timestamps']
+        self._dirty = False
+
+    def save(self):
+        if self._path is None or not self._dirty:
+            return
+
+        with open(self._path, 'wt') as f:
+            json.dump({'db_id': self._db_id, 'heights': self._heights, 'timestamps': self._timestamps}, f)
+
+        self._dirty = False
+
+    def __len__(self) -> int:
+        return len(self._heights)
+
+    def get(self, height: int) -> Optional[int]:
+        i: int = bisect.bisect_left(self._heights, height)
+        if i < len(self._heights) and self._heights[i] == height:
+            return self._timestamps[i]
+
+        return None
+
+    def put(self, height: int, timestamp_us: int):
+        i: int = bisect.bisect_left(self._heights, height)
+        if i < len(self._heights) and self._heights[i] == height:
+            return
+
+        self._heights.insert(i, height)
+        self._timestamps.insert(i, timestamp_us)
+        self._dirty = True
+
+    def get_bounds(self, timestamp_us: int, lo: int, hi: int, right: bool = False) -> tuple:
+        """Narrow the height range where the searched height is located
+
+        left: the first height of which timestamp >= timestamp_us
+        right: the first height of which timestamp > timestamp_us
+
+        :return: (lo, hi)
+        """
+        if right:
+            i: int = bisect.bisect_right(self._timestamps, timestamp_us)
+        else:
+            i: int = bisect.bisect_left(self._timestamps, timestamp_us)
+
+        if i > 0:
+            lo = max(lo, self._heights[i - 1] + 1)
+        if i < len(self._heights):
+            hi = min(hi, self._heights[i])
+
+        return lo, max(lo, hi)
@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ICON Foundation Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import importlib
+import os
+import sys
+from typing import Optional
+
+from .block_database_reader import BlockDatabaseReader
+from .invalid_transaction_checker import check_zero_fee_tx_result, get_tx_hash, is_genesis_tx
+from .tracing import CATEGORY_COMPUTE, traced
+
+
+class ScanRule(object):
+    """Base class of rules which ChainScanner feeds blocks and transaction results to
+
+    Override on_block(), on_transaction() and finish() as needed
+    """
+    NAME = ''
+    # ChainScanner reads transaction results only if any of its rules needs them
+    NEEDS_TX_RESULTS = True
+
+    def __init__(self):
+        self._sink = None
+
+    def open(self, sink):
+        """Set the text stream where this rule writes its findings
+
+        :param sink: text file object
+        """
+        self._sink = sink
+
+    def on_block(self, height: int, block: dict):
+        pass
+
+    def on_transaction(self, height: int, tx_index: int, tx: dict, tx_result: Optional[dict]):
+        """Called for each transaction in a block after on_block()
+
+        :param height: block height
+        :param tx_index: index of tx in the block
+        :param tx: transaction in block
+        :param tx_result: transaction result stored in loopchain db.
+            None if NEEDS_TX_RESULTS is False or tx is the genesis transaction which has no result
+        """
+        pass
+
+    def finish(self) -> dict:
+        """Called once after the last block
+
+        :return: summary
+        """
+        return {}
+
+    def write(self, line: str):
+        self._sink.write(f'{line}\n')
+
+
+class ZeroFeeRule(ScanRule):
+    """Find transactions which succeeded without any fee charged
+
+    Same check as InvalidTransactionChecker
+    """
+    NAME = 'zerofee'
+
+    def __init__(self):
+        super().__init__()
+        self._tx_count: int = 0
+        self._invalid_tx_count: int = 0
+
+    def on_transaction(self, height: int, tx_index: int, tx: dict, tx_result: Optional[dict]):
+        if tx_result is None:
+            return
+
+        self._tx_count += 1
+
+        ret: Optional[tuple] = check_zero_fee_tx_result(tx_result['result'])
+        if ret is not None:
+            step_used, step_price = ret
+            self._invalid_tx_count += 1
+            self.write(f'{height}: txHash({get_tx_hash(tx)}) stepUsed({step_used}) stepPrice({step_price})')
+
+    def finish(self) -> dict:
+        return {'transactions': self._tx_count, 'invalid_transactions': self._invalid_tx_count}
+
+
+class FailedTransactionRule(ScanRule):
+    """Find transactions of which status is failure
+
+    """
+    NAME = 'failedtx'
+
+    def __init__(self):
+        super().__init__()
+        self._failed_tx_count: int = 0
+
+    def on_transaction(self, height: int, tx_index: int, tx: dict, tx_result: Optional[dict]):
+        if tx_result is None:
+            return
+
+        result: dict = tx_result['result']
+
+        # tx_v2 dose not have transaction result_v3
+        if result.get('status', '0x1') == '0x0':
+            self._failed_tx_count += 1
+            self.write(f'{height}: txHash({get_tx_hash(tx)}) failure({result.get("failure")})')
+
+    def finish(self) -> dict:
+        return {'failed_transactions': self._failed_tx_count}
+
+
+class TPSRule(ScanRule):
+    """Count transactions and calculate tps over the scanned blocks
+
+    """
+    NAME = 'tps'
+    NEEDS_TX_RESULTS = False
+
+    def __init__(self):
+        super().__init__()
+        self._blocks: int = 0
+        self._tx_count: int = 0
+        self._start_us: int = -1
+        self._end_us: int = -1
+
+    def on_block(self, height: int, block: dict):
+        timestamp_us: int = BlockDatabaseReader.get_block_timestamp(block)
+        if self._start_us < 0:
+            self._start_us = timestamp_us
+        self._end_us = timestamp_us
+
+        self._blocks += 1
+        self._tx_count += len(BlockDatabaseReader.get_block_transactions(block))
+
+    def finish(self) -> dict:
+        period_us: int = self._end_us - self._start_us
+        tps: float = self._tx_count * 10 ** 6 / period_us if period_us > 0 else 0.0
+
+        return {'blocks': self._blocks, 'transactions': self._tx_count, 'period_us': period_us, 'tps': tps}
+
+
+RULES = {}
+
+
+def register_rule(rule_class: type) -> type:
+    """Register a ScanRule subclass by its NAME
+
+    Can be used as a class decorator by plugin modules
+    """
+    RULES[rule_class.NAME] = rule_class
+    return rule_class
+
+
+for _rule_class in (ZeroFeeRule, FailedTransactionRule, TPSRule):
+    register_rule(_rule_class)
+
+
+def create_rule(name: str) -> 'ScanRule':
+    """Create a rule by its registered name or by 'module:ClassName' of a plugin
+
+    """
+    if ':' in name:
+        module_name, class_name = name.split(':', 1)
+        module = importlib.import_module(module_name)
+        return getattr(module, class_name)()
+
+    try:
+        return RULES[name]()
+    except KeyError:
+        raise ValueError(f'Unknown rule: {name} (available: {", ".join(sorted(RULES))})')
+
+
+class ChainScanner(object):
+    """Read blocks and transaction results in one streaming pass
+    and feed them to all registered rules
+
+    """
+
+    def __init__(self):
+        self._block_reader = BlockDatabaseReader()
+        self._rules = []
+        self._sinks = []
+
+    def open(self, db_path: str):
+        self._block_reader.open(db_path)
+
+    def add_rule(self, rule: 'ScanRule', output_dir: str = None):
+        """Register a rule with its own output sink
+
+        :param rule:
+        :param output_dir: findings are written to {output_dir}/{rule.NAME}.txt. None means stdout
+        """
+        if output_dir is None:
+            sink = sys.stdout
+        else:
+            sink = open(os.path.join(output_dir, f'{rule.NAME}.txt'), 'wt')
+            self._sinks.append(sink)
+
+        rule.open(sink)
+        self._rules.append(rule)
+
+    @traced('scan.run', CATEGORY_COMPUTE)
+    def run(self, start: int, end: int) -> dict:
+        """Scan blocks in [start, end]
+
+        :param start: start height
+        :param end: end height, inclusive. negative value means the last block
+        :return: rule name -> summary
+        """
+        if end < 0:
+            end = self._block_reader.get_block_height(self._block_reader.get_last_block())
+
+        needs_tx_results: bool = any(rule.NEEDS_TX_RESULTS for rule in self._rules)
+
+        for height in range(start, end + 1):
+            block: dict = self._block_reader.get_block_by_block_height(height)
+            if block is None:
+                print(f'last block: {height - 1}')
+                break
+
+            for rule in self._rules:
+                rule.on_block(height, block)
+
+            for tx_index, tx in enumerate(self._block_reader.get_block_transactions(block)):
+                tx_result: Optional[dict] = None
+                if needs_tx_results and not is_genesis_tx(tx):
+                    tx_result = self._block_reader.get_transaction_result_by_hash(get_tx_hash(tx))
+
+                for rule in self._rules:
+                    rule.on_transaction(height, tx_index, tx, tx_result if rule.NEEDS_TX_RESULTS else None)
+
+        return {rule.NAME: rule.finish() for rule in self._rules}
+
+    def close(self):
+        for sink in self._sinks:
+            sink.close()
+        self._sinks = []
+
+        self._block_reader.close()
@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ICON Foundation Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, Optional
+
+from .block_database_reader import BlockDatabaseReader
+from .invalid_transaction_checker import get_block_tx_hashes
+from .parallel import map_in_order, split_range
+from .tracing import CATEGORY_COMPUTE, CATEGORY_IO, traced
+
+ISSUE_DANGLING_HEIGHT_KEY = 'dangling_height_key'
+ISSUE_HASH_MISMATCH = 'hash_mismatch'
+ISSUE_HEIGHT_MISMATCH = 'height_mismatch'
+ISSUE_BROKEN_LINK = 'broken_link'
+ISSUE_MISSING_TX_RESULT = 'missing_tx_result'
+ISSUE_INVALID_BLOCK = 'invalid_block'
+
+
+class HeightBitmap(object):
+    """Record seen heights in [start, end] with one bit per height
+
+    """
+
+    def __init__(self, start: int, end: int):
+        self.start: int = start
+        self.end: int = end
+        self._bits = bytearray((max(end - start + 1, 0) + 7) // 8)
+
+    def set(self, height: int):
+        i: int = height - self.start
+        self._bits[i >> 3] |= 1 << (i & 7)
+
+    def get(self, height: int) -> bool:
+        i: int = height - self.start
+        return bool(self._bits[i >> 3] & (1 << (i & 7)))
+
+    def count(self) -> int:
+        return sum(bin(byte).count('1') for byte in self._bits)
+
+    def iterate_gaps(self) -> Iterator[tuple]:
+        """Iterate over ranges of heights which are not set
+
+        :return: (gap start, gap end) generator. gap end is inclusive
+        """
+        gap_start: Optional[int] = None
+
+        for i, byte in enumerate(self._bits):
+            if byte == 0xff and gap_start is None:
+                continue
+
+            for bit in range(8):
+                height: int = self.start + i * 8 + bit
+                if height > self.end:
+                    break
+
+                if byte & (1 << bit):
+                    if gap_start is not None:
+                        yield gap_start, height - 1
+                        gap_start = None
+                elif gap_start is None:
+                    gap_start = height
+
+        if gap_start is not None:
+            yield gap_start, self.end
+
+
+@traced('verify.get_block_summaries', CATEGORY_COMPUTE)
+def _get_block_summaries(raw_blocks: list) -> list:
+    """Decode raw blocks and extract the fields to verify
+
+    Run in a worker process
+
+    :param raw_blocks: list of (height, key, bytes)
+    :return: list of (height, key, height in block, block hash, prev block hash, tx hashes)
+        The fields after key are None if the block can not be decoded
+    """
+    summaries = []
+
+    for height, key, value in raw_blocks:
+        try:
+            block: dict = json.loads(value)
+            summaries.append((
+                height,
+                key,
+                BlockDatabaseReader.get_block_height(block),
+                BlockDatabaseReader.get_block_hash(block),
+                BlockDatabaseReader.get_prev_block_hash(block),
+                get_block_tx_hashes(block)))
+        except (ValueError, KeyError, TypeError, AttributeError):
+            summaries.append((height, key, None, None, None, None))
+
+    return summaries
+
+
+class ChainVerifier(object):
+    """Verify the integrity of blocks stored in loopchain db
+
+    * block_height_key of every height resolves to a block
+    * block hash equals the key which block_height_key points to
+    * height in block equals the height of block_height_key
+    * prev block hash links to the previous block, across chunk boundaries too
+    * every transaction in a block has its transaction result, except the genesis transaction
+
+    Blocks are decoded in worker processes. Links and transaction results are checked in this process
+    """
+
+    def __init__(self):
+        self._block_reader = BlockDatabaseReader()
+        self._issues: int = 0
+
+    def open(self, db_path: str):
+        self._block_reader.open(db_path)
+
+    def close(self):
+        self._block_reader.close()
+
+    def run(self, start: int, end: int, workers: int = 0, chunk_size: int = 1000) -> dict:
+        """Verify blocks in [start, end]
+
+        :param start: start height
+        :param end: end height, inclusive. negative value means the last block
+        :param workers: the number of worker processes decoding blocks. 0: no worker
+        :param chunk_size: the number of blocks passed to a worker at once
+        :return: summary
+        """
+        if end < 0:
+            end = self._block_reader.get_block_height(self._block_reader.get_last_block())
+
+        self._issues = 0
+        bitmap = HeightBitmap(start, end)
+        raw_block_chunks = (self._read_raw_blocks(chunk_start, chunk_end)
+                            for chunk_start, chunk_end in split_range(start, end, chunk_size))
+
+        if workers > 0:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                summary_chunks = map_in_order(executor, _get_block_summaries, raw_block_chunks, workers * 2)
+                tx_count: int = self._verify(summary_chunks, bitmap)
+        else:
+            tx_count: int = self._verify(map(_get_block_summaries, raw_block_chunks), bitmap)
+
+        gaps = list(bitmap.iterate_gaps())
+        for gap_start, gap_end in gaps:
+            print(f'gap: {gap_start} ~ {gap_end} ({gap_end - gap_start + 1} blocks)')
+
+        return {
+            'start': start,
+            'end': end,
+            'blocks': bitmap.count(),
+            'transactions': tx_count,
+            'gaps': len(gaps),
+            'missing_blocks': sum(gap_end - gap_start + 1 for gap_start, gap_end in gaps),
+            'issues': self._issues}
+
+    @traced('verify.read_raw_blocks', CATEGORY_IO)
+    def _read_raw_blocks(self, start: int, end: int) -> list:
+        """Read raw blocks in [start, end] without stopping at missing heights
+
+        :return: list of (height, key, bytes)
+        """
+        raw_blocks = []
+
+        for height in range(start, end + 1):
+            key: Optional[bytes] = self._block_reader.get_block_key_by_block_height(height)
+            if key is None:
+                continue
+
+            value: Optional[bytes] = self._block_reader.get_raw_block_by_block_hash(key.decode())
+            if value is None:
+                self._report(height, ISSUE_DANGLING_HEIGHT_KEY, f'block({key.decode()}) not found')
+                continue
+
+            raw_blocks.append((height, key, value))
+
+        return raw_blocks
+
+    def _verify(self, summary_chunks: Iterator[list], bitmap: 'HeightBitmap') -> int:
+        """Check summaries of blocks in height order
+
+        :return: the number of transactions
+        """
+        tx_count: int = 0
+        prev_height: int = -1
+        prev_hash: Optional[str] = None
+
+        for summaries in summary_chunks:
+            for height, key, block_height, block_hash, prev_block_hash, tx_hashes in summaries:
+                # The block is stored even if it can not be decoded: an issue but not a gap
+                bitmap.set(height)
+
+                if block_hash is None:
+                    self._report(height, ISSUE_INVALID_BLOCK, 'failed to decode')
+                    prev_hash = None
+                    continue
+
+                if block_height != height:
+                    self._report(height, ISSUE_HEIGHT_MISMATCH, f'height in block: {block_height}')
+                if block_hash != key.decode():
+                    self._report(height, ISSUE_HASH_MISMATCH, f'{block_hash} != {key.decode()}')
+                if prev_hash is not None and prev_height == height - 1 and prev_block_hash != prev_hash:
+                    self._report(height, ISSUE_BROKEN_LINK, f'prev_hash {prev_block_hash} != {prev_hash}')
+
+                for tx_hash in tx_hashes:
+                    if self._block_reader.get_raw_transaction_result_by_hash(tx_hash) is None:
+                        self._report(height, ISSUE_MISSING_TX_RESULT, f'txHash({tx_hash})')
+
+                tx_count += len(tx_hashes)
+                prev_height = height
+                prev_hash = block_hash
+
+        return tx_count
+
+    def _report(self, height: int, issue: str, detail: str):
+        self._issues += 1
+        print(f'{height}: {issue} {detail}')
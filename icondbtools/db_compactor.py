@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ICON Foundation Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import re
+from typing import Optional
+
+import plyvel
+
+from . import tracing
+from .tracing import CATEGORY_IO
+
+# leveldb::config::kNumLevels
+LEVELS = 7
+
+_LEVEL_HEADER = re.compile(r'^--- level (\d+) ---$')
+# " 418:5438['key' @ 14719 : 1 .. 'key' @ 14721 : 1]" file number:file size[smallest .. largest]
+_TABLE_LINE = re.compile(r'^ \d+:(\d+)\[')
+
+
+def parse_sstables(text: str) -> list:
+    """Parse the value of leveldb.sstables property
+
+    :param text:
+    :return: list of (files, bytes) indexed by level
+    """
+    levels = [(0, 0)] * LEVELS
+    level: int = 0
+
+    for line in text.splitlines():
+        match = _LEVEL_HEADER.match(line)
+        if match:
+            level = int(match.group(1))
+            continue
+
+        match = _TABLE_LINE.match(line)
+        if match:
+            files, size = levels[level]
+            levels[level] = (files + 1, size + int(match.group(1)))
+
+    return levels
+
+
+def get_directory_size(path: str) -> int:
+    size: int = 0
+    for entry in os.scandir(path):
+        if entry.is_file(follow_symlinks=False):
+            size += entry.stat(follow_symlinks=False).st_size
+
+    return size
+
+
+def get_read_amplification(levels: list) -> int:
+    """Return the number of tables which a point lookup may read in the worst case
+
+    Tables in level 0 overlap each other. A level above 0 has at most one table covering a key
+    """
+    return levels[0][0] + sum(1 for files, _ in levels[1:] if files > 0)
+
+
+class DatabaseCompactor(object):
+    """Compact a leveldb and report its level statistics before and after compaction
+
+    The db must not be opened by another process.
+    For statedb of sync, it is compacted only after IconServiceEngine is closed
+    so that compaction never runs in the middle of a block commit
+    """
+
+    def __init__(self):
+        self._db_path: Optional[str] = None
+        self._db = None
+
+    def open(self, db_path: str):
+        self._db_path = db_path
+        self._db = plyvel.DB(db_path, create_if_missing=False)
+
+    def close(self):
+        if self._db:
+            self._db.close()
+            self._db = None
+
+    def get_stats(self) -> dict:
+        levels: list = parse_sstables(self._db.get_property(b'leveldb.sstables').decode())
+
+        return {
+            'levels': levels,
+            'tables': sum(files for files, _ in levels),
+            'table_bytes': sum(size for _, size in levels),
+            'disk_bytes': get_directory_size(self._db_path),
+            'read_amplification': get_read_amplification(levels)}
+
+    def run(self, start: Optional[bytes] = None, stop: Optional[bytes] = None) -> dict:
+        """Compact keys in [start, stop]
+
+        :param start: None means the first key
+        :param stop: None means the last key
+        :return: {"before": stats, "after": stats, "seconds": float}
+        """
+        before: dict = self.get_stats()
+
+        # compact_range() without a bound does not always push level 0 tables down
+        if start is None:
+            start = next(self._db.iterator(include_value=False), None)
+        if stop is None:
+            stop = next(self._db.iterator(reverse=True, include_value=False), None)
+
+        with tracing.Span('db.compact_range', CATEGORY_IO, {'db': self._db_path}) as compaction_span:
+            self._db.compact_range(start=start, stop=stop)
+        seconds: float = compaction_span.duration_s
+
+        return {'before': before, 'after': self.get_stats(), 'seconds': seconds}
+
+
+def compact_database(db_path: str, start: Optional[bytes] = None, stop: Optional[bytes] = None) -> dict:
+    compactor = DatabaseCompactor()
+    try:
+        compactor.open(db_path)
+        return compactor.run(start, stop)
+    finally:
+        compactor.close()
+
+
+def print_database_stats(db_path: str, stats: dict):
+    print(f'----------- Level statistics: {db_path} ------------')
+    print('level |      files |              bytes')
+    for level, (files, size) in enumerate(stats['levels']):
+        if files > 0:
+            print(f'{level:>5} | {files:>10} | {size:>18}')
+
+    for key in ('tables', 'table_bytes', 'disk_bytes', 'read_amplification'):
+        print(f'{key}: {stats[key]}')
+
+
+def print_compaction_report(db_path: str, report: dict):
+    before, after = report['before'], report['after']
+
+    print(f'----------- Compaction: {db_path} ({report["seconds"]:.3f} seconds) ------------')
+    print('level |     files (before -> after) |               bytes (before -> after)')
+    for level in range(LEVELS):
+        files_before, bytes_before = before['levels'][level]
+        files_after, bytes_after = after['levels'][level]
+        if files_before == files_after == 0:
+            continue
+
+        print(f'{level:>5} | {files_before:>12} -> {files_after:<10} | {bytes_before:>18} -> {bytes_after}')
+
+    print(f'tables: {before["tables"]} -> {after["tables"]}\n'
+          f'table_bytes: {before["table_bytes"]} -> {after["table_bytes"]}\n'
+          f'disk_bytes: {before["disk_bytes"]} -> {after["disk_bytes"]}\n'
+          f'read_amplification: {before["read_amplification"]} -> {after["read_amplification"]}')
+
+
+def find_databases(root: str) -> list:
+    """Find leveldb directories under root
+
+    :param root: ex) .statedb which has a db per channel
+    :return: sorted paths of directories which have CURRENT file
+    """
+    return sorted(dirpath for dirpath, _, filenames in os.walk(root) if 'CURRENT' in filenames)
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ICON Foundation Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import errno
+import os
+import shutil
+import tempfile
+from typing import Optional
+
+# LevelDB never modifies table files after writing them
+TABLE_FILE_EXTENSIONS = ('.ldb', '.sst')
+CURRENT_FILE_NAME = 'CURRENT'
+
+
+class CheckpointError(Exception):
+    pass
+
+
+def _read_version(db_path: str) -> tuple:
+    """Return (manifest file name, manifest size)
+
+    The manifest is appended whenever a memtable is flushed or tables are compacted
+    """
+    with open(os.path.join(db_path, CURRENT_FILE_NAME), 'rt') as f:
+        manifest_name: str = f.read().strip()
+
+    return manifest_name, os.path.getsize(os.path.join(db_path, manifest_name))
+
+
+def _link_or_copy(src: str, dst: str):
+    try:
+        os.link(src, dst)
+    except OSError as e:
+        if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK):
+            raise
+        shutil.copyfile(src, dst)
+
+
+def _copy_files(db_path: str, checkpoint_path: str):
+    """Hard-link table files and copy the other files of a db
+
+    :raise CheckpointError: the db changed its version while copying
+    """
+    version: tuple = _read_version(db_path)
+
+    for name in os.listdir(db_path):
+        # LOCK belongs to the running node. LOG and LOG.old are text logs of leveldb
+        if name == 'LOCK' or name.startswith('LOG'):
+            continue
+
+        src: str = os.path.join(db_path, name)
+        dst: str = os.path.join(checkpoint_path, name)
+        if name.endswith(TABLE_FILE_EXTENSIONS):
+            _link_or_copy(src, dst)
+        else:
+            # CURRENT, MANIFEST-* and *.log which the node keeps writing
+            shutil.copyfile(src, dst)
+
+    # No flush or compaction happened while copying if the manifest is unchanged.
+    # Then the copied logs and tables are the ones which the copied manifest refers to
+    if _read_version(db_path) != version:
+        raise CheckpointError(f'{db_path} changed while creating a checkpoint')
+
+
+def create_checkpoint(db_path: str, checkpoint_path: str, retries: int = 5):
+    """Create a checkpoint of a leveldb which another process may hold open
+
+    Table files are hard-linked and only the small mutable files are copied.
+    If a flush or compaction happens meanwhile, the checkpoint is created again
+
+    :param db_path: leveldb directory
+    :param checkpoint_path: empty or nonexistent directory.
+        It should be on the file system of db_path for hard links
+    :param retries: the number of attempts
+    """
+    for attempt in range(retries):
+        os.makedirs(checkpoint_path, exist_ok=True)
+        try:
+            _copy_files(db_path, checkpoint_path)
+            return
+        except (CheckpointError, FileNotFoundError):
+            # FileNotFoundError: a compaction removed a file which was listed
+            shutil.rmtree(checkpoint_path, ignore_errors=True)
+            if attempt == retries - 1:
+                raise
+
+
+class DatabaseSnapshot(object):
+    """Hard-linked checkpoint of a leveldb which is removed on close
+
+    plyvel.DB() takes the exclusive lock of a db, so a db which a running node holds can not be opened.
+    The checkpoint can be opened instead and holds no lock of the original db
+    """
+
+    def __init__(self):
+        self._path: Optional[str] = None
+
+    @property
+    def path(self) -> Optional[str]:
+        return self._path
+
+    def open(self, db_path: str, parent_dir: Optional[str] = None) -> str:
+        """Create a checkpoint of db_path
+
+        :param db_path: leveldb directory
+        :param parent_dir: directory where the checkpoint is created. The parent of db_path by default
+        :return: checkpoint path
+        """
+        db_path = os.path.normpath(db_path)
+        if parent_dir is None:
+            parent_dir = os.path.dirname(os.path.abspath(db_path))
+
+        temp_dir: str = tempfile.mkdtemp(prefix=f'{os.path.basename(db_path)}.snapshot-', dir=parent_dir)
+        try:
+            create_checkpoint(db_path, temp_dir)
+        except BaseException:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            raise
+
+        self._path = temp_dir
+        return temp_dir
+
+    def close(self):
+        if self._path is not None:
+            shutil.rmtree(self._path, ignore_errors=True)
+            self._path = None
@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ICON Foundation Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+import subprocess
+import sys
+from typing import Optional
+
+from . import tracing
+from .block_source import BlockSource, create_block_source
+from .loopchain_block import LoopchainBlock
+from .replay_worker import encode_block
+from .tracing import CATEGORY_DECODE, CATEGORY_INVOKE, CATEGORY_IO, CATEGORY_WAIT
+
+BASE_STATE_DIR_NAME = 'base'
+TARGET_STATE_DIR_NAME = 'target'
+# Directory in a state directory which has a symbolic link to this package
+PACKAGE_LINK_DIR_NAME = '.icondbtools'
+
+
+class ReplayWorkerError(Exception):
+    pass
+
+
+def resolve_python_command(diff_against: str) -> tuple:
+    """Find the python interpreter which runs a worker with another iconservice build
+
+    :param diff_against: python interpreter, virtualenv directory or directory which has iconservice package
+    :return: (python executable, paths to prepend to PYTHONPATH)
+    """
+    if os.path.isfile(diff_against) and os.access(diff_against, os.X_OK):
+        return diff_against, []
+
+    for name in ('bin/python', 'Scripts/python.exe'):
+        python: str = os.path.join(diff_against, name)
+        if os.path.isfile(python):
+            return python, []
+
+    if os.path.isdir(diff_against):
+        return sys.executable, [os.path.abspath(diff_against)]
+
+    raise ValueError(f'Invalid --diff-against: {diff_against}')
+
+
+def compare_tx_results(base: list, target: list) -> Optional[dict]:
+    """Find the first difference of transaction results
+
+    :return: None if they are the same
+    """
+    if len(base) != len(target):
+        return {'field': 'count', 'base': len(base), 'target': len(target)}
+
+    for i, (base_result, target_result) in enumerate(zip(base, target)):
+        if base_result == target_result:
+            continue
+
+        tx_hash = base_result.get('tx_hash', base_result.get('txHash'))
+        fields = {}
+        for key in sorted(set(base_result) | set(target_result)):
+            if base_result.get(key) != target_result.get(key):
+                fields[key] = {'base': base_result.get(key), 'target': target_result.get(key)}
+
+        return {'field': 'tx_result', 'index': i, 'tx_hash': tx_hash, 'fields': fields}
+
+    return None
+
+
+class ReplayWorkerProcess(object):
+    """IconServiceEngine running in a child process with its own state directory
+
+    """
+
+    def __init__(self, name: str, python: str, python_paths: list, state_dir: str):
+        """
+        :param name: worker name used in messages
+        :param python: python executable
+        :param python_paths: PYTHONPATH of the worker. PYTHONPATH of this process is not inherited
+        :param state_dir: working directory of the worker where statedb is created
+        """
+        self.name: str = name
+        self.state_dir: str = state_dir
+        self._python: str = python
+        self._python_paths: list = python_paths
+        self._process: Optional[subprocess.Popen] = None
+
+    def start(self):
+        os.makedirs(self.state_dir, exist_ok=True)
+
+        # Only this package is exposed to the interpreter of the worker.
+        # Adding the directory where it is installed could expose another iconservice
+        link_dir: str = os.path.join(self.state_dir, PACKAGE_LINK_DIR_NAME)
+        link_path: str = os.path.join(link_dir, 'icondbtools')
+        os.makedirs(link_dir, exist_ok=True)
+        if not os.path.islink(link_path):
+            os.symlink(os.path.dirname(os.path.abspath(__file__)), link_path)
+
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.pathsep.join(self._python_paths + [os.path.abspath(link_dir)])
+
+        self._process = subprocess.Popen(
+            [self._python, '-m', 'icondbtools.replay_worker'],
+            cwd=self.state_dir, env=env,
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, universal_newlines=True, bufsize=1)
+
+    def send(self, method: str, params: Optional[dict] = None):
+        self._process.stdin.write(json.dumps({'method': method, 'params': params}) + '\n')
+        self._process.stdin.flush()
+
+    def receive(self):
+        line: str = self._process.stdout.readline()
+        if not line:
+            raise ReplayWorkerError(f'{self.name} worker exited: {self._process.wait()}')
+
+        response: dict = json.loads(line)
+        if 'error' in response:
+            error: dict = response['error']
+            raise ReplayWorkerError(f'{self.name} worker: {error["type"]}: {error["message"]}')
+
+        return response['result']
+
+    def request(self, method: str, params: Optional[dict] = None):
+        self.send(method, params)
+        return self.receive()
+
+    def stop(self):
+        if self._process is None:
+            return
+
+        if self._process.poll() is None:
+            try:
+                self.request('close')
+            except (ReplayWorkerError, OSError):
+                pass
+
+            self._process.stdin.close()
+            try:
+                self._process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+                self._process.wait()
+
+        self._process = None
+
+
+class DiffReplayer(object):
+    """Replay blocks with two iconservice builds and stop at the first divergence
+
+    Each block is read and decoded once, then invoked by two worker processes concurrently.
+    Workers run in separate state directories. A block is committed only if
+    both workers produce the same state root hash and transaction results
+    """
+
+    def __init__(self):
+        self._block_source: Optional['BlockSource'] = None
+        self._workers: list = []
+
+    def open(self,
+             source: str,
+             state_dir: str,
+             diff_against: str,
+             engine_params: dict,
+             snapshot: bool = False):
+        """
+        :param source: block source. See create_block_source()
+        :param state_dir: directory which has a state directory for each worker
+        :param diff_against: python interpreter, virtualenv or module path of another iconservice build
+        :param engine_params: keyword arguments of IconServiceSyncer.open()
+        :param snapshot: read hard-linked checkpoints of loopchain db
+        """
+        python, python_paths = resolve_python_command(diff_against)
+        base_python_paths = [path for path in os.environ.get('PYTHONPATH', '').split(os.pathsep) if path]
+
+        self._workers = [
+            ReplayWorkerProcess(
+                BASE_STATE_DIR_NAME, sys.executable, base_python_paths, os.path.join(state_dir, BASE_STATE_DIR_NAME)),
+            ReplayWorkerProcess(
+                TARGET_STATE_DIR_NAME, python, python_paths, os.path.join(state_dir, TARGET_STATE_DIR_NAME))]
+
+        engine_params = dict(engine_params)
+        if engine_params.get('config_path'):
+            engine_params['config_path'] = os.path.abspath(engine_params['config_path'])
+
+        for worker in self._workers:
+            worker.start()
+        for worker in self._workers:
+            worker.send('open', engine_params)
+        for worker in self._workers:
+            info: dict = worker.receive()
+            print(f'{worker.name}: iconservice {info["version"]} ({info["path"]}) in {worker.state_dir}')
+
+        self._block_source = create_block_source(source, snapshot)
+        self._block_source.open()
+
+    def close(self):
+        for worker in self._workers:
+            worker.stop()
+        self._workers = []
+
+        if self._block_source is not None:
+            self._block_source.close()
+            self._block_source = None
+
+    def run(self, start: int, count: int, no_commit: bool = False) -> dict:
+        """Invoke blocks in [start, start + count) with both workers
+
+        :return: summary. "divergence" is None if no difference is found
+        """
+        base, target = self._workers
+        blocks: int = 0
+        divergence: Optional[dict] = None
+
+        print('block_height | base state_root_hash | target state_root_hash | tx_count')
+
+        for block_dict in self._block_source.iterate_blocks(start, start + count - 1):
+            with tracing.span('diff.decode_block', CATEGORY_DECODE):
+                loopchain_block: 'LoopchainBlock' = LoopchainBlock.from_dict(block_dict)
+                params = {'block': encode_block(loopchain_block)}
+
+            # Both workers invoke the block concurrently. Their own spans are not recorded
+            with tracing.span('diff.invoke', CATEGORY_INVOKE, height=loopchain_block.height):
+                for worker in self._workers:
+                    worker.send('invoke', params)
+                with tracing.span('diff.receive', CATEGORY_WAIT):
+                    base_result, target_result = base.receive(), target.receive()
+
+            height: int = loopchain_block.height
+            base_hash, target_hash = base_result['state_root_hash'], target_result['state_root_hash']
+            print(f'{height} | {base_hash[:6]} | {target_hash[:6]} | {len(loopchain_block.transactions)}')
+
+            difference: Optional[dict] = compare_tx_results(base_result['tx_results'], target_result['tx_results'])
+            if difference is None and base_hash != target_hash:
+                difference = {'field': 'state_root_hash', 'base': base_hash, 'target': target_hash}
+
+            if difference is not None:
+                divergence = {'height': height, 'block_hash': loopchain_block.block_hash.hex(), **difference}
+                break
+
+            if not no_commit:
+                with tracing.span('diff.commit', CATEGORY_IO):
+                    for worker in self._workers:
+                        worker.send('commit')
+                    for worker in self._workers:
+                        worker.receive()
+
+            blocks += 1
+
+        return {'start': start, 'blocks': blocks, 'divergence': divergence}
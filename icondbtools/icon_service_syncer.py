@@ -17,6 +17,7 @@ import asyncio
 import inspect
 import logging
 import shutil
+import threading
 from concurrent.futures import ThreadPoolExecutor
 from typing import TYPE_CHECKING, Optional
 
@@ -27,9 +28,13 @@ from iconservice.base.address import Address
 from iconservice.base.block import Block
 from iconservice.icon_config import default_icon_config
 from iconservice.icon_service_engine import IconServiceEngine
-from . import utils
+from . import tracing, utils
 from .block_database_reader import BlockDatabaseReader
+from .block_source import BlockSource, create_block_source
+from .db_compactor import compact_database, find_databases, print_compaction_report
 from .loopchain_block import LoopchainBlock
+from .tracing import CATEGORY_COMPUTE, CATEGORY_DECODE, CATEGORY_INVOKE, CATEGORY_IO, traced
+from .write_profiler import WriteProfiler
 
 if TYPE_CHECKING:
     from iconservice.precommit_data_manager import PrecommitData, PrecommitDataManager
@@ -40,8 +45,10 @@ class IconServiceSyncer(object):
     _TAG = "SYNC"
 
     def __init__(self):
-        self._block_reader = BlockDatabaseReader()
+        self._block_source: Optional['BlockSource'] = None
         self._engine = IconServiceEngine()
+        self._engine_opened: bool = False
+        self._stop_event = threading.Event()
 
     def open(self,
              config_path: str,
@@ -67,6 +74,33 @@ class IconServiceSyncer(object):
 
         Logger.load_config(conf)
         self._engine.open(conf)
+        self._engine_opened = True
+
+    def invoke(self, loopchain_block: 'LoopchainBlock') -> tuple:
+        """Invoke the transactions of a block without committing them
+
+        :param loopchain_block:
+        :return: (block, tx_requests, tx_results, state_root_hash)
+        """
+        with tracing.span('sync.create_transaction_requests', CATEGORY_DECODE):
+            block: 'Block' = utils.create_block(loopchain_block)
+            tx_requests: list = utils.create_transaction_requests(loopchain_block)
+
+        with tracing.span('engine.invoke', CATEGORY_INVOKE, height=block.height, tx_count=len(tx_requests)):
+            invoke_result = self._engine.invoke(block, tx_requests)
+        return block, tx_requests, invoke_result[0], invoke_result[1]
+
+    @traced('engine.commit', CATEGORY_IO)
+    def commit(self, block: 'Block'):
+        if 'block' in inspect.signature(self._engine.commit).parameters:
+            self._engine.commit(block)
+        else:
+            self._engine.commit(block.height, block.hash, None)
+
+    def _close_engine(self):
+        if self._engine_opened:
+            self._engine.close()
+            self._engine_opened = False
 
     def run(self, *args, **kwargs) -> int:
         Logger.debug(tag=self._TAG, msg=f"run() start: {args} {kwargs}")
@@ -76,9 +110,15 @@ class IconServiceSyncer(object):
 
         try:
             asyncio.ensure_future(self._wait_for_complete(future, *args, **kwargs))
-            loop.run_until_complete(future)
+            try:
+                loop.run_until_complete(future)
+            except KeyboardInterrupt:
+                # Let the block being invoked finish so that statedb is left at a block boundary
+                print('Stopping after the current block...')
+                self._stop_event.set()
+                loop.run_until_complete(future)
         finally:
-            self._engine.close()
+            self._close_engine()
             loop.close()
 
         ret = future.result()
@@ -101,17 +141,24 @@ class IconServiceSyncer(object):
         Logger.debug(tag=self._TAG, msg="_wait_for_complete() end2")
 
     def _run(self,
-            db_path: str,
+            source: str,
             channel: str,
             start_height: int = 0,
             count: int = 99999999,
             stop_on_error: bool = True,
             no_commit: bool = False,
             backup_period: int = 0,
-            write_precommit_data: bool = False) -> int:
+            write_precommit_data: bool = False,
+            write_profile_period: int = 0,
+            write_profile_path: str = None,
+            follow: bool = False,
+            poll_interval: float = 0.5,
+            max_poll_interval: float = 30.0,
+            snapshot: bool = False,
+            compact_backup: bool = False) -> int:
         """Begin to synchronize IconServiceEngine with blocks from loopchain db
 
-        :param db_path: loopchain db path
+        :param source: loopchain db path or 'archive:<directory written by export command>'
         :param channel: channel name used as a key to get commit_state in loopchain db
         :param start_height: start height to sync
         :param count: The number of blocks to sync
@@ -119,35 +166,55 @@ class IconServiceSyncer(object):
         :param no_commit: Do not commit
         :param backup_period: state backup period in block
         :param write_precommit_data:
+        :param write_profile_period: report states written per SCORE every this period in block.
+            Also reported at exit. 0 means no profiling
+        :param write_profile_path: ndjson file which the latest write profile is written to
+        :param follow: wait for new blocks instead of stopping at the last block
+        :param poll_interval: seconds to wait before polling for new blocks again in follow mode
+        :param max_poll_interval: the longest seconds between polls while no new block arrives
+        :param snapshot: read a hard-linked checkpoint of loopchain db which is created whenever it is opened
+        :param compact_backup: compact statedb backups
         :return: 0(success), otherwise(error)
         """
         Logger.debug(tag=self._TAG, msg="_run() start")
 
         ret: int = 0
-        self._block_reader.open(db_path)
+        self._block_source = create_block_source(source, snapshot)
+        self._block_source.open()
 
         print('block_height | commit_state | state_root_hash | tx_count')
 
+        write_profiler: Optional['WriteProfiler'] = WriteProfiler() if write_profile_period > 0 else None
+
         prev_block: Optional['Block'] = None
+        end_height: int = start_height + count - 1
+        if follow:
+            blocks = self._block_source.follow_blocks(
+                start_height, end_height, self._stop_event, poll_interval, max_poll_interval)
+        else:
+            blocks = self._block_source.iterate_blocks(start_height, end_height)
 
         for height in range(start_height, start_height + count):
-            block_dict: dict = self._block_reader.get_block_by_block_height(height)
+            if self._stop_event.is_set():
+                print(f'stopped: {height - 1}')
+                break
+
+            with tracing.span('sync.read_block', CATEGORY_IO, height=height):
+                block_dict: dict = next(blocks, None)
             if block_dict is None:
                 print(f'last block: {height - 1}')
                 break
 
-            loopchain_block = LoopchainBlock.from_dict(block_dict)
-            block: 'Block' = utils.create_block(loopchain_block)
-            tx_requests: list = utils.create_transaction_requests(loopchain_block)
+            with tracing.span('sync.decode_block', CATEGORY_DECODE):
+                loopchain_block = LoopchainBlock.from_dict(block_dict)
 
             if prev_block is not None:
                 # print(f'prev_block({prev_block.hash.hex()}) == block({block.prev_hash.hex()})')
-                if prev_block.hash != block.prev_hash:
+                if prev_block.hash != loopchain_block.prev_block_hash:
                     raise Exception()
 
-            invoke_result = self._engine.invoke(block, tx_requests)
-            tx_results, state_root_hash = invoke_result[0], invoke_result[1]
-            commit_state: bytes = self._block_reader.get_commit_state(block_dict, channel, b'')
+            block, tx_requests, tx_results, state_root_hash = self.invoke(loopchain_block)
+            commit_state: bytes = BlockDatabaseReader.get_commit_state(block_dict, channel, b'')
 
             # "commit_state" is the field name of state_root_hash in loopchain block
             print(f'{height} | {commit_state.hex()[:6]} | {state_root_hash.hex()[:6]} | {len(tx_requests)}')
@@ -155,6 +222,11 @@ class IconServiceSyncer(object):
             if write_precommit_data:
                 self._print_precommit_data(block)
 
+            if write_profiler is not None:
+                write_profiler.add_block_batch(height, self._get_block_batch(block))
+                if height % write_profile_period == 0:
+                    write_profiler.report(write_profile_path)
+
             try:
                 if stop_on_error:
                     if commit_state:
@@ -172,19 +244,20 @@ class IconServiceSyncer(object):
                 break
 
             if not no_commit:
-                if 'block' in inspect.signature(self._engine.commit).parameters:
-                    self._engine.commit(block)
-                else:
-                    self._engine.commit(block.height, block.hash, None)
+                self.commit(block)
 
-            self._backup_state_db(block, backup_period)
+            self._backup_state_db(block, backup_period, compact_backup)
             prev_block = block
 
-        self._block_reader.close()
+        self._block_source.close()
+
+        if write_profiler is not None:
+            write_profiler.report(write_profile_path)
 
         Logger.debug(tag=self._TAG, msg=f"_run() end: {ret}")
         return ret
 
+    @traced('sync.check_invoke_result', CATEGORY_COMPUTE)
     def _check_invoke_result(self, tx_results: list):
         """Compare the transaction results from IconServiceEngine
         with the results stored in loopchain db
@@ -197,7 +270,7 @@ class IconServiceSyncer(object):
 
         for tx_result in tx_results:
             tx_info_in_db: dict =\
-                self._block_reader.get_transaction_result_by_hash(
+                self._block_source.get_transaction_result_by_hash(
                     tx_result.tx_hash.hex())
             tx_result_in_db = tx_info_in_db['result']
 
@@ -265,16 +338,22 @@ class IconServiceSyncer(object):
 
         return True
 
-    def _print_precommit_data(self, block: 'Block'):
-        """Print the latest updated states stored in IconServiceEngine
+    def _get_block_batch(self, block: 'Block') -> 'BlockBatch':
+        """Get the states which IconServiceEngine updated with a block and has not committed yet
 
-        :return:
         """
         precommit_data_manager: PrecommitDataManager =\
             getattr(self._engine, '_precommit_data_manager')
 
         precommit_data: PrecommitData = precommit_data_manager.get(block.hash)
-        block_batch: BlockBatch = precommit_data.block_batch
+        return precommit_data.block_batch
+
+    def _print_precommit_data(self, block: 'Block'):
+        """Print the latest updated states stored in IconServiceEngine
+
+        :return:
+        """
+        block_batch: BlockBatch = self._get_block_batch(block)
         state_root_hash: bytes = block_batch.digest()
 
         filename = f'{block.height}-precommit-data.txt'
@@ -293,7 +372,7 @@ class IconServiceSyncer(object):
             f.write(f'state_root_hash: {state_root_hash.hex()}\n')
 
     @staticmethod
-    def _backup_state_db(block: 'Block', backup_period: int):
+    def _backup_state_db(block: 'Block', backup_period: int, compact: bool = False):
         if backup_period <= 0:
             return
         if block.height == 0:
@@ -303,11 +382,17 @@ class IconServiceSyncer(object):
             print(f"----------- Backup statedb: {block.height} ------------")
             dirname: str = f"block-{block.height}"
 
-            for basename in (".score", ".statedb"):
-                try:
-                    shutil.copytree(basename, f"{dirname}/{basename}/")
-                except FileExistsError:
-                    pass
+            with tracing.span('sync.backup_state_db', CATEGORY_IO, height=block.height):
+                for basename in (".score", ".statedb"):
+                    try:
+                        shutil.copytree(basename, f"{dirname}/{basename}/")
+                    except FileExistsError:
+                        pass
+
+            if compact:
+                # The copies are not opened by IconServiceEngine
+                for db_path in find_databases(f"{dirname}/.statedb"):
+                    print_compaction_report(db_path, compact_database(db_path))
 
     def close(self):
-        pass
+        self._close_engine()
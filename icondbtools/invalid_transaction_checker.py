@@ -13,7 +13,95 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import json
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, Optional
+
 from .block_database_reader import BlockDatabaseReader
+from .parallel import map_in_order, split_range
+from .tracing import CATEGORY_COMPUTE, traced
+
+
+def check_zero_fee_tx_result(tx_result: dict) -> Optional[tuple]:
+    """Check whether a transaction succeeded without any fee charged
+
+    :param tx_result: 'result' field of the transaction result stored in loopchain db
+    :return: (step_used, step_price) if invalid, otherwise None
+    """
+    # information extracted from db
+    status: int = int(tx_result['status'], 16)
+    step_used: int = int(tx_result['stepUsed'], 16)
+    step_price: int = int(tx_result['stepPrice'], 16)
+    step = step_used * step_price
+
+    if status == 1 and step == 0:
+        return step_used, step_price
+
+    return None
+
+
+def get_tx_hash(tx: dict) -> str:
+    tx_hash: str = tx.get('txHash')
+    if tx_hash is None:
+        tx_hash: str = tx['tx_hash']
+
+    return tx_hash
+
+
+def is_genesis_tx(tx: dict) -> bool:
+    """Check whether a transaction is the genesis transaction in block 0
+
+    It has 'accounts' instead of 'from' and 'to', and neither a hash nor a transaction result
+    """
+    return 'accounts' in tx
+
+
+def get_block_tx_hashes(block: dict) -> list:
+    """Return the hashes of the transactions in a block in order, except the genesis transaction
+
+    :param block: block in v0.1a or newer schema
+    :return: list of tx_hash
+    """
+    return [get_tx_hash(tx) for tx in BlockDatabaseReader.get_block_transactions(block) if not is_genesis_tx(tx)]
+
+
+@traced('invalid_tx.get_tx_hashes', CATEGORY_COMPUTE)
+def get_tx_hashes(raw_blocks: list) -> list:
+    """Decode raw blocks and return the hashes of their transactions
+
+    Run in a worker process
+
+    :param raw_blocks: list of (height, bytes)
+    :return: list of (height, tx_hash)
+    """
+    tx_hashes = []
+
+    for height, value in raw_blocks:
+        block: dict = json.loads(value)
+        for tx_hash in get_block_tx_hashes(block):
+            tx_hashes.append((height, tx_hash))
+
+    return tx_hashes
+
+
+@traced('invalid_tx.check_raw_tx_results', CATEGORY_COMPUTE)
+def _check_raw_tx_results(raw_tx_results: list) -> tuple:
+    """Decode raw transaction results and check them
+
+    Run in a worker process
+
+    :param raw_tx_results: list of (height, tx_hash, bytes)
+    :return: (tx_count, list of (height, tx_hash, step_used, step_price))
+    """
+    invalid_txs = []
+
+    for height, tx_hash, value in raw_tx_results:
+        tx_result: dict = json.loads(value)['result']
+        ret: Optional[tuple] = check_zero_fee_tx_result(tx_result)
+        if ret is not None:
+            invalid_txs.append((height, tx_hash, *ret))
+
+    return len(raw_tx_results), invalid_txs
 
 
 class InvalidTransactionChecker(object):
@@ -26,38 +114,76 @@ class InvalidTransactionChecker(object):
     def open(self, db_path: str):
         self._block_reader.open(db_path)
 
-    def run(self, start: int, end: int):
-        tx_count: int = 0
+    def run(self, start: int, end: int, workers: int = 0, chunk_size: int = 1000):
+        """Print the transactions which succeeded without any fee in [start, end]
 
+        :param start: start height
+        :param end: end height, inclusive. negative value means the last block
+        :param workers: the number of worker processes decoding and checking data. 0: no worker
+        :param chunk_size: the number of blocks passed to a worker at once
+        :return:
+        """
         if end < 0:
             last_block: dict = self._block_reader.get_last_block()
-            end: int = last_block['height']
+            end: int = self._block_reader.get_block_height(last_block)
+
+        if workers > 0:
+            tx_count: int = self._run_in_parallel(start, end, workers, chunk_size)
+        else:
+            tx_count: int = self._run(start, end)
+
+        print(f'The number of transactions: {tx_count}')
+
+    def _run(self, start: int, end: int) -> int:
+        tx_count: int = 0
 
         for height in range(start, end + 1):
             block: dict = self._block_reader.get_block_by_block_height(height)
 
-            tx_list: list = block['confirmed_transaction_list']
-            for tx in tx_list:
-                tx_hash: str = tx.get('txHash')
-                if tx_hash is None:
-                    tx_hash: str = tx['tx_hash']
-
+            for tx_hash in get_block_tx_hashes(block):
                 self._check_invalid_tx_result(height, tx_hash)
                 tx_count += 1
 
-        print(f'The number of transactions: {tx_count}')
+        return tx_count
+
+    def _run_in_parallel(self, start: int, end: int, workers: int, chunk_size: int) -> int:
+        """Blocks and transaction results are read in this process
+        and decoded in worker processes in two stages. Output keeps height order
+
+        :return: the number of transactions
+        """
+        tx_count: int = 0
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            raw_block_chunks = (
+                self._block_reader.get_raw_blocks(chunk_start, chunk_end)
+                for chunk_start, chunk_end in split_range(start, end, chunk_size))
+            tx_hash_chunks = map_in_order(executor, get_tx_hashes, raw_block_chunks, workers * 2)
+            raw_tx_result_chunks = self._read_raw_tx_results(tx_hash_chunks)
+
+            for count, invalid_txs in map_in_order(executor, _check_raw_tx_results, raw_tx_result_chunks, workers):
+                tx_count += count
+
+                for height, tx_hash, step_used, step_price in invalid_txs:
+                    self._print_invalid_tx(height, tx_hash, step_used, step_price)
+
+        return tx_count
+
+    def _read_raw_tx_results(self, tx_hash_chunks: Iterator[list]) -> Iterator[list]:
+        for tx_hashes in tx_hash_chunks:
+            yield [(height, tx_hash, self._block_reader.get_raw_transaction_result_by_hash(tx_hash))
+                   for height, tx_hash in tx_hashes]
 
     def _check_invalid_tx_result(self, height: int, tx_hash: str):
         tx_result: dict = self._block_reader.get_transaction_result_by_hash(tx_hash)['result']
 
-        # information extracted from db
-        status: int = int(tx_result['status'], 16)
-        step_used: int = int(tx_result['stepUsed'], 16)
-        step_price: int = int(tx_result['stepPrice'], 16)
-        step = step_used * step_price
+        ret: Optional[tuple] = check_zero_fee_tx_result(tx_result)
+        if ret is not None:
+            self._print_invalid_tx(height, tx_hash, *ret)
 
-        if status == 1 and step == 0:
-            print(f'{height}: txHash({tx_hash}) stepUsed({step_used}) stepPrice({step_price})')
+    @staticmethod
+    def _print_invalid_tx(height: int, tx_hash: str, step_used: int, step_price: int):
+        print(f'{height}: txHash({tx_hash}) stepUsed({step_used}) stepPrice({step_price})')
 
     def close(self):
         self._block_reader.close()
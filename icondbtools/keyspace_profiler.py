@@ -0,0 +1,272 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ICON Foundation Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import Optional
+
+import plyvel
+
+from .tracing import CATEGORY_IO, traced
+
+SCORE_DB_TYPE_NAMES = {0: 'array', 1: 'dict', 2: 'var'}
+
+
+def classify_key(key: bytes, depth: int = 3) -> tuple:
+    """Classify a statedb key into a group
+
+    SCORE storage keys have the layout of score_address|type|name|...
+    which ScoreDatabaseManager._create_dict_db_key() also uses.
+
+    :param key: statedb key
+    :param depth: 1(score address), 2(+ db type), 3(+ db name)
+    :return: (label, prefix) prefix is None if a group has no common key prefix
+    """
+    size: int = len(key)
+
+    if size > 23 and key[0] == 1 and key[21] == 0x7c and key[23] == 0x7c:
+        # 0x7c: b'|'
+        parts = [f'cx{key[1:21].hex()}']
+        if depth == 1:
+            return parts[0], key[:22]
+
+        db_type: int = key[22]
+        parts.append(SCORE_DB_TYPE_NAMES.get(db_type, f'0x{db_type:02x}'))
+        if depth == 2:
+            return '|'.join(parts), key[:24]
+
+        name: bytes = key[24:].split(b'|', 1)[0]
+        parts.append(name.decode('utf-8', errors='replace'))
+        end: int = 24 + len(name)
+        # VarDB has no sub key after its name
+        prefix: Optional[bytes] = key[:end + 1] if end < size else None
+        return '|'.join(parts), prefix
+
+    if size == 20 or (size == 21 and key[0] == 1):
+        return 'account', None
+
+    return 'other', None
+
+
+def get_upper_bound(prefix: bytes) -> Optional[bytes]:
+    """Return the smallest key which is greater than all keys starting with prefix
+
+    :param prefix:
+    :return: None if there is no upper bound
+    """
+    for i in range(len(prefix) - 1, -1, -1):
+        if prefix[i] < 0xff:
+            return prefix[:i] + bytes([prefix[i] + 1])
+
+    return None
+
+
+class KeyspaceGroup(object):
+    def __init__(self, label: str):
+        self.label: str = label
+        self.keys: int = 0
+        self.key_size: int = 0
+        self.value_size: int = 0
+        self.estimated: bool = False
+
+    @property
+    def size(self) -> int:
+        return self.key_size + self.value_size
+
+    def add(self, key: bytes, value: bytes):
+        self.keys += 1
+        self.key_size += len(key)
+        self.value_size += len(value)
+
+    def to_dict(self) -> dict:
+        return {
+            'group': self.label,
+            'keys': self.keys,
+            'bytes': self.size,
+            'key_size': self.key_size,
+            'value_size': self.value_size,
+            'estimated': self.estimated}
+
+
+class KeyspaceProfiler(object):
+    """Profile which SCOREs and DB prefixes dominate the size of statedb
+
+    exact: one streaming pass over all keys and values
+    fast: seek over key prefixes and estimate each group
+        with LevelDB approximate sizes and sampling.
+        Estimated bytes are on-disk (compressed) sizes
+    """
+
+    def __init__(self):
+        self._db = None
+        self._groups: dict = {}
+
+    def open(self, db_path: str):
+        self._db = plyvel.DB(db_path, create_if_missing=False)
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def run(self, mode: str = 'fast', depth: int = 3, sample_size: int = 1000) -> list:
+        """Profile the keyspace
+
+        :param mode: 'fast' or 'exact'
+        :param depth: 1(score address), 2(+ db type), 3(+ db name)
+        :param sample_size: the number of items sampled per group in fast mode
+        :return: list of KeyspaceGroup
+        """
+        self._groups = {}
+
+        if mode == 'exact':
+            self._run_exact(depth)
+        elif mode == 'fast':
+            self._run_fast(depth, sample_size)
+        else:
+            raise ValueError(f'Invalid mode: {mode}')
+
+        return list(self._groups.values())
+
+    def _get_group(self, label: str) -> 'KeyspaceGroup':
+        group = self._groups.get(label)
+        if group is None:
+            group = KeyspaceGroup(label)
+            self._groups[label] = group
+
+        return group
+
+    @traced('keyspace.run_exact', CATEGORY_IO)
+    def _run_exact(self, depth: int):
+        for key, value in self._db:
+            label, _ = classify_key(key, depth)
+            self._get_group(label).add(key, value)
+
+    def _run_fast(self, depth: int, sample_size: int):
+        # SCORE storage is located in the range of 0x01 first byte.
+        # Other ranges mostly contain EOA accounts which are spread over all first bytes
+        for first_byte in range(256):
+            start: bytes = bytes([first_byte])
+            stop: Optional[bytes] = get_upper_bound(start)
+
+            if first_byte == 1:
+                self._profile_score_range(start, stop, depth, sample_size)
+            else:
+                self._profile_range(start, stop, depth, sample_size)
+
+    @traced('keyspace.profile_range', CATEGORY_IO)
+    def _profile_range(self, start: bytes, stop: Optional[bytes], depth: int, sample_size: int):
+        """Sample the beginning of a key range and scale each group in the sample by approximate size
+
+        """
+        samples: dict = {}
+        exhausted = True
+
+        with self._db.iterator(start=start, stop=stop) as it:
+            for i, (key, value) in enumerate(it):
+                if i >= sample_size:
+                    exhausted = False
+                    break
+
+                label, _ = classify_key(key, depth)
+                group = samples.get(label)
+                if group is None:
+                    group = KeyspaceGroup(label)
+                    samples[label] = group
+                group.add(key, value)
+
+        approximate_size: int = 0 if exhausted else self._get_approximate_size(start, stop)
+        if not exhausted and approximate_size == 0:
+            # Data are only in memtable; sampling can not be scaled
+            self._count_range(start, stop, depth)
+            return
+
+        sample_bytes: int = sum(group.size for group in samples.values())
+
+        for label, sample in samples.items():
+            group = self._get_group(label)
+            if exhausted:
+                self._merge_group(group, sample)
+            else:
+                ratio: float = approximate_size / sample_bytes
+                self._merge_group(group, sample, ratio)
+
+    @traced('keyspace.profile_score_range', CATEGORY_IO)
+    def _profile_score_range(self, start: bytes, stop: Optional[bytes], depth: int, sample_size: int):
+        """Seek over SCORE storage prefixes and estimate each of them
+
+        """
+        with self._db.iterator(start=start, stop=stop) as it:
+            while True:
+                try:
+                    key, value = next(it)
+                except StopIteration:
+                    break
+
+                label, prefix = classify_key(key, depth)
+                group = self._get_group(label)
+
+                if prefix is None:
+                    group.add(key, value)
+                    continue
+
+                upper_bound: Optional[bytes] = get_upper_bound(prefix)
+                sample = KeyspaceGroup(label)
+                exhausted = True
+
+                for sample_key, sample_value in self._db.iterator(start=prefix, stop=upper_bound):
+                    if sample.keys >= sample_size:
+                        exhausted = False
+                        break
+                    sample.add(sample_key, sample_value)
+
+                approximate_size: int = 0 if exhausted else self._get_approximate_size(prefix, upper_bound)
+                if exhausted:
+                    self._merge_group(group, sample)
+                elif approximate_size == 0:
+                    # Data are only in memtable; sampling can not be scaled
+                    self._count_prefix(group, prefix, upper_bound)
+                else:
+                    self._merge_group(group, sample, approximate_size / sample.size)
+
+                if upper_bound is None:
+                    break
+                it.seek(upper_bound)
+
+    def _count_range(self, start: bytes, stop: Optional[bytes], depth: int):
+        for key, value in self._db.iterator(start=start, stop=stop):
+            label, _ = classify_key(key, depth)
+            self._get_group(label).add(key, value)
+
+    def _count_prefix(self, group: 'KeyspaceGroup', prefix: bytes, upper_bound: Optional[bytes]):
+        for key, value in self._db.iterator(start=prefix, stop=upper_bound):
+            group.add(key, value)
+
+    def _get_approximate_size(self, start: bytes, stop: Optional[bytes]) -> int:
+        if stop is None:
+            stop = b'\xff' * 32
+
+        return self._db.approximate_size(start, stop)
+
+    @staticmethod
+    def _merge_group(group: 'KeyspaceGroup', sample: 'KeyspaceGroup', ratio: float = None):
+        if ratio is None:
+            group.keys += sample.keys
+            group.key_size += sample.key_size
+            group.value_size += sample.value_size
+            return
+
+        group.keys += round(sample.keys * ratio)
+        group.key_size += round(sample.key_size * ratio)
+        group.value_size += round(sample.value_size * ratio)
+        group.estimated = True
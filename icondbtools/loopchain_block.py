@@ -13,62 +13,134 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from iconservice.base.address import AddressPrefix, Address
+import json
+from typing import TYPE_CHECKING, Optional, Union
+
+if TYPE_CHECKING:
+    from iconservice.base.address import Address
+
+
+def _hex_to_bytes(value: str) -> bytes:
+    """Convert a hexa string with or without '0x' prefix to bytes
+
+    :raise ValueError: value is not a hexa string
+    """
+    try:
+        return bytes.fromhex(value[2:] if value.startswith('0x') else value)
+    except (AttributeError, TypeError, ValueError):
+        raise ValueError(f'Invalid hexa string: {value!r}') from None
 
 
 class LoopchainBlock(object):
+    """Block stored in loopchain db
+
+    Both v0.1a ('time_stamp', 'confirmed_transaction_list', int height)
+    and newer ('timestamp', 'transactions', hexa string height) schemas are supported.
+    Hashes are kept as hexa strings and peer_id as a string until they are accessed.
+    A malformed hash raises ValueError when it is accessed
+    """
+    __slots__ = (
+        'version', '_prev_block_hash', '_merkle_tree_root_hash', 'timestamp',
+        '_block_hash', 'height', '_peer_id', '_commit_state', 'transactions')
+
     def __init__(self,
                  version: str=None,
-                 prev_block_hash: bytes=None,
-                 merkle_tree_hash: bytes=None,
+                 prev_block_hash: Union[bytes, str, None]=None,
+                 merkle_tree_hash: Union[bytes, str, None]=None,
                  timestamp: int=0,
-                 block_hash: bytes=None,
+                 block_hash: Union[bytes, str, None]=None,
                  height: int=-1,
-                 peer_id: 'Address'=None,
-                 commit_state: bytes=None):
-        super().__init__()
-
+                 peer_id: Union['Address', str, None]=None,
+                 commit_state: Union[bytes, str, None]=None):
         self.version: str = version
-        self.prev_block_hash: bytes = prev_block_hash
-        self.merkle_tree_root_hash: bytes = merkle_tree_hash
+        self._prev_block_hash: Union[bytes, str, None] = prev_block_hash
+        self._merkle_tree_root_hash: Union[bytes, str, None] = merkle_tree_hash
         self.timestamp: int = timestamp
-        self.block_hash: bytes = block_hash
+        self._block_hash: Union[bytes, str, None] = block_hash
         self.height: int = height
-        self.peer_id: 'Address' = peer_id
-        self.commit_state: bytes = commit_state
+        self._peer_id: Union['Address', str, None] = peer_id
+        self._commit_state: Union[bytes, str, None] = commit_state
 
         self.transactions = None
 
+    @property
+    def prev_block_hash(self) -> Optional[bytes]:
+        if self._prev_block_hash.__class__ is str:
+            self._prev_block_hash = _hex_to_bytes(self._prev_block_hash)
+
+        return self._prev_block_hash
+
+    @property
+    def merkle_tree_root_hash(self) -> Optional[bytes]:
+        if self._merkle_tree_root_hash.__class__ is str:
+            self._merkle_tree_root_hash = _hex_to_bytes(self._merkle_tree_root_hash)
+
+        return self._merkle_tree_root_hash
+
+    @property
+    def block_hash(self) -> Optional[bytes]:
+        if self._block_hash.__class__ is str:
+            self._block_hash = _hex_to_bytes(self._block_hash)
+
+        return self._block_hash
+
+    @property
+    def commit_state(self) -> Optional[bytes]:
+        if self._commit_state.__class__ is str:
+            self._commit_state = _hex_to_bytes(self._commit_state)
+
+        return self._commit_state
+
+    @property
+    def peer_id(self) -> Optional['Address']:
+        if isinstance(self._peer_id, str):
+            from iconservice.base.address import Address
+
+            self._peer_id = Address.from_string(self._peer_id) if self._peer_id else None
+
+        return self._peer_id
+
+    @staticmethod
+    def from_bytes(value: bytes) -> 'LoopchainBlock':
+        """Create a block from the raw value stored in loopchain db
+
+        Almost all the time is spent by json.loads() on transactions
+
+        :param value: utf-8 encoded text in json format
+        """
+        return LoopchainBlock.from_dict(json.loads(value))
+
     @staticmethod
     def from_dict(block: dict) -> 'LoopchainBlock':
-        version: str = block['version']
-        prev_block_hash: bytes = bytes.fromhex(block['prev_block_hash'])
-        merkle_tree_root_hash: bytes = bytes.fromhex(block['merkle_tree_root_hash'])
-        timestamp: int = block['time_stamp']
-        block_hash: bytes = bytes.fromhex(block['block_hash'])
-        height: int = block['height']
-
-        peer_id = block['peer_id']
-        if peer_id:
-            peer_id: 'Address' = Address.from_string(peer_id)
+        """Create a block from a block dict without copying its transactions
+
+        """
+        transactions: Optional[list] = block.get('confirmed_transaction_list')
+
+        if transactions is not None:
+            # v0.1a
+            commit_state = block.get('commit_state')
+            loopchain_block = LoopchainBlock(
+                version=block['version'],
+                prev_block_hash=block['prev_block_hash'] or b'',
+                merkle_tree_hash=block['merkle_tree_root_hash'] or b'',
+                timestamp=block['time_stamp'],
+                block_hash=block['block_hash'] or b'',
+                height=block['height'],
+                peer_id=block['peer_id'],
+                commit_state=(commit_state.get('icon_dex') if isinstance(commit_state, dict) else None) or b'')
         else:
-            peer_id = None
-
-        try:
-            commit_state: bytes = bytes.fromhex(block['commit_state']['icon_dex'])
-        except:
-            commit_state: bytes = b''
-
-        loopchain_block = LoopchainBlock(
-            version=version,
-            prev_block_hash=prev_block_hash,
-            merkle_tree_hash=merkle_tree_root_hash,
-            timestamp=timestamp,
-            block_hash=block_hash,
-            height=height,
-            peer_id=peer_id,
-            commit_state=commit_state)
-
-        loopchain_block.transactions: dict = block['confirmed_transaction_list']
+            transactions = block['transactions']
+            loopchain_block = LoopchainBlock(
+                version=block['version'],
+                prev_block_hash=block.get('prevHash') or b'',
+                merkle_tree_hash=block.get('transactionsHash') or b'',
+                timestamp=int(block['timestamp'], 16),
+                block_hash=block['hash'] or b'',
+                height=int(block['height'], 16),
+                peer_id=block.get('leader'),
+                commit_state=b'')
+
+        loopchain_block.transactions = transactions
 
         return loopchain_block
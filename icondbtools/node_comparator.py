@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ICON Foundation Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from .block_database_reader import BlockDatabaseReader
+from .invalid_transaction_checker import get_block_tx_hashes
+from .parallel import split_range
+from .tracing import CATEGORY_IO, traced
+
+
+class NodeComparator(object):
+    """Compare loopchain dbs of several nodes height by height
+
+    Block hashes are compared with the keys which block_height_key points to,
+    so a height where all nodes agree costs one small read per node.
+    Blocks and transaction results are read only for heights where nodes differ.
+    Each db is read in its own thread
+    """
+
+    def __init__(self):
+        self._db_paths: list = []
+        self._block_readers: list = []
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def open(self, db_paths: list):
+        if len(db_paths) < 2:
+            raise ValueError('At least two dbs are required')
+
+        self._db_paths = db_paths
+        for db_path in db_paths:
+            block_reader = BlockDatabaseReader()
+            block_reader.open(db_path)
+            self._block_readers.append(block_reader)
+
+        self._executor = ThreadPoolExecutor(max_workers=len(db_paths))
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+        for block_reader in self._block_readers:
+            block_reader.close()
+        self._block_readers = []
+
+    def get_last_heights(self) -> list:
+        return [reader.get_block_height(reader.get_last_block()) for reader in self._block_readers]
+
+    def run(self, start: int, end: int, chunk_size: int = 10000, commit_state: bool = False) -> dict:
+        """Compare blocks in [start, end]
+
+        :param start: start height
+        :param end: end height, inclusive. negative value means the lowest last height among nodes
+        :param chunk_size: the number of heights read from each db at once
+        :param commit_state: compare commit_state of every height. Block bodies are read for all heights
+        :return: summary. first_different_height is None if all nodes agree
+        """
+        if end < 0:
+            end = min(self.get_last_heights())
+
+        different_heights: int = 0
+        first_different_height: Optional[int] = None
+
+        for chunk_start, chunk_end in split_range(start, end, chunk_size):
+            reader_func = self._read_blocks if commit_state else self._read_block_keys
+            chunks: list = list(self._executor.map(
+                lambda reader: reader_func(reader, chunk_start, chunk_end), self._block_readers))
+
+            for i, height in enumerate(range(chunk_start, chunk_end + 1)):
+                values = [chunk[i] for chunk in chunks]
+                if all(value == values[0] for value in values[1:]):
+                    continue
+
+                different_heights += 1
+                if first_different_height is None:
+                    first_different_height = height
+                self._compare_height(height)
+
+        return {
+            'start': start,
+            'end': end,
+            'nodes': len(self._block_readers),
+            'different_heights': different_heights,
+            'first_different_height': first_different_height}
+
+    @staticmethod
+    @traced('compare.read_block_keys', CATEGORY_IO)
+    def _read_block_keys(reader: 'BlockDatabaseReader', start: int, end: int) -> list:
+        return [reader.get_block_key_by_block_height(height) for height in range(start, end + 1)]
+
+    @staticmethod
+    @traced('compare.read_blocks', CATEGORY_IO)
+    def _read_blocks(reader: 'BlockDatabaseReader', start: int, end: int) -> list:
+        """Read (block hash, commit_state) of each height
+
+        """
+        values = []
+
+        for height in range(start, end + 1):
+            block: Optional[dict] = reader.get_block_by_block_height(height)
+            if block is None:
+                values.append(None)
+            else:
+                values.append((reader.get_block_hash(block), reader.get_commit_state(block)))
+
+        return values
+
+    def _compare_height(self, height: int):
+        """Print how blocks of a height differ among nodes, down to transaction results
+
+        """
+        blocks: list = list(self._executor.map(
+            lambda reader: reader.get_block_by_block_height(height), self._block_readers))
+
+        print(f'{height}:')
+        for db_path, block in zip(self._db_paths, blocks):
+            if block is None:
+                print(f'  {db_path}: not found')
+                continue
+
+            commit_state: Optional[bytes] = BlockDatabaseReader.get_commit_state(block)
+            print(f'  {db_path}: '
+                  f'block_hash({BlockDatabaseReader.get_block_hash(block)}) '
+                  f'commit_state({commit_state.hex() if commit_state else None})')
+
+        tx_hashes = []
+        for block in blocks:
+            if block is None:
+                continue
+            for tx_hash in get_block_tx_hashes(block):
+                if tx_hash not in tx_hashes:
+                    tx_hashes.append(tx_hash)
+
+        for tx_hash in tx_hashes:
+            tx_results: list = list(self._executor.map(
+                lambda reader: reader.get_raw_transaction_result_by_hash(tx_hash), self._block_readers))
+            decoded = [None if value is None else json.loads(value) for value in tx_results]
+
+            if any(tx_result != decoded[0] for tx_result in decoded[1:]):
+                print(f'  txHash({tx_hash}) results differ:')
+                for db_path, tx_result in zip(self._db_paths, decoded):
+                    print(f'    {db_path}: {tx_result}')
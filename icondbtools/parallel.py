@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ICON Foundation Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from collections import deque
+from concurrent.futures import Executor
+from typing import Callable, Iterable, Iterator
+
+from . import tracing
+
+
+def split_range(start: int, end: int, chunk_size: int) -> Iterator[tuple]:
+    """Split [start, end] into chunks
+
+    :return: (chunk_start, chunk_end) generator. chunk_end is inclusive
+    """
+    for chunk_start in range(start, end + 1, chunk_size):
+        yield chunk_start, min(chunk_start + chunk_size - 1, end)
+
+
+def map_in_order(executor: 'Executor', func: Callable, iterable: Iterable, max_pending: int) -> Iterator:
+    """Run func over items in executor and yield results in the order of items
+
+    At most max_pending items are submitted ahead of the result being consumed,
+    which keeps memory usage bounded when items are produced faster than processed.
+    iterable is consumed lazily in the caller thread
+
+    :param executor: ThreadPoolExecutor or ProcessPoolExecutor
+    :param func: called with one item
+    :param iterable:
+    :param max_pending: the maximum number of futures in flight
+    :return: result generator
+    """
+    futures = deque()
+
+    for item in iterable:
+        futures.append(executor.submit(func, item))
+
+        if len(futures) >= max_pending:
+            yield _get_result(futures.popleft())
+
+    while futures:
+        yield _get_result(futures.popleft())
+
+
+def _get_result(future):
+    with tracing.span('map_in_order.wait', tracing.CATEGORY_WAIT):
+        return future.result()
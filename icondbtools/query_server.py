@@ -0,0 +1,547 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ICON Foundation Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import inspect
+import json
+import os
+import selectors
+import socket
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from . import tracing
+from .block_database_reader import BlockDatabaseReader
+from .tracing import CATEGORY_COMMAND
+
+# JSON-RPC 2.0 error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+SERVER_ERROR = -32000
+
+# A client sending a longer line without a newline is answered with an error and disconnected
+MAX_LINE_SIZE = 1024 * 1024
+
+
+class QueryError(Exception):
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code: int = code
+        self.message: str = message
+
+
+def parse_query_line(line: str) -> tuple:
+    """Parse a query line of batch command into a method and its params
+
+    lastblock
+    block <height or hash>
+    txresult <hash>
+    account <address>
+    statelastblock
+    token <score address> <user address> [dict db name]
+
+    :param line: ex) 'block 1000'
+    :return: (method, params)
+    """
+    words = line.split()
+    if not words:
+        raise QueryError(INVALID_REQUEST, 'Empty query')
+
+    method, args = words[0], words[1:]
+
+    if method == 'block':
+        if len(args) != 1:
+            raise QueryError(INVALID_PARAMS, f'Invalid arguments: {line}')
+        if args[0].isdigit():
+            return method, {'height': int(args[0])}
+        return method, {'hash': args[0]}
+
+    # method -> (required param names, optional param names)
+    param_names = {
+        'lastblock': ((), ()),
+        'txresult': (('hash',), ()),
+        'account': (('address',), ()),
+        'statelastblock': ((), ()),
+        'token': (('score', 'user'), ('name',))}.get(method)
+    if param_names is None:
+        raise QueryError(METHOD_NOT_FOUND, f'Method not found: {method}')
+
+    required, optional = param_names
+    if not len(required) <= len(args) <= len(required) + len(optional):
+        raise QueryError(INVALID_PARAMS, f'Invalid arguments: {line}')
+
+    names = required + optional
+    return method, dict(zip(names, args))
+
+
+class LRUCache(object):
+    """Thread-safe LRU cache for immutable values like blocks and transaction results
+
+    """
+
+    def __init__(self, size: int):
+        self._size: int = size
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        if self._size <= 0 or value is None:
+            return
+
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            if len(self._items) > self._size:
+                self._items.popitem(last=False)
+
+
+class QueryHandler(object):
+    """Answer JSON-RPC style queries against loopchain db and statedb kept open
+
+    method: params
+        lastblock: {}
+        block: {"height": int} or {"hash": str}
+        txresult: {"hash": str}
+        account: {"address": str}
+        statelastblock: {}
+        token: {"score": str, "user": str, "name": "balances"}
+
+    Methods are safe to call from multiple threads: LevelDB supports concurrent reads
+    """
+    METHODS = ('lastblock', 'block', 'txresult', 'account', 'statelastblock', 'token')
+
+    def __init__(self, cache_size: int = 10000):
+        self._block_reader: Optional['BlockDatabaseReader'] = None
+        self._state_reader = None
+        self._block_cache = LRUCache(cache_size)
+        self._tx_result_cache = LRUCache(cache_size)
+
+    def open(self, db_path: Optional[str], state_db_path: Optional[str] = None):
+        """Open databases which queries are answered from
+
+        :param db_path: loopchain db path. None means that block queries are not available
+        :param state_db_path: statedb path. None means that state queries are not available
+        """
+        if db_path is not None:
+            self._block_reader = BlockDatabaseReader()
+            self._block_reader.open(db_path)
+
+        if state_db_path is not None:
+            # iconservice is imported only when statedb is served
+            from .state_database_reader import StateDatabaseReader
+
+            self._state_reader = StateDatabaseReader()
+            self._state_reader.open(state_db_path)
+
+    def close(self):
+        if self._block_reader is not None:
+            self._block_reader.close()
+            self._block_reader = None
+
+        if self._state_reader is not None:
+            self._state_reader.close()
+            self._state_reader = None
+
+    def handle(self, request) -> Optional[dict]:
+        """Handle a JSON-RPC 2.0 request object
+
+        :param request: decoded request
+        :return: response. None for a notification which has no id
+        """
+        request_id = request.get('id') if isinstance(request, dict) else None
+
+        try:
+            if not isinstance(request, dict) or not isinstance(request.get('method'), str):
+                raise QueryError(INVALID_REQUEST, 'Invalid request')
+
+            params = request.get('params', {})
+            if not isinstance(params, dict):
+                raise QueryError(INVALID_PARAMS, 'params should be an object')
+
+            result = self.query(request['method'], params)
+        except QueryError as e:
+            response = {'jsonrpc': '2.0', 'id': request_id, 'error': {'code': e.code, 'message': e.message}}
+        except Exception as e:
+            response = {'jsonrpc': '2.0', 'id': request_id, 'error': {'code': SERVER_ERROR, 'message': str(e)}}
+        else:
+            response = {'jsonrpc': '2.0', 'id': request_id, 'result': result}
+
+        if isinstance(request, dict) and 'id' not in request:
+            return None
+
+        return response
+
+    def handle_line(self, line: bytes) -> Optional[str]:
+        """Handle one line of the socket protocol: a request object or a batch array
+
+        :param line: utf-8 encoded json
+        :return: json text of the response. None if nothing should be sent back
+        """
+        try:
+            request = json.loads(line)
+        except ValueError:
+            response = {'jsonrpc': '2.0', 'id': None, 'error': {'code': PARSE_ERROR, 'message': 'Parse error'}}
+            return json.dumps(response, separators=(',', ':'))
+
+        if isinstance(request, list):
+            responses = [response for response in map(self.handle, request) if response is not None]
+            if not request:
+                responses = self.handle(None)
+            elif not responses:
+                return None
+        else:
+            responses = self.handle(request)
+            if responses is None:
+                return None
+
+        return json.dumps(responses, separators=(',', ':'))
+
+    def query(self, method: str, params: dict):
+        if method not in self.METHODS:
+            raise QueryError(METHOD_NOT_FOUND, f'Method not found: {method}')
+
+        handler = getattr(self, f'_query_{method}')
+        # TypeError raised in the handler is an internal error, not a params error
+        try:
+            inspect.signature(handler).bind(**params)
+        except TypeError as e:
+            raise QueryError(INVALID_PARAMS, str(e))
+
+        with tracing.span('query', CATEGORY_COMMAND, method=method):
+            return handler(**params)
+
+    def _get_block_reader(self) -> 'BlockDatabaseReader':
+        if self._block_reader is None:
+            raise QueryError(SERVER_ERROR, 'loopchain db is not served')
+        return self._block_reader
+
+    def _get_state_reader(self):
+        if self._state_reader is None:
+            raise QueryError(SERVER_ERROR, 'statedb is not served')
+        return self._state_reader
+
+    def _query_lastblock(self) -> Optional[dict]:
+        # The last block changes while loopchain is running. Do not cache it
+        return self._get_block_reader().get_last_block()
+
+    def _query_block(self, height: int = None, hash: str = None) -> Optional[dict]:
+        block_reader = self._get_block_reader()
+
+        if hash is not None:
+            if hash.startswith('0x'):
+                hash = hash[2:]
+            key = hash
+        elif isinstance(height, int) and height >= 0:
+            key = height
+        else:
+            raise QueryError(INVALID_PARAMS, 'height or hash is required')
+
+        block: Optional[dict] = self._block_cache.get(key)
+        if block is not None:
+            return block
+
+        if isinstance(key, int):
+            block = block_reader.get_block_by_block_height(key)
+        else:
+            raw_block: Optional[bytes] = block_reader.get_raw_block_by_block_hash(key)
+            block = None if raw_block is None else json.loads(raw_block)
+
+        self._block_cache.put(key, block)
+        return block
+
+    def _query_txresult(self, hash: str) -> Optional[dict]:
+        if not isinstance(hash, str):
+            raise QueryError(INVALID_PARAMS, 'hash should be a string')
+        if hash.startswith('0x'):
+            hash = hash[2:]
+
+        tx_result: Optional[dict] = self._tx_result_cache.get(hash)
+        if tx_result is not None:
+            return tx_result
+
+        value: Optional[bytes] = self._get_block_reader().get_raw_transaction_result_by_hash(hash)
+        tx_result = None if value is None else json.loads(value)
+
+        self._tx_result_cache.put(hash, tx_result)
+        return tx_result
+
+    def _query_account(self, address: str) -> Optional[dict]:
+        account = self._get_state_reader().get_account(self._to_address(address))
+        if account is None:
+            return None
+
+        return {
+            'address': str(account.address),
+            'balance': hex(account.balance),
+            'stake': hex(getattr(account, 'stake', 0))}
+
+    def _query_statelastblock(self) -> Optional[dict]:
+        block = self._get_state_reader().get_last_block()
+        if block is None:
+            return None
+
+        return {
+            'height': block.height,
+            'timestamp': block.timestamp,
+            'prev_hash': f'0x{block.prev_hash.hex()}' if block.prev_hash else None,
+            'block_hash': f'0x{block.hash.hex()}'}
+
+    def _query_token(self, score: str, user: str, name: str = 'balances') -> str:
+        value: Optional[bytes] = self._get_state_reader().get_dict_db_value(
+            self._to_address(score), name, self._to_address(user))
+        balance: int = 0 if value is None else int.from_bytes(value, 'big')
+
+        return hex(balance)
+
+    @staticmethod
+    def _to_address(value: str):
+        from iconservice.base.address import Address
+        from iconservice.base.exception import InvalidParamsException
+
+        try:
+            return Address.from_string(value)
+        except InvalidParamsException:
+            raise QueryError(INVALID_PARAMS, f'Invalid address: {value}')
+
+
+class _Connection(object):
+    """Client connection and the incomplete line received from it
+
+    """
+    __slots__ = ('sock', 'buffer', 'closed')
+
+    def __init__(self, sock: socket.socket):
+        self.sock: socket.socket = sock
+        self.buffer = bytearray()
+        self.closed: bool = False
+
+
+class QueryServer(object):
+    """Serve QueryHandler over a unix domain socket
+
+    Each line sent by a client is a JSON-RPC request or batch and is answered with one line.
+    The thread calling run() waits for all connections with a selector and passes received lines
+    to a pool of threads. A connection holds a thread only while its lines are handled,
+    so idle clients do not keep the others waiting. Lines of a connection are answered in order
+    """
+
+    def __init__(self, handler: 'QueryHandler'):
+        self._handler = handler
+        self._socket: Optional[socket.socket] = None
+        self._socket_path: Optional[str] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._selector: Optional[selectors.BaseSelector] = None
+        # close() and workers wake up the selector by writing to this socket pair
+        self._wakeup_reader: Optional[socket.socket] = None
+        self._wakeup_writer: Optional[socket.socket] = None
+        self._connections = set()
+        # Connections of which lines have been handled by workers
+        self._handled_connections = deque()
+        self._lock = threading.Lock()
+        self._closing: bool = False
+        self._run_finished = threading.Event()
+        self._run_finished.set()
+
+    def open(self, socket_path: str, workers: int = 8):
+        if os.path.exists(socket_path):
+            # Remove the socket file left by a server which was killed
+            os.unlink(socket_path)
+
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.bind(socket_path)
+        self._socket.listen(128)
+        self._socket_path = socket_path
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+
+        self._wakeup_reader, self._wakeup_writer = socket.socketpair()
+        self._wakeup_reader.setblocking(False)
+        self._wakeup_writer.setblocking(False)
+
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self._socket, selectors.EVENT_READ)
+        self._selector.register(self._wakeup_reader, selectors.EVENT_READ)
+        self._closing = False
+
+    def run(self):
+        """Accept connections and dispatch their lines until close() or KeyboardInterrupt
+
+        """
+        self._run_finished.clear()
+
+        try:
+            while not self._closing:
+                for key, _ in self._selector.select():
+                    if key.fileobj is self._socket:
+                        if not self._accept():
+                            return
+                    elif key.fileobj is self._wakeup_reader:
+                        self._drain_wakeup_reader()
+                    else:
+                        self._receive(key.data)
+
+                self._register_handled_connections()
+        finally:
+            self._run_finished.set()
+
+    def _accept(self) -> bool:
+        try:
+            sock, _ = self._socket.accept()
+        except OSError:
+            return False
+
+        connection = _Connection(sock)
+        with self._lock:
+            self._connections.add(connection)
+        self._selector.register(sock, selectors.EVENT_READ, connection)
+
+        return True
+
+    def _receive(self, connection: '_Connection'):
+        try:
+            data: bytes = connection.sock.recv(65536)
+        except OSError:
+            data = b''
+
+        if not data:
+            # The client closed the connection
+            self._selector.unregister(connection.sock)
+            self._close_connection(connection)
+            return
+
+        connection.buffer += data
+        end: int = connection.buffer.rfind(b'\n')
+        if end < 0:
+            if len(connection.buffer) > MAX_LINE_SIZE:
+                self._reject_line(connection)
+            return
+
+        lines: list = connection.buffer[:end].split(b'\n')
+        del connection.buffer[:end + 1]
+
+        # Stop watching the connection until its lines are answered to keep responses in order
+        self._selector.unregister(connection.sock)
+        self._executor.submit(self._serve_lines, connection, lines)
+
+    def _reject_line(self, connection: '_Connection'):
+        """Answer a line longer than MAX_LINE_SIZE with an error and close the connection
+
+        """
+        self._selector.unregister(connection.sock)
+
+        response = {
+            'jsonrpc': '2.0', 'id': None,
+            'error': {'code': INVALID_REQUEST, 'message': f'Line too long: > {MAX_LINE_SIZE} bytes'}}
+        try:
+            # Do not let a client which does not read block the selector
+            connection.sock.setblocking(False)
+            connection.sock.send(f'{json.dumps(response, separators=(",", ":"))}\n'.encode())
+        except OSError:
+            pass
+
+        self._close_connection(connection)
+
+    def _serve_lines(self, connection: '_Connection', lines: list):
+        try:
+            for line in lines:
+                if not line.strip():
+                    continue
+
+                response: Optional[str] = self._handler.handle_line(bytes(line))
+                if response is not None:
+                    connection.sock.sendall(f'{response}\n'.encode())
+        except OSError:
+            # The client or close() shut down the connection
+            connection.closed = True
+        finally:
+            with self._lock:
+                self._handled_connections.append(connection)
+            self._wake_up()
+
+    def _register_handled_connections(self):
+        with self._lock:
+            connections = list(self._handled_connections)
+            self._handled_connections.clear()
+
+        for connection in connections:
+            if connection.closed:
+                self._close_connection(connection)
+            else:
+                self._selector.register(connection.sock, selectors.EVENT_READ, connection)
+
+    def _wake_up(self):
+        try:
+            self._wakeup_writer.send(b'\0')
+        except OSError:
+            # The socket buffer is full, so the selector is going to wake up anyway
+            pass
+
+    def _drain_wakeup_reader(self):
+        try:
+            while self._wakeup_reader.recv(4096):
+                pass
+        except BlockingIOError:
+            pass
+
+    def _close_connection(self, connection: '_Connection'):
+        with self._lock:
+            self._connections.discard(connection)
+        connection.sock.close()
+
+    def close(self):
+        # Stop run() called by another thread and wait for it
+        self._closing = True
+        if self._wakeup_writer is not None:
+            self._wake_up()
+        self._run_finished.wait()
+
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+        if self._executor is not None:
+            # Lines being handled are answered
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+        with self._lock:
+            connections = list(self._connections)
+            self._connections.clear()
+            self._handled_connections.clear()
+
+        for connection in connections:
+            connection.sock.close()
+
+        if self._selector is not None:
+            self._selector.close()
+            self._selector = None
+
+        for sock in (self._wakeup_reader, self._wakeup_writer):
+            if sock is not None:
+                sock.close()
+        self._wakeup_reader = self._wakeup_writer = None
+
+        if self._socket_path is not None and os.path.exists(self._socket_path):
+            os.unlink(self._socket_path)
+        self._socket_path = None
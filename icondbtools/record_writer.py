@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ICON Foundation Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import csv
+import json
+import sys
+from typing import Optional
+
+
+class RecordWriter(object):
+    """Write dict records to a file or stdout in csv or ndjson format
+
+    """
+    FORMATS = ('ndjson', 'csv')
+
+    def __init__(self, fmt: str = 'ndjson', fieldnames: list = None):
+        if fmt not in self.FORMATS:
+            raise ValueError(f'Invalid format: {fmt}')
+
+        self._format: str = fmt
+        self._fieldnames: Optional[list] = fieldnames
+        self._file = None
+        self._csv_writer = None
+
+    def open(self, path: Optional[str] = None):
+        """Open the output
+
+        :param path: file path. None or '-' means stdout
+        """
+        if path is None or path == '-':
+            self._file = sys.stdout
+        else:
+            self._file = open(path, 'wt', newline='')
+
+    def write(self, record: dict):
+        if self._format == 'ndjson':
+            self._file.write(json.dumps(record, separators=(',', ':')))
+            self._file.write('\n')
+            return
+
+        if self._csv_writer is None:
+            fieldnames: list = self._fieldnames if self._fieldnames else list(record)
+            self._csv_writer = csv.DictWriter(
+                self._file, fieldnames=fieldnames, restval='', extrasaction='ignore')
+            self._csv_writer.writeheader()
+
+        self._csv_writer.writerow(record)
+
+    def close(self):
+        if self._file is None:
+            return
+
+        if self._file is sys.stdout:
+            self._file.flush()
+        else:
+            self._file.close()
+
+        self._file = None
+        self._csv_writer = None
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ICON Foundation Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Run IconServiceEngine in a worker process of DiffReplayer
+
+Requests and responses are json objects, one per line, on stdin and stdout.
+The worker runs in its own state directory with the iconservice installed in its python environment
+
+    {"method": "open", "params": {...}} -> {"result": {"version": "1.1.0"}}
+    {"method": "invoke", "params": {"block": {...}}} -> {"result": {"state_root_hash": "...", "tx_results": [...]}}
+    {"method": "commit"} -> {"result": null}
+    {"method": "close"} -> {"result": null}
+    failure -> {"error": {"type": "InvalidParamsException", "message": "..."}}
+"""
+
+import json
+import os
+import sys
+from typing import Optional
+
+
+def encode_block(loopchain_block) -> dict:
+    """Convert LoopchainBlock to a json object which workers decode with decode_block()
+
+    """
+    return {
+        'height': loopchain_block.height,
+        'block_hash': loopchain_block.block_hash.hex(),
+        'prev_block_hash': loopchain_block.prev_block_hash.hex(),
+        'timestamp': loopchain_block.timestamp,
+        'transactions': loopchain_block.transactions}
+
+
+def decode_block(value: dict):
+    from .loopchain_block import LoopchainBlock
+
+    loopchain_block = LoopchainBlock(
+        prev_block_hash=bytes.fromhex(value['prev_block_hash']),
+        timestamp=value['timestamp'],
+        block_hash=bytes.fromhex(value['block_hash']),
+        height=value['height'])
+    loopchain_block.transactions = value['transactions']
+
+    return loopchain_block
+
+
+def to_json_value(value):
+    """Convert a value in transaction results of iconservice to a json value
+
+    """
+    if value is None or isinstance(value, (bool, str)):
+        return value
+    if isinstance(value, int):
+        return hex(value)
+    if isinstance(value, bytes):
+        return f'0x{value.hex()}'
+    if isinstance(value, (list, tuple)):
+        return [to_json_value(item) for item in value]
+    if isinstance(value, dict):
+        return {str(key): to_json_value(item) for key, item in value.items()}
+    if hasattr(value, 'to_dict'):
+        return to_json_value(value.to_dict())
+
+    # Address
+    return str(value)
+
+
+class ReplayWorker(object):
+    def __init__(self):
+        self._syncer = None
+        self._block = None
+
+    def open(self, params: dict) -> dict:
+        import iconservice
+        from .icon_service_syncer import IconServiceSyncer
+
+        self._syncer = IconServiceSyncer()
+        self._syncer.open(**params)
+
+        return {'version': getattr(iconservice, '__version__', None), 'path': os.path.dirname(iconservice.__file__)}
+
+    def invoke(self, params: dict) -> dict:
+        self._block, _, tx_results, state_root_hash = self._syncer.invoke(decode_block(params['block']))
+
+        return {
+            'state_root_hash': state_root_hash.hex(),
+            'tx_results': [to_json_value(tx_result) for tx_result in tx_results]}
+
+    def commit(self, _params: dict):
+        self._syncer.commit(self._block)
+
+    def close(self, _params: dict):
+        if self._syncer is not None:
+            self._syncer.close()
+            self._syncer = None
+
+    def handle(self, request: dict) -> dict:
+        method: str = request['method']
+        if method not in ('open', 'invoke', 'commit', 'close'):
+            return {'error': {'type': 'ValueError', 'message': f'Unknown method: {method}'}}
+
+        try:
+            return {'result': getattr(self, method)(request.get('params') or {})}
+        except (KeyboardInterrupt, SystemExit):
+            raise
+        except BaseException as e:
+            # Exceptions of iconservice derive from BaseException
+            return {'error': {'type': type(e).__name__, 'message': str(e)}}
+
+
+def main() -> int:
+    # Only responses are written to the original stdout. Anything else printed goes to stderr
+    responses = os.fdopen(os.dup(sys.stdout.fileno()), 'wt')
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+
+    worker = ReplayWorker()
+    request: Optional[dict] = None
+
+    for line in sys.stdin:
+        request = json.loads(line)
+        responses.write(json.dumps(worker.handle(request)) + '\n')
+        responses.flush()
+
+        if request['method'] == 'close':
+            break
+
+    if request is None or request['method'] != 'close':
+        worker.close({})
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
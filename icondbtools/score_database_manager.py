@@ -1,16 +1,35 @@
+from typing import Iterable, Iterator
+
 import plyvel
 
 from iconservice.base.address import Address
 
+DICT_DB_DATA_TYPE = b'\x01'
+
+
+def create_dict_db_prefix(score_address: 'Address', dict_db_name: str) -> bytes:
+    """Create the key prefix of DictDB entries: score_address|0x01|dict_db_name|
+
+    """
+    items = [
+        score_address.to_bytes(),
+        DICT_DB_DATA_TYPE,
+        dict_db_name.encode('utf-8'),
+        b'']
+    return b'|'.join(items)
+
 
 class ScoreDatabaseManager(object):
     def __init__(self):
         self._db = None
         self._score_address = None
+        # dict_db_name -> b'score_address|\x01|dict_db_name|'
+        self._dict_db_prefixes: dict = {}
 
     def open(self, db_path: str, score_address: 'Address'):
         self._db = plyvel.DB(db_path, create_if_missing=False)
         self._score_address: 'Address' = score_address
+        self._dict_db_prefixes = {}
 
     def read_from_dict_db(self, dict_db_name: str, address: 'Address') -> bytes:
         key: bytes = self._create_dict_db_key(dict_db_name, address)
@@ -20,15 +39,52 @@ class ScoreDatabaseManager(object):
         key: bytes = self._create_dict_db_key(dict_db_name, address)
         self._db.put(key, value)
 
-    def _create_dict_db_key(self, dict_db_name: str, address: bytes) -> bytes:
-        dict_db_data_type: bytes = b'\x01'
-        items = [
-            self._score_address.to_bytes(),
-            dict_db_data_type,
-            dict_db_name.encode('utf-8'),
-            address.to_bytes()]
+    def write_batch_to_dict_db(self, dict_db_name: str, items: Iterable[tuple]) -> int:
+        """Write many values to DictDB with a single write batch
+
+        The batch is applied atomically. Nothing is written if an error happens while iterating items
+
+        :param dict_db_name:
+        :param items: (address, value) iterable
+        :return: the number of written items
+        """
+        prefix: bytes = self._get_dict_db_prefix(dict_db_name)
+        count = 0
+
+        with self._db.write_batch(transaction=True) as write_batch:
+            for address, value in items:
+                write_batch.put(prefix + address.to_bytes(), value)
+                count += 1
+
+        return count
+
+    def iterate_dict_db(self, dict_db_name: str) -> Iterator[tuple]:
+        """Iterate over all entries of DictDB by its key prefix
+
+        :param dict_db_name:
+        :return: (address, value) generator
+        """
+        prefix: bytes = self._get_dict_db_prefix(dict_db_name)
+        prefix_size: int = len(prefix)
+
+        for key, value in self._db.iterator(prefix=prefix):
+            address: 'Address' = Address.from_bytes(key[prefix_size:])
+            if address is None:
+                continue
+
+            yield address, value
+
+    def _get_dict_db_prefix(self, dict_db_name: str) -> bytes:
+        prefix: bytes = self._dict_db_prefixes.get(dict_db_name)
+
+        if prefix is None:
+            prefix = create_dict_db_prefix(self._score_address, dict_db_name)
+            self._dict_db_prefixes[dict_db_name] = prefix
+
+        return prefix
 
-        return b'|'.join(items)
+    def _create_dict_db_key(self, dict_db_name: str, address: 'Address') -> bytes:
+        return self._get_dict_db_prefix(dict_db_name) + address.to_bytes()
 
     def close(self):
         if self._db is None:
@@ -37,3 +93,4 @@ class ScoreDatabaseManager(object):
         self._db.close()
         self._db = None
         self._score_address = None
+        self._dict_db_prefixes = {}
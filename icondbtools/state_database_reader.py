@@ -14,12 +14,20 @@
 # limitations under the License.
 
 import hashlib
+from typing import TYPE_CHECKING, Iterator, Optional
 
 import plyvel
 
 from iconservice.base.block import Block
 from iconservice.icx.icx_account import Account
 
+from . import tracing
+from .score_database_manager import create_dict_db_prefix
+from .tracing import CATEGORY_COMPUTE, CATEGORY_DECODE, CATEGORY_IO, traced
+
+if TYPE_CHECKING:
+    from iconservice.base.address import Address
+
 
 class StateHash(object):
     def __init__(self,
@@ -57,7 +65,33 @@ class StateDatabaseReader(object):
         :param address:
         :return:
         """
-        value: bytes = self._db.get(address.to_bytes())
+        with tracing.span('state_db.get', CATEGORY_IO):
+            value: bytes = self._db.get(address.to_bytes())
+        return self._create_account(address, value)
+
+    def get_accounts(self, addresses: list) -> Iterator[tuple]:
+        """Read the accounts of given addresses against one consistent snapshot
+
+        Keys are read in sorted order for locality
+
+        :param addresses: list of Address
+        :return: (address, account) generator. account is None if not found
+        """
+        items: list = sorted(
+            ((address.to_bytes(), address) for address in addresses), key=lambda item: item[0])
+
+        snapshot = self._db.snapshot()
+        try:
+            for key, address in items:
+                with tracing.span('state_db.get', CATEGORY_IO):
+                    value: bytes = snapshot.get(key)
+                yield address, self._create_account(address, value)
+        finally:
+            snapshot.close()
+
+    @staticmethod
+    @traced('state_db.decode_account', CATEGORY_DECODE)
+    def _create_account(address: 'Address', value: bytes) -> Optional['Account']:
         if value is None:
             return None
 
@@ -66,6 +100,36 @@ class StateDatabaseReader(object):
 
         return account
 
+    def iterate_account_items(self) -> Iterator[tuple]:
+        """Iterate over the raw key and value pairs of which keys look like account addresses
+
+        :return: (key, value) generator
+        """
+        for key, value in self._db:
+            if self.is_account_key(key):
+                yield key, value
+
+    @staticmethod
+    def is_account_key(key: bytes) -> bool:
+        """Check whether a key has the layout of Address.to_bytes()
+
+        EOA: 20-byte body, SCORE: 0x01 + 20-byte body
+        """
+        size: int = len(key)
+        return size == 20 or (size == 21 and key[0] == 1)
+
+    @traced('state_db.get_dict_db_value', CATEGORY_IO)
+    def get_dict_db_value(self, score_address: 'Address', dict_db_name: str, address: 'Address') -> Optional[bytes]:
+        """Read a value of DictDB in a SCORE without opening ScoreDatabaseManager
+
+        :param score_address:
+        :param dict_db_name: ex) 'balances' of Standard Token
+        :param address: key of DictDB
+        :return: None if not found
+        """
+        return self._db.get(create_dict_db_prefix(score_address, dict_db_name) + address.to_bytes())
+
+    @traced('state_db.get_last_block', CATEGORY_IO)
     def get_last_block(self) -> 'Block':
         """Read the last commited block from statedb
 
@@ -77,6 +141,7 @@ class StateDatabaseReader(object):
 
         return Block.from_bytes(value)
 
+    @traced('state_db.create_state_hash', CATEGORY_COMPUTE)
     def create_state_hash(self, prefix: bytes=None) -> 'StateHash':
         """Read key and value from state db and create sha3 hash value from them
 
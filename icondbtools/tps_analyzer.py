@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ICON Foundation Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+from datetime import datetime, timezone
+
+import numpy as np
+
+from .block_database_reader import BlockDatabaseReader
+from .record_writer import RecordWriter
+from .tracing import CATEGORY_COMPUTE, CATEGORY_IO, traced
+
+PERCENTILES = (50, 90, 95, 99)
+AGGREGATION_PERIODS = (('hour', 3600), ('day', 86400))
+
+
+def compute_rolling_tps(timestamps_us: 'np.ndarray', tx_counts: 'np.ndarray', window_s: int) -> 'np.ndarray':
+    """Compute tps of the window which ends at each block
+
+    The window of block i contains blocks of which timestamps are in (timestamps[i] - window, timestamps[i]]
+
+    :param timestamps_us: non-decreasing block timestamps in microseconds
+    :param tx_counts: the number of transactions in each block
+    :param window_s: window size in seconds
+    :return: tps array
+    """
+    window_us: int = window_s * 10 ** 6
+    cumulative = np.concatenate(([0], np.cumsum(tx_counts)))
+    left = np.searchsorted(timestamps_us, timestamps_us - window_us, side='right')
+    window_txs = cumulative[1:] - cumulative[left]
+
+    return window_txs / window_s
+
+
+def find_peak_windows(timestamps_us: 'np.ndarray', rolling_tps: 'np.ndarray', window_s: int, count: int) -> list:
+    """Find the indexes of the highest rolling tps windows which do not overlap each other
+
+    :return: indexes of the last blocks in peak windows, in descending order of tps
+    """
+    window_us: int = window_s * 10 ** 6
+    peaks = []
+
+    for i in np.argsort(rolling_tps, kind='stable')[::-1]:
+        if len(peaks) >= count:
+            break
+
+        timestamp_us: int = timestamps_us[i]
+        if all(abs(timestamp_us - timestamps_us[peak]) >= window_us for peak in peaks):
+            peaks.append(int(i))
+
+    return peaks
+
+
+def compute_interval_stats(timestamps_us: 'np.ndarray') -> dict:
+    """Compute the statistics of block intervals in seconds
+
+    """
+    if len(timestamps_us) < 2:
+        return {}
+
+    intervals_s = np.diff(timestamps_us) / 10 ** 6
+    stats = {
+        'min': float(intervals_s.min()),
+        'mean': float(intervals_s.mean()),
+        'max': float(intervals_s.max())}
+
+    for percentile, value in zip(PERCENTILES, np.percentile(intervals_s, PERCENTILES)):
+        stats[f'p{percentile}'] = float(value)
+
+    return stats
+
+
+def aggregate_by_period(timestamps_us: 'np.ndarray', tx_counts: 'np.ndarray', period_s: int) -> list:
+    """Aggregate blocks by fixed wall-clock periods (UTC)
+
+    :param timestamps_us: non-decreasing block timestamps in microseconds
+    :param tx_counts: the number of transactions in each block
+    :param period_s: 3600(hour), 86400(day)
+    :return: list of dict
+    """
+    if len(timestamps_us) == 0:
+        return []
+
+    buckets = timestamps_us // (period_s * 10 ** 6)
+    starts = np.flatnonzero(np.concatenate(([True], buckets[1:] != buckets[:-1])))
+
+    blocks = np.diff(np.concatenate((starts, [len(buckets)])))
+    txs = np.add.reduceat(tx_counts, starts)
+    max_block_txs = np.maximum.reduceat(tx_counts, starts)
+
+    rows = []
+    for bucket, block_count, tx_count, max_txs in zip(buckets[starts], blocks, txs, max_block_txs):
+        start = datetime.fromtimestamp(int(bucket) * period_s, tz=timezone.utc)
+        rows.append({
+            'start': start.isoformat(),
+            'blocks': int(block_count),
+            'txs': int(tx_count),
+            'tps': int(tx_count) / period_s,
+            'max_block_txs': int(max_txs)})
+
+    return rows
+
+
+class TPSAnalyzer(object):
+    """Analyze TPS over a range of blocks with vectorized operations
+
+    Height, timestamp and tx count of each block are loaded into numpy arrays first
+    """
+    FIELDNAMES = ('type', 'start', 'end_height', 'blocks', 'txs', 'tps', 'max_block_txs')
+
+    def __init__(self):
+        self._block_reader = BlockDatabaseReader()
+
+    def open(self, db_path: str):
+        self._block_reader.open(db_path)
+
+    @traced('tps_analyzer.load', CATEGORY_IO)
+    def load(self, start: int, end: int) -> tuple:
+        """Load the header columns of blocks in [start, end]
+
+        :return: (heights, timestamps_us, tx_counts)
+        """
+        size: int = max(end - start + 1, 0)
+        heights = np.arange(start, start + size, dtype=np.int64)
+        timestamps_us = np.empty(size, dtype=np.int64)
+        tx_counts = np.empty(size, dtype=np.int64)
+
+        for i in range(size):
+            block: dict = self._block_reader.get_block_by_block_height(start + i)
+            if block is None:
+                size = i
+                break
+
+            timestamps_us[i] = self._block_reader.get_block_timestamp(block)
+            tx_counts[i] = len(self._block_reader.get_block_transactions(block))
+
+        return heights[:size], timestamps_us[:size], tx_counts[:size]
+
+    def run(self,
+            start: int,
+            end: int,
+            span_us: int = -1,
+            window_s: int = 60,
+            peak_count: int = 10,
+            fmt: str = 'json',
+            output_path: str = None) -> dict:
+        """Analyze tps and write the report
+
+        :param start: start height
+        :param end: end height, inclusive. -1 means the last block
+        :param span_us: analyze blocks only in this span from the start block. -1 means no limit
+        :param window_s: rolling window size in seconds
+        :param peak_count: the number of peak windows to report
+        :param fmt: 'json' or 'csv'
+        :param output_path: None means that the report is not written to a file
+        :return: report
+        """
+        if end < 0:
+            end = self._block_reader.get_block_height(self._block_reader.get_last_block())
+
+        heights, timestamps_us, tx_counts = self.load(start, end)
+
+        if span_us >= 0 and len(timestamps_us) > 0:
+            size: int = np.searchsorted(timestamps_us, timestamps_us[0] + span_us, side='right')
+            heights, timestamps_us, tx_counts = heights[:size], timestamps_us[:size], tx_counts[:size]
+
+        report: dict = self.analyze(heights, timestamps_us, tx_counts, window_s, peak_count)
+        self._print_report(report)
+
+        if output_path is not None:
+            if fmt == 'json':
+                with open(output_path, 'wt') as f:
+                    json.dump(report, f, indent=2)
+            else:
+                self._write_csv(report, output_path)
+
+        return report
+
+    @staticmethod
+    @traced('tps_analyzer.analyze', CATEGORY_COMPUTE)
+    def analyze(heights: 'np.ndarray',
+                timestamps_us: 'np.ndarray',
+                tx_counts: 'np.ndarray',
+                window_s: int,
+                peak_count: int) -> dict:
+        if len(heights) == 0:
+            return {'blocks': 0}
+
+        # Block timestamps are expected to be monotonic. Guard binary searches against clock skew
+        timestamps_us = np.maximum.accumulate(timestamps_us)
+
+        period_us: int = int(timestamps_us[-1] - timestamps_us[0])
+        tx_count: int = int(tx_counts.sum())
+        rolling_tps = compute_rolling_tps(timestamps_us, tx_counts, window_s)
+
+        peaks = []
+        for i in find_peak_windows(timestamps_us, rolling_tps, window_s, peak_count):
+            end_s: float = timestamps_us[i] / 10 ** 6
+            peaks.append({
+                'end_height': int(heights[i]),
+                'start': datetime.fromtimestamp(end_s - window_s, tz=timezone.utc).isoformat(),
+                'end': datetime.fromtimestamp(end_s, tz=timezone.utc).isoformat(),
+                'tps': float(rolling_tps[i])})
+
+        return {
+            'start_height': int(heights[0]),
+            'end_height': int(heights[-1]),
+            'blocks': len(heights),
+            'transactions': tx_count,
+            'period_s': period_us / 10 ** 6,
+            'tps': tx_count * 10 ** 6 / period_us if period_us > 0 else 0.0,
+            'window_s': window_s,
+            'peak_windows': peaks,
+            'block_interval_s': compute_interval_stats(timestamps_us),
+            'block_txs': {
+                'mean': float(tx_counts.mean()),
+                'max': int(tx_counts.max()),
+                **{f'p{p}': float(v) for p, v in zip(PERCENTILES, np.percentile(tx_counts, PERCENTILES))}},
+            **{name: aggregate_by_period(timestamps_us, tx_counts, period_s)
+               for name, period_s in AGGREGATION_PERIODS}}
+
+    def _write_csv(self, report: dict, output_path: str):
+        writer = RecordWriter('csv', list(self.FIELDNAMES))
+        writer.open(output_path)
+
+        try:
+            for peak in report.get('peak_windows', []):
+                writer.write({'type': 'peak', **peak})
+            for name, _ in AGGREGATION_PERIODS:
+                for row in report.get(name, []):
+                    writer.write({'type': name, **row})
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _print_report(report: dict):
+        if report['blocks'] == 0:
+            print('blocks: 0')
+            return
+
+        print(f'blocks: {report["start_height"]} ~ {report["end_height"]} ({report["blocks"]})\n'
+              f'transactions: {report["transactions"]}\n'
+              f'period: {report["period_s"]} seconds\n'
+              f'tps: {report["tps"]}')
+
+        print(f'peak windows ({report["window_s"]}s):')
+        for peak in report['peak_windows']:
+            print(f'  {peak["end_height"]:>10} | {peak["end"]} | {peak["tps"]:.2f}')
+
+        print('block interval (s):')
+        for key, value in report['block_interval_s'].items():
+            print(f'  {key:>4}: {value:.6f}')
+
+    def close(self):
+        self._block_reader.close()
@@ -13,7 +13,34 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import json
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator
+
 from .block_database_reader import BlockDatabaseReader
+from .parallel import map_in_order, split_range
+from .tracing import CATEGORY_COMPUTE, traced
+
+
+@traced('tps.get_block_stats', CATEGORY_COMPUTE)
+def _get_block_stats(raw_blocks: list) -> list:
+    """Decode raw blocks and return their timestamps and tx counts
+
+    Run in a worker process
+
+    :param raw_blocks: list of (height, bytes)
+    :return: list of (height, timestamp_us, tx_count)
+    """
+    stats = []
+
+    for height, value in raw_blocks:
+        block: dict = json.loads(value)
+        stats.append((
+            height,
+            BlockDatabaseReader.get_block_timestamp(block),
+            len(BlockDatabaseReader.get_block_transactions(block))))
+
+    return stats
 
 
 class TPSCalculator(object):
@@ -26,7 +53,16 @@ class TPSCalculator(object):
     def open(self, db_path: str):
         self._block_reader.open(db_path)
 
-    def run(self, start: int, end: int, span_us: int = -1):
+    def run(self, start: int, end: int, span_us: int = -1, workers: int = 0, chunk_size: int = 1000):
+        """Print tx counts of blocks in [start, end] and tps over them
+
+        :param start: start height
+        :param end: end height, inclusive. -1 means the last block
+        :param span_us: calculate tps with blocks only in this span from the start block. -1 means no limit
+        :param workers: the number of worker processes decoding blocks. 0: no worker
+        :param chunk_size: the number of blocks passed to a worker at once
+        :return:
+        """
         tx_count: int = 0
         end = self._validate_end_height(end)
 
@@ -39,14 +75,7 @@ class TPSCalculator(object):
         print(f'{"height":>8} | {"txs":>8} | {"total txs":>10} | {"period_s":>16} | {"total period_s":>16}')
         self._print_horizon_line('-', 80)
 
-        for height in range(start, end + 1):
-            block: dict = self._block_reader.get_block_by_block_height(height)
-
-            try:
-                timestamp_us: int = int(block['timestamp'], 16)
-            except:
-                timestamp_us: int = block['time_stamp']
-
+        for height, timestamp_us, count in self._iterate_block_stats(start, end, workers, chunk_size):
             if height == start:
                 start_us = timestamp_us
             elif height == end:
@@ -55,17 +84,11 @@ class TPSCalculator(object):
                 period_us = timestamp_us - prev_timestamp_us
 
             # Calculate tps with blocks only in the given span
-            if span_us < timestamp_us - start_us:
+            if 0 <= span_us < timestamp_us - start_us:
                 end_us = prev_timestamp_us
                 end = height - 1
                 break
 
-            try:
-                tx_list: list = block['transactions']
-            except:
-                tx_list: list = block['confirmed_transaction_list']
-
-            count = len(tx_list)
             tx_count += count
             total_period_us += period_us
             prev_timestamp_us = timestamp_us
@@ -74,13 +97,30 @@ class TPSCalculator(object):
 
         self._print_result(tx_count, start_us, end_us, start, end)
 
+    def _iterate_block_stats(self, start: int, end: int, workers: int, chunk_size: int) -> Iterator[tuple]:
+        """Yield (height, timestamp_us, tx_count) of blocks in height order
+
+        With workers, blocks are read in this process by chunk and decoded in worker processes
+        """
+        if workers <= 0:
+            for height in range(start, end + 1):
+                block: dict = self._block_reader.get_block_by_block_height(height)
+                yield (height,
+                       self._block_reader.get_block_timestamp(block),
+                       len(self._block_reader.get_block_transactions(block)))
+            return
+
+        chunks = (
+            self._block_reader.get_raw_blocks(chunk_start, chunk_end)
+            for chunk_start, chunk_end in split_range(start, end, chunk_size))
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for stats in map_in_order(executor, _get_block_stats, chunks, workers * 2):
+                yield from stats
+
     def _validate_end_height(self, end: int):
         last_block: dict = self._block_reader.get_last_block()
-
-        try:
-            last_height: int = int(last_block['height'], 16)
-        except:
-            last_height: int = last_block["height"]
+        last_height: int = self._block_reader.get_block_height(last_block)
 
         if 0 <= end <= last_height:
             return end
@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ICON Foundation Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Hierarchical span tracing exported in Chrome trace format
+
+    with tracing.span('block_db.get', 'io', height=height):
+        value = db.get(key)
+
+Spans are recorded only after enable(). Otherwise span() returns a shared no-op span.
+Each thread appends finished spans to its own buffer, so recording takes no lock.
+Spans nest by time on the same thread, which chrome://tracing and Perfetto draw as a hierarchy.
+Spans in worker processes are not recorded
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from typing import Optional
+
+CATEGORY_COMMAND = 'command'
+CATEGORY_IO = 'io'
+CATEGORY_DECODE = 'decode'
+CATEGORY_INVOKE = 'invoke'
+CATEGORY_COMPUTE = 'compute'
+# waiting for other threads or processes
+CATEGORY_WAIT = 'wait'
+
+_enabled: bool = False
+_origin_ns: int = 0
+_local = threading.local()
+_buffers_lock = threading.Lock()
+# every _ThreadBuffer created since enable()
+_buffers: list = []
+
+_get_thread_id = getattr(threading, 'get_native_id', threading.get_ident)
+
+
+class _ThreadBuffer(object):
+    __slots__ = ('thread_id', 'thread_name', 'events')
+
+    def __init__(self):
+        self.thread_id: int = _get_thread_id()
+        self.thread_name: str = threading.current_thread().name
+        # (name, category, start_ns, duration_ns, args)
+        self.events: list = []
+
+
+def _get_buffer() -> '_ThreadBuffer':
+    buffer: Optional['_ThreadBuffer'] = getattr(_local, 'buffer', None)
+    if buffer is None:
+        buffer = _ThreadBuffer()
+        _local.buffer = buffer
+        with _buffers_lock:
+            _buffers.append(buffer)
+
+    return buffer
+
+
+class Span(object):
+    """Measure the duration of a block of code with perf_counter_ns
+
+    A span always measures its duration. It is recorded only if tracing is enabled when it ends
+    """
+    __slots__ = ('name', 'category', 'args', 'start_ns', 'end_ns')
+
+    def __init__(self, name: str, category: str = '', args: Optional[dict] = None):
+        self.name: str = name
+        self.category: str = category
+        self.args: Optional[dict] = args
+        self.start_ns: int = 0
+        self.end_ns: int = 0
+
+    def __enter__(self) -> 'Span':
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.end_ns = time.perf_counter_ns()
+        if _enabled:
+            _get_buffer().events.append(
+                (self.name, self.category, self.start_ns, self.end_ns - self.start_ns, self.args))
+
+        return False
+
+    def set(self, key: str, value):
+        """Add an argument shown with the span. ex) the number of transactions found while running
+
+        """
+        if self.args is None:
+            self.args = {}
+        self.args[key] = value
+
+    @property
+    def duration_s(self) -> float:
+        return (self.end_ns - self.start_ns) / 1_000_000_000
+
+
+class _NoopSpan(object):
+    __slots__ = ()
+
+    def __enter__(self) -> '_NoopSpan':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+    def set(self, key: str, value):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def span(name: str, category: str = '', **args):
+    """Return a span to use in a with statement
+
+    :param name: ex) 'block_db.get'
+    :param category: CATEGORY_IO, CATEGORY_DECODE, ...
+    :param args: arguments shown with the span
+    :return: no-op span if tracing is disabled
+    """
+    if not _enabled:
+        return _NOOP_SPAN
+
+    return Span(name, category, args or None)
+
+
+def traced(name: Optional[str] = None, category: str = ''):
+    """Decorator recording each call of a function as a span
+
+    Do not use it for generator functions. Only the creation of a generator would be measured
+
+    :param name: span name. The qualified name of the function by default
+    :param category:
+    """
+    def decorator(func):
+        span_name: str = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+
+            with Span(span_name, category):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def enable():
+    """Start recording spans. Spans recorded before are discarded
+
+    """
+    global _enabled, _origin_ns
+
+    reset()
+    _origin_ns = time.perf_counter_ns()
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def reset():
+    with _buffers_lock:
+        for buffer in _buffers:
+            buffer.events = []
+
+
+def get_events() -> list:
+    """Return recorded spans
+
+    :return: list of (thread id, thread name, name, category, start_ns, duration_ns, args) sorted by start
+    """
+    with _buffers_lock:
+        buffers = list(_buffers)
+
+    events = [
+        (buffer.thread_id, buffer.thread_name) + event
+        for buffer in buffers for event in list(buffer.events)]
+    events.sort(key=lambda event: event[4])
+
+    return events
+
+
+def to_chrome_trace() -> dict:
+    """Convert recorded spans to Chrome trace format which chrome://tracing and Perfetto load
+
+    Timestamps are microseconds since enable()
+    """
+    pid: int = os.getpid()
+    trace_events = [{'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': 0, 'args': {'name': 'icondbtools'}}]
+    thread_names = {}
+
+    for thread_id, thread_name, name, category, start_ns, duration_ns, args in get_events():
+        thread_names[thread_id] = thread_name
+
+        event = {
+            'name': name,
+            'cat': category,
+            'ph': 'X',
+            'ts': (start_ns - _origin_ns) / 1000,
+            'dur': duration_ns / 1000,
+            'pid': pid,
+            'tid': thread_id}
+        if args:
+            event['args'] = args
+        trace_events.append(event)
+
+    for thread_id, thread_name in thread_names.items():
+        trace_events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': thread_id, 'args': {'name': thread_name}})
+
+    return {'traceEvents': trace_events, 'displayTimeUnit': 'ms'}
+
+
+def write_chrome_trace(path: str) -> int:
+    """Write recorded spans to a json file in Chrome trace format
+
+    :return: the number of spans written
+    """
+    trace: dict = to_chrome_trace()
+    with open(path, 'wt') as f:
+        json.dump(trace, f, default=str)
+
+    return sum(1 for event in trace['traceEvents'] if event['ph'] == 'X')
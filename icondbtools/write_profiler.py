@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ICON Foundation Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import heapq
+from typing import Optional
+
+from .keyspace_profiler import classify_key
+from .record_writer import RecordWriter
+
+
+class SpaceSaving(object):
+    """Space-Saving heavy hitters sketch which keeps at most capacity counters
+
+    A new item replaces the item with the smallest count and inherits the count as its error.
+    The true count of an item is in [count - error, count]
+    """
+
+    def __init__(self, capacity: int):
+        self._capacity: int = capacity
+        # item -> [count, error]
+        self._counters: dict = {}
+        # (count, item) with stale entries which are skipped lazily
+        self._heap: list = []
+
+    def __len__(self) -> int:
+        return len(self._counters)
+
+    def add(self, item, weight: int = 1):
+        counter: Optional[list] = self._counters.get(item)
+
+        if counter is None:
+            if len(self._counters) < self._capacity:
+                counter = [0, 0]
+            else:
+                min_count, min_item = self._pop_min()
+                del self._counters[min_item]
+                counter = [min_count, min_count]
+
+            self._counters[item] = counter
+
+        counter[0] += weight
+        heapq.heappush(self._heap, (counter[0], item))
+
+        if len(self._heap) > self._capacity * 4:
+            self._heap = [(counter[0], item) for item, counter in self._counters.items()]
+            heapq.heapify(self._heap)
+
+    def _pop_min(self) -> tuple:
+        while True:
+            count, item = heapq.heappop(self._heap)
+            counter: Optional[list] = self._counters.get(item)
+            if counter is not None and counter[0] == count:
+                return count, item
+
+    def get_top(self, n: int) -> list:
+        """Return the n items with the largest counts
+
+        :return: list of (item, count, error)
+        """
+        items = sorted(self._counters.items(), key=lambda item: item[1][0], reverse=True)[:n]
+        return [(item, count, error) for item, (count, error) in items]
+
+
+class WriteGroup(object):
+    def __init__(self, label: str):
+        self.label: str = label
+        self.writes: int = 0
+        self.deletes: int = 0
+        self.bytes: int = 0
+        self.blocks: int = 0
+        self.last_height: int = -1
+
+    def to_dict(self) -> dict:
+        return {
+            'type': 'group',
+            'group': self.label,
+            'writes': self.writes,
+            'deletes': self.deletes,
+            'bytes': self.bytes,
+            'blocks': self.blocks}
+
+
+class WriteProfiler(object):
+    """Aggregate the states written by each block per SCORE and key prefix
+
+    Keys are grouped with classify_key() which statestats command also uses.
+    The hottest keys are tracked with a bounded SpaceSaving sketch
+    """
+
+    def __init__(self, depth: int = 3, capacity: int = 10000, top_n: int = 20):
+        """
+        :param depth: 1(score address), 2(+ db type), 3(+ db name)
+        :param capacity: the number of counters of the hot key sketch
+        :param top_n: the number of groups and keys printed in a report
+        """
+        self._depth: int = depth
+        self._top_n: int = top_n
+        self._groups: dict = {}
+        self._hot_keys = SpaceSaving(capacity)
+        self._blocks: int = 0
+        self._last_height: int = -1
+
+    def add_block_batch(self, height: int, block_batch):
+        """Aggregate the key and value pairs written by a block
+
+        :param height: block height
+        :param block_batch: BlockBatch of precommit data. key -> value(None means deletion)
+        """
+        self._blocks += 1
+        self._last_height = height
+
+        for key in block_batch:
+            value: Optional[bytes] = block_batch[key]
+            label, _ = classify_key(key, self._depth)
+
+            group: Optional['WriteGroup'] = self._groups.get(label)
+            if group is None:
+                group = WriteGroup(label)
+                self._groups[label] = group
+
+            if value is None:
+                group.deletes += 1
+                group.bytes += len(key)
+            else:
+                group.writes += 1
+                group.bytes += len(key) + len(value)
+
+            if group.last_height != height:
+                group.blocks += 1
+                group.last_height = height
+
+            self._hot_keys.add(key)
+
+    def to_records(self) -> list:
+        records = [{'type': 'summary', 'blocks': self._blocks, 'last_height': self._last_height}]
+
+        groups = sorted(self._groups.values(), key=lambda group: group.bytes, reverse=True)
+        records.extend(group.to_dict() for group in groups)
+
+        for key, count, error in self._hot_keys.get_top(self._top_n):
+            records.append({
+                'type': 'hot_key',
+                'key': key.hex(),
+                'group': classify_key(key, self._depth)[0],
+                'writes': count,
+                'error': error})
+
+        return records
+
+    def report(self, output_path: Optional[str] = None):
+        """Print the largest groups and the hottest keys. All records are written to output_path in ndjson
+
+        :param output_path: overwritten with the latest report. None means print only
+        """
+        records: list = self.to_records()
+
+        print(f'----------- Write profile: {self._last_height} ({self._blocks} blocks) ------------')
+        groups = [record for record in records if record['type'] == 'group']
+        for record in groups[:self._top_n]:
+            print(f'{record["bytes"]:>14} bytes | {record["writes"]:>10} writes | '
+                  f'{record["deletes"]:>8} deletes | {record["group"]}')
+
+        print('hot keys:')
+        for record in records:
+            if record['type'] == 'hot_key':
+                print(f'{record["writes"]:>10} writes | {record["group"]} | {record["key"]}')
+
+        if output_path is not None:
+            writer = RecordWriter('ndjson')
+            writer.open(output_path)
+            try:
+                for record in records:
+                    writer.write(record)
+            finally:
+                writer.close()
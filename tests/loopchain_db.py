@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ICON Foundation Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Build a small loopchain db for tests
+
+Block 0 is a genesis block in v0.1a schema and the others are in 0.3 schema
+"""
+
+import hashlib
+import json
+from typing import Optional
+
+import plyvel
+
+from icondbtools.block_database_reader import BlockDatabaseReader
+
+CHANNEL = 'icon_dex'
+GENESIS_ADDRESS = f'hx{"00" * 19}01'
+
+
+def create_hash(*values) -> str:
+    return hashlib.sha3_256(repr(values).encode()).hexdigest()
+
+
+def create_address(index: int) -> str:
+    return f'hx{index:040x}'
+
+
+def create_genesis_block(salt: str = '') -> dict:
+    block_hash: str = create_hash('genesis', salt)
+    return {
+        'version': '0.1a',
+        'prev_block_hash': '',
+        'time_stamp': 1516819217223222,
+        'confirmed_transaction_list': [{
+            'nid': '0x1',
+            'accounts': [{'name': 'god', 'address': GENESIS_ADDRESS, 'balance': hex(10 ** 27)}],
+            'message': 'genesis'}],
+        'block_hash': block_hash,
+        'height': 0,
+        'commit_state': {CHANNEL: create_hash('state', 0, salt)}}
+
+
+def create_transaction(from_: str, to: str, value: int, salt: str = '') -> dict:
+    return {
+        'version': '0x3',
+        'from': from_,
+        'to': to,
+        'value': hex(value),
+        'stepLimit': '0x186a0',
+        'timestamp': '0x563a6cf330136',
+        'nid': '0x1',
+        'txHash': f'0x{create_hash(from_, to, value, salt)}'}
+
+
+def create_block(height: int, prev_block_hash: str, transactions: list, salt: str = '') -> dict:
+    block_hash: str = create_hash('block', height, prev_block_hash, salt)
+    return {
+        'version': '0.3',
+        'prevHash': f'0x{prev_block_hash}',
+        'hash': f'0x{block_hash}',
+        'height': hex(height),
+        'timestamp': hex(1516819217223222 + height * 2_000_000),
+        'transactions': transactions,
+        'commit_state': {CHANNEL: create_hash('state', height, salt)}}
+
+
+def create_tx_result(tx: dict, height: int, status: int = 1, step_used: int = 100000,
+                     step_price: int = 10 ** 10, failure: Optional[dict] = None) -> dict:
+    result = {
+        'txHash': tx['txHash'][2:],
+        'blockHeight': hex(height),
+        'status': hex(status),
+        'stepUsed': hex(step_used),
+        'stepPrice': hex(step_price),
+        'eventLogs': []}
+    if failure is not None:
+        result['failure'] = failure
+
+    return {'result': result, 'block_hash': ''}
+
+
+def create_chain(count: int, tx_count: int = 2, salt: str = '') -> tuple:
+    """Create blocks in [0, count) of which each block but the genesis has tx_count transfers
+
+    :return: (blocks, tx results by tx_hash without '0x' prefix)
+    """
+    blocks = [create_genesis_block(salt)]
+    tx_results = {}
+
+    for height in range(1, count):
+        transactions = [
+            create_transaction(create_address(height * 100 + i), create_address(height * 100 + i + 1), i, salt)
+            for i in range(tx_count)]
+        for tx in transactions:
+            tx_results[tx['txHash'][2:]] = create_tx_result(tx, height)
+
+        prev_block_hash: str = get_block_hash(blocks[-1])
+        blocks.append(create_block(height, prev_block_hash, transactions, salt))
+
+    return blocks, tx_results
+
+
+def get_block_hash(block: dict) -> str:
+    block_hash: str = block.get('block_hash') or block['hash']
+    return block_hash[2:] if block_hash.startswith('0x') else block_hash
+
+
+def write_loopchain_db(db_path: str, blocks: list, tx_results: dict):
+    db = plyvel.DB(db_path, create_if_missing=True)
+
+    with db.write_batch() as batch:
+        for height, block in enumerate(blocks):
+            key: bytes = get_block_hash(block).encode()
+            batch.put(key, json.dumps(block).encode())
+            batch.put(BlockDatabaseReader.create_block_height_key(height), key)
+
+        if blocks:
+            batch.put(b'last_block_key', get_block_hash(blocks[-1]).encode())
+
+        for tx_hash, tx_result in tx_results.items():
+            batch.put(tx_hash.encode(), json.dumps(tx_result).encode())
+
+    db.close()
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ICON Foundation Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+from icondbtools.account_scanner import AccountAggregator, ICX_IN_LOOP
+
+
+class TestAccountAggregator(unittest.TestCase):
+    def test_add(self):
+        aggregator = AccountAggregator(top_n=2)
+        aggregator.add('hx0', 0)
+        aggregator.add('hx1', ICX_IN_LOOP // 2)
+        aggregator.add('hx2', 5 * ICX_IN_LOOP, 5 * ICX_IN_LOOP)
+        aggregator.add('hx3', 20 * ICX_IN_LOOP)
+
+        self.assertEqual(4, aggregator.accounts)
+        self.assertEqual(25 * ICX_IN_LOOP + ICX_IN_LOOP // 2, aggregator.total_balance)
+        self.assertEqual(5 * ICX_IN_LOOP, aggregator.total_stake)
+
+        top_holders = [item[1] for item in sorted(aggregator.top_holders, reverse=True)]
+        self.assertEqual(['hx3', 'hx2'], top_holders)
+
+        self.assertEqual([1, 0], aggregator.histogram[-1])
+        self.assertEqual([1, ICX_IN_LOOP // 2], aggregator.histogram[0])
+        self.assertEqual([2, 30 * ICX_IN_LOOP], aggregator.histogram[2])
+
+    def test_merge(self):
+        aggregator = AccountAggregator(top_n=3)
+        other = AccountAggregator(top_n=3)
+
+        for i in range(10):
+            target = aggregator if i % 2 == 0 else other
+            target.add(f'hx{i}', i * ICX_IN_LOOP)
+
+        aggregator.merge(other)
+
+        self.assertEqual(10, aggregator.accounts)
+        self.assertEqual(45 * ICX_IN_LOOP, aggregator.total_balance)
+        top_holders = [item[1] for item in sorted(aggregator.top_holders, reverse=True)]
+        self.assertEqual(['hx9', 'hx8', 'hx7'], top_holders)
+        self.assertEqual(9, aggregator.histogram[1][0])
+
+    def test_get_bucket_label(self):
+        self.assertEqual('0', AccountAggregator.get_bucket_label(AccountAggregator.get_bucket(0)))
+        self.assertEqual('(0, 1)', AccountAggregator.get_bucket_label(AccountAggregator.get_bucket(1)))
+        self.assertEqual(
+            '[1e2, 1e3)', AccountAggregator.get_bucket_label(AccountAggregator.get_bucket(123 * ICX_IN_LOOP)))
@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ICON Foundation Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+import plyvel
+
+from icondbtools.address_indexer import LAST_HEIGHT_KEY, AddressIndexer, AddressIndexReader
+from loopchain_db import (
+    GENESIS_ADDRESS, create_address, create_block, create_chain, create_transaction, get_block_hash,
+    write_loopchain_db)
+
+ADDRESS = create_address(0x10)
+OTHER_ADDRESS = create_address(0x11)
+
+
+def create_test_chain(count: int) -> tuple:
+    """Blocks in [0, count) with the transfers of create_chain()
+
+    ADDRESS sends a transaction to OTHER_ADDRESS per block and one more to itself at height 3
+    """
+    blocks, tx_results = create_chain(count, tx_count=2)
+
+    for height in range(1, count):
+        block: dict = blocks[height]
+        transactions: list = block['transactions']
+        transactions.append(create_transaction(ADDRESS, OTHER_ADDRESS, height))
+        if height == 3:
+            transactions.append(create_transaction(ADDRESS, ADDRESS, height))
+
+        blocks[height] = create_block(height, get_block_hash(blocks[height - 1]), transactions)
+
+    return blocks, tx_results
+
+
+class TestAddressIndexer(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.index_path = os.path.join(self.temp_dir, 'index')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _write_chain(self, name: str, count: int) -> tuple:
+        db_path = os.path.join(self.temp_dir, name)
+        blocks, tx_results = create_test_chain(count)
+        write_loopchain_db(db_path, blocks, tx_results)
+
+        return db_path, blocks
+
+    def _index(self, db_path: str, end: int = -1, workers: int = 0, chunk_size: int = 3) -> tuple:
+        indexer = AddressIndexer()
+        try:
+            indexer.open(db_path, self.index_path)
+            with contextlib.redirect_stdout(io.StringIO()):
+                return indexer.run(end, workers=workers, chunk_size=chunk_size)
+        finally:
+            indexer.close()
+
+    def _query(self, *args, **kwargs) -> tuple:
+        reader = AddressIndexReader()
+        try:
+            reader.open(self.index_path)
+            return reader.query(*args, **kwargs)
+        finally:
+            reader.close()
+
+    def _iterate(self, address: str, reverse: bool = False) -> list:
+        reader = AddressIndexReader()
+        try:
+            reader.open(self.index_path)
+            return list(reader.iterate(address, reverse=reverse))
+        finally:
+            reader.close()
+
+    def test_key_layout(self):
+        db_path, blocks = self._write_chain('db', 5)
+        # 2 transfers of create_chain and 1 of ADDRESS per block, 1 self transfer and 1 genesis account
+        self.assertEqual((0, 4, 4 * (2 * 2 + 2) + 1 + 1), self._index(db_path))
+
+        tx: dict = blocks[3]['transactions'][2]
+        db = plyvel.DB(self.index_path)
+        try:
+            key: bytes = b'a' + ADDRESS.encode() + b'|' + (3).to_bytes(8, 'big') + (2).to_bytes(4, 'big')
+            self.assertEqual(f'from|{tx["txHash"]}'.encode(), db.get(key))
+
+            key = b'a' + ADDRESS.encode() + b'|' + (3).to_bytes(8, 'big') + (3).to_bytes(4, 'big')
+            self.assertTrue(db.get(key).startswith(b'self|0x'))
+
+            key = b'a' + GENESIS_ADDRESS.encode() + b'|' + (0).to_bytes(8, 'big') + (0).to_bytes(4, 'big')
+            self.assertEqual(b'to|', db.get(key))
+
+            self.assertEqual((4).to_bytes(8, 'big'), db.get(LAST_HEIGHT_KEY))
+        finally:
+            db.close()
+
+        self.assertEqual(
+            [{'height': 3, 'tx_index': 2, 'tx_hash': blocks[3]['transactions'][2]['txHash'], 'direction': 'to'}],
+            self._query(OTHER_ADDRESS, cursor='2:2')[0][:1])
+
+    def test_paging(self):
+        db_path, _ = self._write_chain('db', 12)
+        self._index(db_path)
+
+        # 11 transfers to OTHER_ADDRESS + 1 self transfer
+        expected: list = self._iterate(ADDRESS)
+        self.assertEqual(12, len(expected))
+        self.assertEqual(sorted(expected, key=lambda item: (item['height'], item['tx_index'])), expected)
+        self.assertEqual('self', expected[3]['direction'])
+
+        for limit in (1, 4, 5, 12, 13):
+            for reverse in (False, True):
+                items, cursor = [], None
+                while True:
+                    page, cursor = self._query(ADDRESS, limit=limit, cursor=cursor, reverse=reverse)
+                    self.assertLessEqual(len(page), limit)
+                    items.extend(page)
+                    if cursor is None:
+                        break
+
+                self.assertEqual(expected[::-1] if reverse else expected, items, (limit, reverse))
+
+    def test_cursor_at_page_boundary(self):
+        db_path, _ = self._write_chain('db', 12)
+        self._index(db_path)
+        items: list = self._iterate(ADDRESS)
+
+        page, cursor = self._query(ADDRESS, limit=4)
+        self.assertEqual(items[:4], page)
+        self.assertEqual(f'{items[3]["height"]}:{items[3]["tx_index"]}', cursor)
+
+        # The item at the cursor is not returned again
+        page, cursor = self._query(ADDRESS, limit=4, cursor=cursor)
+        self.assertEqual(items[4:8], page)
+
+        # The last page is full and has no next page
+        page, cursor = self._query(ADDRESS, limit=4, cursor=cursor)
+        self.assertEqual((items[8:], None), (page, cursor))
+
+        last: dict = items[-1]
+        self.assertEqual(([], None), self._query(ADDRESS, cursor=f'{last["height"]}:{last["tx_index"]}'))
+
+        first: dict = items[0]
+        self.assertEqual(
+            ([], None), self._query(ADDRESS, cursor=f'{first["height"]}:{first["tx_index"]}', reverse=True))
+
+        # Other addresses are not included
+        self.assertEqual(([], None), self._query(create_address(0x12), cursor='11:0'))
+
+    def test_incremental(self):
+        db_path, _ = self._write_chain('db', 20)
+
+        self.assertEqual((0, 6), self._index(db_path, end=6)[:2])
+        start, end, count = self._index(db_path, chunk_size=4)
+        self.assertEqual((7, 19), (start, end))
+        # 3 transfers (6 entries) per block from height 7
+        self.assertEqual(13 * 6, count)
+
+        # Nothing to index
+        self.assertEqual((20, 19, 0), self._index(db_path))
+
+        incremental: list = self._iterate(ADDRESS)
+        shutil.rmtree(self.index_path)
+        self._index(db_path, workers=2)
+        self.assertEqual(self._iterate(ADDRESS), incremental)
+
+    def test_incremental_with_new_blocks(self):
+        db_path, _ = self._write_chain('db', 8)
+        self._index(db_path)
+
+        # The same chain with more blocks
+        db_path, _ = self._write_chain('db2', 15)
+        self.assertEqual((8, 14), self._index(db_path)[:2])
+
+        items: list = self._iterate(ADDRESS)
+        self.assertEqual(list(range(1, 15)), sorted({item['height'] for item in items}))
+        self.assertEqual(15, len(items))
+
+
+if __name__ == '__main__':
+    unittest.main()
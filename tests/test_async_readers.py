@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ICON Foundation Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import threading
+import unittest
+
+from icondbtools.async_readers import AsyncReader
+
+
+class SlowReader(object):
+    def __init__(self):
+        self.calls = []
+        self.event = threading.Event()
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def get(self, key):
+        self.event.wait(5)
+        self.calls.append(key)
+        return key * 2
+
+
+class TestAsyncReader(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.reader = SlowReader()
+        self.async_reader = AsyncReader(self.reader, max_workers=1, max_pending=2)
+        self.async_reader.open()
+
+    def tearDown(self):
+        self.reader.event.set()
+        self.async_reader.close()
+        self.loop.close()
+
+    def test_coalescing(self):
+        async def run():
+            tasks = [asyncio.ensure_future(self.async_reader._call('get', key)) for key in (1, 2, 1, 1, 3)]
+            await asyncio.sleep(0.05)
+            self.reader.event.set()
+            return await asyncio.gather(*tasks)
+
+        self.assertEqual([2, 4, 2, 2, 6], self.loop.run_until_complete(run()))
+        self.assertEqual([1, 2, 3], self.reader.calls)
+
+    def test_cancel(self):
+        async def run():
+            first = asyncio.ensure_future(self.async_reader._call('get', 1))
+            shared = [asyncio.ensure_future(self.async_reader._call('get', 2)) for _ in range(2)]
+            queued = asyncio.ensure_future(self.async_reader._call('get', 3))
+            await asyncio.sleep(0.05)
+
+            # Another caller still waits for 2. 3 has not started and nobody else waits for it
+            shared[0].cancel()
+            queued.cancel()
+            await asyncio.sleep(0)
+            self.reader.event.set()
+
+            return await first, await shared[1]
+
+        self.assertEqual((2, 4), self.loop.run_until_complete(run()))
+        self.assertEqual([1, 2], self.reader.calls)
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ICON Foundation Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from icondbtools.block_exporter import (
+    BlockArchiveReader, BlockExporter, MANIFEST_FILE_NAME, _encode_chunk, get_chunk_file_name)
+from icondbtools.block_source import ArchiveBlockSource
+from loopchain_db import create_chain, write_loopchain_db
+
+
+def create_records(start: int, end: int) -> list:
+    return [(height, json.dumps({'height': hex(height)}).encode(), [b'{"status":"0x1"}'])
+            for height in range(start, end + 1)]
+
+
+class TestBlockExporter(unittest.TestCase):
+    def setUp(self):
+        self.archive_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.archive_dir)
+
+    def test_encode_chunk(self):
+        count, data, index = _encode_chunk((create_records(10, 34), 'gzip', 10))
+
+        self.assertEqual(25, count)
+        self.assertEqual([10, 20, 30], [entry[0] for entry in index])
+
+        # Each frame is a gzip member and the whole data is a valid gzip stream
+        first_height, offset, length = index[1]
+        lines = gzip.decompress(data[offset:offset + length]).splitlines()
+        self.assertEqual(10, len(lines))
+        self.assertEqual({'height': 20, 'block': {'height': '0x14'}, 'tx_results': [{'status': '0x1'}]},
+                         json.loads(lines[0]))
+        self.assertEqual(25, len(gzip.decompress(data).splitlines()))
+
+    def test_read_archive(self):
+        with open(os.path.join(self.archive_dir, MANIFEST_FILE_NAME), 'wt') as f:
+            json.dump({'format': 'ndjson'}, f)
+
+        for chunk_start, chunk_end in ((0, 49), (50, 99)):
+            _, data, index = _encode_chunk((create_records(chunk_start, chunk_end), 'ndjson', 7))
+            path = os.path.join(self.archive_dir, get_chunk_file_name(chunk_start, chunk_end, 'ndjson'))
+            BlockExporter._write_chunk(path, data, index)
+
+        reader = BlockArchiveReader()
+        reader.open(self.archive_dir)
+
+        self.assertEqual(99, reader.get_last_height())
+        self.assertEqual(list(range(45, 56)), [record['height'] for record in reader.iterate_records(45, 55)])
+        self.assertEqual('0x63', reader.get_record(99)['block']['height'])
+        self.assertIsNone(reader.get_record(100))
+
+        reader.close()
+
+    def test_archive_block_source(self):
+        with open(os.path.join(self.archive_dir, MANIFEST_FILE_NAME), 'wt') as f:
+            json.dump({'format': 'gzip', 'include_tx_results': True}, f)
+
+        records = [(height, json.dumps({'height': height, 'transactions': [{'txHash': f'0x{height:064x}'}]}).encode(),
+                    [json.dumps({'result': {'status': '0x1'}}).encode()]) for height in range(30)]
+        _, data, index = _encode_chunk((records, 'gzip', 4))
+        BlockExporter._write_chunk(os.path.join(self.archive_dir, get_chunk_file_name(0, 29, 'gzip')), data, index)
+
+        source = ArchiveBlockSource(self.archive_dir, readahead=2)
+        source.open()
+
+        for height, block in zip(range(5, 30), source.iterate_blocks(5, 100)):
+            self.assertEqual(height, block['height'])
+            self.assertEqual({'result': {'status': '0x1'}}, source.get_transaction_result_by_hash(f'{height:064x}'))
+
+        # Stop the background reader in the middle
+        blocks = source.iterate_blocks(0, 29)
+        self.assertEqual(0, next(blocks)['height'])
+        source.close()
+
+    def test_export_tx_results_from_genesis(self):
+        db_path = os.path.join(self.archive_dir, 'db')
+        blocks, tx_results = create_chain(10, tx_count=3)
+        write_loopchain_db(db_path, blocks, tx_results)
+        output_dir = os.path.join(self.archive_dir, 'archive')
+
+        exporter = BlockExporter()
+        exporter.open(db_path)
+        try:
+            self.assertEqual((2, 0), exporter.run(output_dir, 0, 9, chunk_size=5, include_tx_results=True))
+        finally:
+            exporter.close()
+
+        reader = BlockArchiveReader()
+        reader.open(output_dir)
+        records = list(reader.iterate_records(0, 9))
+        reader.close()
+
+        self.assertEqual(list(range(10)), [record['height'] for record in records])
+        # The genesis transaction has no transaction result
+        self.assertEqual([], records[0]['tx_results'])
+        for record in records[1:]:
+            self.assertEqual([tx_results[tx['txHash'][2:]] for tx in record['block']['transactions']],
+                             record['tx_results'])
+
+
+class TestArchiveBlockSourceFromGenesis(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_tx_results(self):
+        db_path = os.path.join(self.temp_dir, 'db')
+        archive_dir = os.path.join(self.temp_dir, 'archive')
+        blocks, tx_results = create_chain(6, tx_count=2)
+        write_loopchain_db(db_path, blocks, tx_results)
+
+        exporter = BlockExporter()
+        exporter.open(db_path)
+        try:
+            exporter.run(archive_dir, 0, 5, chunk_size=3, include_tx_results=True)
+        finally:
+            exporter.close()
+
+        source = ArchiveBlockSource(archive_dir)
+        source.open()
+        try:
+            for block in source.iterate_blocks(0, 5):
+                for tx in block.get('transactions', []):
+                    self.assertEqual(tx_results[tx['txHash'][2:]], source.get_transaction_result_by_hash(tx['txHash']))
+        finally:
+            source.close()
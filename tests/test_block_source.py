@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ICON Foundation Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+import unittest
+
+from icondbtools.block_source import BlockSource
+
+
+class GrowingBlockSource(BlockSource):
+    """Append a batch of blocks on every open like a node which keeps writing blocks
+
+    """
+
+    def __init__(self, batches: list):
+        self._batches: list = batches
+        self._last_height: int = -1
+
+    def open(self):
+        if self._batches:
+            self._last_height += self._batches.pop(0)
+
+    def iterate_blocks(self, start: int, end: int):
+        for height in range(start, min(end, self._last_height) + 1):
+            yield {'height': height}
+
+
+class RecordingEvent(threading.Event):
+    def __init__(self, stop_after: int):
+        super().__init__()
+        self.intervals: list = []
+        self._stop_after: int = stop_after
+
+    def wait(self, timeout=None) -> bool:
+        self.intervals.append(timeout)
+        if len(self.intervals) >= self._stop_after:
+            self.set()
+        return self.is_set()
+
+
+class TestFollowBlocks(unittest.TestCase):
+    def test_follow_until_end(self):
+        source = GrowingBlockSource([3, 0, 0, 2, 5])
+        source.open()
+        stop_event = RecordingEvent(stop_after=100)
+
+        heights = [block['height'] for block in source.follow_blocks(0, 6, stop_event, 0.5, 1.5)]
+
+        self.assertEqual(list(range(7)), heights)
+        # the interval doubles on empty polls and is reset when blocks arrive
+        self.assertEqual([0.5, 0.5, 1.0, 0.5], stop_event.intervals)
+
+    def test_stop_while_waiting(self):
+        source = GrowingBlockSource([2])
+        source.open()
+        stop_event = RecordingEvent(stop_after=4)
+
+        heights = [block['height'] for block in source.follow_blocks(0, 100, stop_event, 1.0, 3.0)]
+
+        self.assertEqual([0, 1], heights)
+        self.assertEqual([1.0, 1.0, 2.0, 3.0], stop_event.intervals)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ICON Foundation Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import plyvel
+
+from icondbtools.block_database_reader import BlockDatabaseReader
+from icondbtools.block_time_index import BlockTimeIndex, parse_datetime_to_us
+from loopchain_db import create_chain, write_loopchain_db
+
+# Timestamp of the block at height 0 in loopchain_db
+GENESIS_TIMESTAMP_US = 1516819217223222
+
+
+class TestBlockTimeIndex(unittest.TestCase):
+    def setUp(self):
+        self.time_index = BlockTimeIndex()
+        for height in (10, 20, 30):
+            self.time_index.put(height, height * 100)
+
+    def test_get(self):
+        self.assertEqual(2000, self.time_index.get(20))
+        self.assertIsNone(self.time_index.get(21))
+
+    def test_get_bounds(self):
+        # between cached heights
+        self.assertEqual((11, 20), self.time_index.get_bounds(1500, 0, 100))
+        # exact match: left finds the height itself, right finds the next one
+        self.assertEqual((11, 20), self.time_index.get_bounds(2000, 0, 100))
+        self.assertEqual((21, 30), self.time_index.get_bounds(2000, 0, 100, right=True))
+        # out of cached range
+        self.assertEqual((0, 10), self.time_index.get_bounds(5, 0, 100))
+        self.assertEqual((31, 100), self.time_index.get_bounds(5000, 0, 100))
+
+    def test_save_and_load(self):
+        path = os.path.join(tempfile.mkdtemp(), 'time_index.json')
+        self.addCleanup(shutil.rmtree, os.path.dirname(path))
+        time_index = BlockTimeIndex(path, 'aa')
+        time_index.put(1, 100)
+        time_index.save()
+
+        time_index = BlockTimeIndex(path, 'aa')
+        time_index.load()
+        self.assertEqual(1, len(time_index))
+        self.assertEqual(100, time_index.get(1))
+
+        # The cache of another db is not loaded
+        for db_id in ('bb', None):
+            time_index = BlockTimeIndex(path, db_id)
+            time_index.load()
+            self.assertEqual(0, len(time_index))
+
+    def test_parse_datetime_to_us(self):
+        self.assertEqual(1545195600 * 10 ** 6, parse_datetime_to_us('2018-12-19T05:00:00+00:00'))
+
+
+class TestFindBlockHeightByTimestamp(unittest.TestCase):
+    def setUp(self):
+        self.db_path = tempfile.mkdtemp()
+        blocks, tx_results = create_chain(20)
+        write_loopchain_db(self.db_path, blocks, tx_results)
+
+        self.reader = BlockDatabaseReader()
+
+    def tearDown(self):
+        self.reader.close()
+        shutil.rmtree(self.db_path)
+
+    def test_find(self):
+        self.reader.open(self.db_path)
+        self.reader.set_time_index(BlockTimeIndex())
+
+        # Blocks are 2 seconds apart
+        timestamp_us: int = GENESIS_TIMESTAMP_US + 5 * 2_000_000
+        self.assertEqual(5, self.reader.find_block_height_by_timestamp(timestamp_us))
+        self.assertEqual(6, self.reader.find_block_height_by_timestamp(timestamp_us, right=True))
+        self.assertEqual(6, self.reader.find_block_height_by_timestamp(timestamp_us + 1))
+        self.assertEqual(0, self.reader.find_block_height_by_timestamp(0))
+        self.assertEqual(20, self.reader.find_block_height_by_timestamp(GENESIS_TIMESTAMP_US * 2))
+
+    def test_missing_block(self):
+        db = plyvel.DB(self.db_path)
+        # The first height probed by the search
+        db.delete(BlockDatabaseReader.create_block_height_key(10))
+        db.close()
+
+        self.reader.open(self.db_path)
+        with self.assertRaisesRegex(ValueError, r'height\(10\)'):
+            self.reader.find_block_height_by_timestamp(GENESIS_TIMESTAMP_US + 3 * 2_000_000)
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ICON Foundation Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import plyvel
+
+from icondbtools.chain_scanner import (
+    ChainScanner, FailedTransactionRule, RULES, ScanRule, TPSRule, ZeroFeeRule, create_rule, register_rule)
+from loopchain_db import create_chain, create_tx_result, write_loopchain_db
+
+PLUGIN_SOURCE = '''
+from icondbtools.chain_scanner import ScanRule
+
+
+class GenesisRule(ScanRule):
+    NAME = 'genesis'
+
+    def __init__(self):
+        super().__init__()
+        self._accounts = 0
+
+    def on_transaction(self, height, tx_index, tx, tx_result):
+        if 'accounts' in tx:
+            self._accounts += len(tx['accounts'])
+            self.write(f'{height}: {tx_index} genesis')
+
+    def finish(self):
+        return {'accounts': self._accounts}
+'''
+
+
+class TestChainScanner(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'db')
+
+        blocks, tx_results = create_chain(10, tx_count=2)
+        self.zero_fee_tx = blocks[3]['transactions'][0]
+        tx_results[self.zero_fee_tx['txHash'][2:]] = create_tx_result(self.zero_fee_tx, 3, step_price=0)
+        self.failed_tx = blocks[5]['transactions'][1]
+        tx_results[self.failed_tx['txHash'][2:]] = create_tx_result(
+            self.failed_tx, 5, status=0, failure={'code': '0x7d64', 'message': 'Out of balance'})
+        write_loopchain_db(self.db_path, blocks, tx_results)
+
+        self.scanner = ChainScanner()
+        self.scanner.open(self.db_path)
+
+    def tearDown(self):
+        self.scanner.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_rules_in_one_pass(self):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            # Findings are written to stdout which is set when a rule is added
+            for rule in (ZeroFeeRule(), FailedTransactionRule(), TPSRule()):
+                self.scanner.add_rule(rule)
+            summaries = self.scanner.run(0, -1)
+
+        self.assertEqual({
+            'zerofee': {'transactions': 18, 'invalid_transactions': 1},
+            'failedtx': {'failed_transactions': 1},
+            # The genesis transaction is counted like tps command
+            'tps': {'blocks': 10, 'transactions': 19, 'period_us': 18_000_000, 'tps': 19 / 18}}, summaries)
+
+        lines = output.getvalue().splitlines()
+        self.assertEqual(2, len(lines))
+        self.assertTrue(lines[0].startswith(f'3: txHash({self.zero_fee_tx["txHash"]}) stepUsed(100000) stepPrice(0)'))
+        self.assertTrue(lines[1].startswith(f'5: txHash({self.failed_tx["txHash"]}) failure('))
+
+    def test_sinks(self):
+        output_dir = os.path.join(self.temp_dir, 'output')
+        os.makedirs(output_dir)
+        for rule in (ZeroFeeRule(), FailedTransactionRule()):
+            self.scanner.add_rule(rule, output_dir)
+
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.scanner.run(1, 9)
+        self.scanner.close()
+
+        self.assertEqual('', output.getvalue())
+        with open(os.path.join(output_dir, 'zerofee.txt'), 'rt') as f:
+            self.assertEqual([f'3: txHash({self.zero_fee_tx["txHash"]}) stepUsed(100000) stepPrice(0)'],
+                             f.read().splitlines())
+        with open(os.path.join(output_dir, 'failedtx.txt'), 'rt') as f:
+            self.assertIn(self.failed_tx['txHash'], f.read())
+
+    def test_tx_results_not_read(self):
+        # Rules which do not need transaction results work without them
+        self.scanner.close()
+        db = plyvel.DB(self.db_path)
+        db.delete(self.zero_fee_tx['txHash'][2:].encode())
+        db.close()
+        self.scanner.open(self.db_path)
+
+        self.scanner.add_rule(TPSRule())
+        self.assertEqual(10, self.scanner.run(0, -1)['tps']['blocks'])
+
+    def test_plugin(self):
+        plugin_dir = os.path.join(self.temp_dir, 'plugins')
+        os.makedirs(plugin_dir)
+        with open(os.path.join(plugin_dir, 'scan_plugin.py'), 'wt') as f:
+            f.write(PLUGIN_SOURCE)
+
+        sys.path.insert(0, plugin_dir)
+        try:
+            rule = create_rule('scan_plugin:GenesisRule')
+        finally:
+            sys.path.remove(plugin_dir)
+            sys.modules.pop('scan_plugin', None)
+
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.scanner.add_rule(rule)
+            self.assertEqual({'genesis': {'accounts': 1}}, self.scanner.run(0, 2))
+        self.assertEqual('0: 0 genesis\n', output.getvalue())
+
+
+class TestRuleRegistry(unittest.TestCase):
+    def test_create_rule(self):
+        self.assertIsInstance(create_rule('zerofee'), ZeroFeeRule)
+        with self.assertRaises(ValueError):
+            create_rule('unknown')
+
+    def test_register_rule(self):
+        @register_rule
+        class CountRule(ScanRule):
+            NAME = 'test_count'
+
+        try:
+            self.assertIsInstance(create_rule('test_count'), CountRule)
+        finally:
+            del RULES['test_count']
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ICON Foundation Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import contextlib
+import io
+import json
+import shutil
+import tempfile
+import unittest
+
+import plyvel
+
+from icondbtools.chain_verifier import (
+    ChainVerifier, HeightBitmap, ISSUE_BROKEN_LINK, ISSUE_HEIGHT_MISMATCH, ISSUE_INVALID_BLOCK,
+    ISSUE_MISSING_TX_RESULT, _get_block_summaries)
+from loopchain_db import create_chain, create_genesis_block, get_block_hash, write_loopchain_db
+
+
+class TestHeightBitmap(unittest.TestCase):
+    def test_iterate_gaps(self):
+        bitmap = HeightBitmap(100, 130)
+        for height in range(100, 131):
+            if height not in (100, 108, 109, 110, 130):
+                bitmap.set(height)
+
+        self.assertTrue(bitmap.get(101))
+        self.assertFalse(bitmap.get(108))
+        self.assertEqual(26, bitmap.count())
+        self.assertEqual([(100, 100), (108, 110), (130, 130)], list(bitmap.iterate_gaps()))
+
+    def test_empty(self):
+        bitmap = HeightBitmap(0, 9)
+        self.assertEqual([(0, 9)], list(bitmap.iterate_gaps()))
+
+
+class TestBlockSummaries(unittest.TestCase):
+    def test_get_block_summaries(self):
+        block_v1 = {'height': 1, 'block_hash': 'aa', 'prev_block_hash': 'bb',
+                    'confirmed_transaction_list': [{'tx_hash': 'cc'}]}
+        block_v2 = {'height': '0x2', 'hash': '0xdd', 'prevHash': '0xaa', 'transactions': [{'txHash': '0xee'}]}
+        raw_blocks = [
+            (1, b'aa', json.dumps(block_v1).encode()),
+            (2, b'dd', json.dumps(block_v2).encode()),
+            (3, b'ff', b'{')]
+
+        self.assertEqual([
+            (1, b'aa', 1, 'aa', 'bb', ['cc']),
+            (2, b'dd', 2, 'dd', 'aa', ['0xee']),
+            (3, b'ff', None, None, None, None)], _get_block_summaries(raw_blocks))
+
+    def test_genesis_block(self):
+        block = create_genesis_block()
+        block_hash = get_block_hash(block)
+
+        self.assertEqual([(0, block_hash.encode(), 0, block_hash, '', [])],
+                         _get_block_summaries([(0, block_hash.encode(), json.dumps(block).encode())]))
+
+
+class TestChainVerifier(unittest.TestCase):
+    def setUp(self):
+        self.db_path = tempfile.mkdtemp()
+        self.blocks, self.tx_results = create_chain(30, tx_count=2)
+        write_loopchain_db(self.db_path, self.blocks, self.tx_results)
+
+    def tearDown(self):
+        shutil.rmtree(self.db_path)
+
+    def verify(self, workers: int = 0) -> tuple:
+        verifier = ChainVerifier()
+        output = io.StringIO()
+        try:
+            verifier.open(self.db_path)
+            with contextlib.redirect_stdout(output):
+                summary = verifier.run(0, -1, workers=workers, chunk_size=7)
+        finally:
+            verifier.close()
+
+        return summary, output.getvalue()
+
+    def test_healthy_chain(self):
+        expected = {
+            'start': 0, 'end': 29, 'blocks': 30, 'transactions': 58, 'gaps': 0, 'missing_blocks': 0, 'issues': 0}
+
+        for workers in (0, 2):
+            self.assertEqual((expected, ''), self.verify(workers))
+
+    def test_issues(self):
+        db = plyvel.DB(self.db_path)
+        db.delete(b'block_height_key' + (10).to_bytes(12, 'big'))
+        db.delete(self.blocks[20]['transactions'][1]['txHash'][2:].encode())
+        db.put(b'block_height_key' + (25).to_bytes(12, 'big'), get_block_hash(self.blocks[24]).encode())
+        db.close()
+
+        summary, output = self.verify()
+
+        self.assertEqual(1, summary['gaps'])
+        self.assertEqual(1, summary['missing_blocks'])
+        self.assertIn(f'20: {ISSUE_MISSING_TX_RESULT}', output)
+        # block_height_key of 25 points to block 24
+        self.assertIn(f'25: {ISSUE_HEIGHT_MISMATCH} height in block: 24', output)
+        self.assertIn(f'26: {ISSUE_BROKEN_LINK}', output)
+        self.assertIn('gap: 10 ~ 10', output)
+
+    def test_undecodable_block(self):
+        db = plyvel.DB(self.db_path)
+        db.put(get_block_hash(self.blocks[12]).encode(), b'{')
+        db.close()
+
+        for workers in (0, 2):
+            summary, output = self.verify(workers)
+
+            # Reported once as an invalid block, not as a gap
+            self.assertEqual(
+                (1, 0, 0, 30), (summary['issues'], summary['gaps'], summary['missing_blocks'], summary['blocks']))
+            self.assertIn(f'12: {ISSUE_INVALID_BLOCK} failed to decode', output)
+            self.assertNotIn('gap:', output)
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ICON Foundation Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import plyvel
+
+from icondbtools.db_compactor import (
+    LEVELS, compact_database, find_databases, get_read_amplification, parse_sstables)
+
+
+class TestParseSstables(unittest.TestCase):
+    def test_parse_sstables(self):
+        text = (
+            "--- level 0 ---\n"
+            " 418:5438['a' @ 14719 : 1 .. 'z' @ 14721 : 1]\n"
+            " 420:5440['b' @ 14797 : 1 .. 'y' @ 14799 : 1]\n"
+            "--- level 1 ---\n"
+            "--- level 2 ---\n"
+            " 12:100000['a' @ 1 : 1 .. 'z' @ 2 : 1]\n")
+
+        levels = parse_sstables(text)
+        self.assertEqual(LEVELS, len(levels))
+        self.assertEqual([(2, 10878), (0, 0), (1, 100000)], levels[:3])
+        self.assertEqual(3, get_read_amplification(levels))
+
+
+class TestCompactDatabase(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, '.statedb', 'icon_dex')
+        os.makedirs(os.path.dirname(self.db_path))
+
+        db = plyvel.DB(self.db_path, create_if_missing=True, write_buffer_size=4096)
+        for i in range(2000):
+            db.put(i.to_bytes(4, 'big'), b'v' * 100)
+        db.close()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_compact_database(self):
+        report: dict = compact_database(self.db_path)
+        before, after = report['before'], report['after']
+
+        self.assertGreater(before['levels'][0][0], 0)
+        self.assertEqual(0, after['levels'][0][0])
+        self.assertLess(after['read_amplification'], before['read_amplification'])
+
+        db = plyvel.DB(self.db_path)
+        try:
+            self.assertEqual(2000, sum(1 for _ in db.iterator()))
+        finally:
+            db.close()
+
+    def test_find_databases(self):
+        self.assertEqual([self.db_path], find_databases(os.path.join(self.temp_dir, '.statedb')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ICON Foundation Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import plyvel
+
+from icondbtools.db_snapshot import TABLE_FILE_EXTENSIONS, DatabaseSnapshot
+
+
+class TestDatabaseSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'db')
+        # Held open during tests like a running node
+        self.db = plyvel.DB(self.db_path, create_if_missing=True, write_buffer_size=4096)
+        for i in range(1000):
+            self.db.put(i.to_bytes(4, 'big'), b'v' * 100)
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_open_locked_db(self):
+        with self.assertRaises(plyvel.IOError):
+            plyvel.DB(self.db_path)
+
+        snapshot = DatabaseSnapshot()
+        path: str = snapshot.open(self.db_path)
+        self.assertEqual(self.temp_dir, os.path.dirname(path))
+
+        # Writes after the checkpoint are not visible
+        self.db.put(b'new', b'value')
+
+        db = plyvel.DB(path)
+        try:
+            self.assertEqual(b'v' * 100, db.get((999).to_bytes(4, 'big')))
+            self.assertEqual(1000, sum(1 for _ in db.iterator()))
+            self.assertIsNone(db.get(b'new'))
+        finally:
+            db.close()
+
+        snapshot.close()
+        self.assertFalse(os.path.exists(path))
+
+    def test_hard_link_tables(self):
+        snapshot = DatabaseSnapshot()
+        path: str = snapshot.open(self.db_path)
+
+        tables = [name for name in os.listdir(path) if name.endswith(TABLE_FILE_EXTENSIONS)]
+        self.assertTrue(tables)
+        for name in tables:
+            self.assertTrue(os.path.samefile(os.path.join(self.db_path, name), os.path.join(path, name)))
+
+        self.assertNotIn('LOCK', os.listdir(path))
+        snapshot.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
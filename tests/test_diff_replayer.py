@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ICON Foundation Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+from icondbtools.diff_replayer import compare_tx_results, resolve_python_command
+from icondbtools.loopchain_block import LoopchainBlock
+from icondbtools.replay_worker import decode_block, encode_block, to_json_value
+
+
+class TestCompareTxResults(unittest.TestCase):
+    def test_same(self):
+        tx_results = [{'tx_hash': '0x01', 'status': '0x1'}, {'tx_hash': '0x02', 'status': '0x0'}]
+        self.assertIsNone(compare_tx_results(tx_results, [dict(tx_result) for tx_result in tx_results]))
+
+    def test_first_difference(self):
+        base = [{'tx_hash': '0x01', 'step_used': '0x64'}, {'tx_hash': '0x02', 'step_used': '0x64', 'status': '0x1'}]
+        target = [{'tx_hash': '0x01', 'step_used': '0x64'}, {'tx_hash': '0x02', 'step_used': '0x65', 'status': '0x1'}]
+
+        self.assertEqual(
+            {'field': 'tx_result', 'index': 1, 'tx_hash': '0x02',
+             'fields': {'step_used': {'base': '0x64', 'target': '0x65'}}},
+            compare_tx_results(base, target))
+
+    def test_count(self):
+        self.assertEqual({'field': 'count', 'base': 1, 'target': 0}, compare_tx_results([{}], []))
+
+
+class TestResolvePythonCommand(unittest.TestCase):
+    def test_resolve(self):
+        self.assertEqual((sys.executable, []), resolve_python_command(sys.executable))
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            self.assertEqual((sys.executable, [temp_dir]), resolve_python_command(temp_dir))
+
+            python = os.path.join(temp_dir, 'bin', 'python')
+            os.makedirs(os.path.dirname(python))
+            open(python, 'w').close()
+            self.assertEqual((python, []), resolve_python_command(temp_dir))
+
+        with self.assertRaises(ValueError):
+            resolve_python_command(os.path.join(tempfile.gettempdir(), 'no-such-python-env'))
+
+
+class TestBlockMessage(unittest.TestCase):
+    def test_encode_decode(self):
+        block = {
+            'version': '0.3',
+            'height': '0x10',
+            'timestamp': '0x5a000',
+            'hash': '0x' + 'ab' * 32,
+            'prevHash': '0x' + 'cd' * 32,
+            'leader': 'hx' + '11' * 20,
+            'transactions': [{'txHash': 'ef' * 32, 'from': 'hx' + '22' * 20, 'to': 'hx' + '33' * 20}]}
+        loopchain_block = LoopchainBlock.from_dict(block)
+
+        decoded = decode_block(json.loads(json.dumps(encode_block(loopchain_block))))
+        for name in ('height', 'timestamp', 'block_hash', 'prev_block_hash', 'transactions'):
+            self.assertEqual(getattr(loopchain_block, name), getattr(decoded, name))
+
+    def test_to_json_value(self):
+        class EventLog(object):
+            def to_dict(self):
+                return {'indexed': ['Transfer(Address,int)', 1], 'data': [b'\x01']}
+
+        self.assertEqual(
+            {'status': '0x1', 'tx_hash': '0x0102', 'event_logs': [{'indexed': ['Transfer(Address,int)', '0x1'],
+                                                                  'data': ['0x01']}], 'failure': None},
+            to_json_value({'status': 1, 'tx_hash': b'\x01\x02', 'event_logs': [EventLog()], 'failure': None}))
+
+
+if __name__ == '__main__':
+    unittest.main()
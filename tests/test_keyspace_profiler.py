@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ICON Foundation Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+from icondbtools.keyspace_profiler import classify_key, get_upper_bound
+
+
+class TestKeyspaceProfiler(unittest.TestCase):
+    def setUp(self):
+        self.score_address = b'\x01' + bytes.fromhex('63af7f2e073985a9e9965765e809f66da3b0f238')
+        self.label = 'cx63af7f2e073985a9e9965765e809f66da3b0f238'
+
+    def test_classify_dict_db_key(self):
+        user = bytes.fromhex('d7cf2f6bcbbfa542a08e9cd0e48bf848018a2ec7')
+        key = b'|'.join([self.score_address, b'\x01', b'balances', user])
+
+        self.assertEqual((self.label, self.score_address + b'|'), classify_key(key, depth=1))
+        self.assertEqual((f'{self.label}|dict', self.score_address + b'|\x01|'), classify_key(key, depth=2))
+        self.assertEqual(
+            (f'{self.label}|dict|balances', self.score_address + b'|\x01|balances|'), classify_key(key, depth=3))
+
+    def test_classify_var_db_key(self):
+        key = b'|'.join([self.score_address, b'\x02', b'total_supply'])
+        self.assertEqual((f'{self.label}|var|total_supply', None), classify_key(key))
+
+    def test_classify_other_keys(self):
+        self.assertEqual(('account', None), classify_key(b'\x11' * 20))
+        self.assertEqual(('account', None), classify_key(self.score_address))
+        self.assertEqual(('other', None), classify_key(b'last_block'))
+
+    def test_get_upper_bound(self):
+        self.assertEqual(b'ab|\x02', get_upper_bound(b'ab|\x01'))
+        self.assertEqual(b'b', get_upper_bound(b'a\xff\xff'))
+        self.assertIsNone(get_upper_bound(b'\xff\xff'))
@@ -13,11 +13,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import json
 import unittest
 
 from iconservice.base.address import Address
 
-from icondbtools.loopchain_block import LoopchainBlock
+from icondbtools.loopchain_block import LoopchainBlock, _hex_to_bytes
 
 
 class TestLoopchainBlock(unittest.TestCase):
@@ -71,3 +72,60 @@ class TestLoopchainBlock(unittest.TestCase):
         loopchain_block = LoopchainBlock.from_dict(block_dict)
         self.assertIsNone(loopchain_block.peer_id)
 
+    def test_from_bytes_with_new_schema(self):
+        block_dict = {
+            'version': '0.3',
+            'prevHash': '0xf578312788010043e7a0b959e0c0dbca87c4e7a90331ac59a91fb2fdb62c8640',
+            'transactionsHash': '0x30cdeb912b4acdac5c2cdd885983648c366ec0d99ce99a841bb4620f34f9b5c9',
+            'timestamp': '0x57648a309f940',
+            'transactions': [{'txHash': '0x30cdeb912b4acdac5c2cdd885983648c366ec0d99ce99a841bb4620f34f9b5c9'}],
+            'hash': '0x15bbaed5a869738b4c40614a4134f666057de1dd492234d7aa3e06f05a5e85ca',
+            'height': '0xe915',
+            'leader': 'hx667e748e93a5a4e1d61c92c482577888e8c35c9d'
+        }
+
+        loopchain_block = LoopchainBlock.from_bytes(json.dumps(block_dict).encode())
+        self.assertEqual('0.3', loopchain_block.version)
+        self.assertEqual(bytes.fromhex(block_dict['prevHash'][2:]), loopchain_block.prev_block_hash)
+        self.assertEqual(bytes.fromhex(block_dict['transactionsHash'][2:]), loopchain_block.merkle_tree_root_hash)
+        self.assertEqual(0x57648a309f940, loopchain_block.timestamp)
+        self.assertEqual(bytes.fromhex(block_dict['hash'][2:]), loopchain_block.block_hash)
+        self.assertEqual(59669, loopchain_block.height)
+        self.assertEqual(Address.from_string(block_dict['leader']), loopchain_block.peer_id)
+        self.assertEqual(b'', loopchain_block.commit_state)
+        self.assertEqual(block_dict['transactions'], loopchain_block.transactions)
+
+        # __slots__ without __dict__
+        self.assertFalse(hasattr(loopchain_block, '__dict__'))
+
+    def test_hex_to_bytes(self):
+        self.assertEqual(b'\x0a\xbc', _hex_to_bytes('0x0abc'))
+        self.assertEqual(b'\x0a\xbc', _hex_to_bytes('0abc'))
+        self.assertEqual(b'', _hex_to_bytes(''))
+
+        for value in ('0', 'x', '0x0', 'abc', '0xzz', None, b'0abc', 10):
+            with self.assertRaises(ValueError):
+                _hex_to_bytes(value)
+
+    def test_lazy_hashes(self):
+        block_hash = '15bbaed5a869738b4c40614a4134f666057de1dd492234d7aa3e06f05a5e85ca'
+        loopchain_block = LoopchainBlock.from_dict({
+            'version': '0.3',
+            'prevHash': '0',
+            'timestamp': '0x57648a309f940',
+            'transactions': [],
+            'hash': f'0x{block_hash}',
+            'height': '0xe915'})
+
+        # A malformed hash is reported when it is read
+        with self.assertRaises(ValueError):
+            _ = loopchain_block.prev_block_hash
+        self.assertEqual(b'', loopchain_block.merkle_tree_root_hash)
+
+        self.assertEqual(bytes.fromhex(block_hash), loopchain_block.block_hash)
+        self.assertIs(loopchain_block.block_hash, loopchain_block.block_hash)
+        self.assertIsNone(loopchain_block.peer_id)
+
+        loopchain_block = LoopchainBlock(block_hash=bytes.fromhex(block_hash))
+        self.assertEqual(bytes.fromhex(block_hash), loopchain_block.block_hash)
+        self.assertIsNone(loopchain_block.prev_block_hash)
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ICON Foundation Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from loopchain_db import create_chain, write_loopchain_db
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_icondbtools(*args, cwd: str = None) -> subprocess.CompletedProcess:
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join([ROOT_DIR] + [path for path in env.get('PYTHONPATH', '').split(os.pathsep) if path])
+
+    return subprocess.run(
+        [sys.executable, '-m', 'icondbtools', *args],
+        cwd=cwd, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True, timeout=60)
+
+
+class TestCommands(unittest.TestCase):
+    """Run commands which do not need iconservice against a small loopchain db
+
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.temp_dir = tempfile.mkdtemp()
+        cls.db_path = os.path.join(cls.temp_dir, 'db')
+        cls.blocks, cls.tx_results = create_chain(20, tx_count=3)
+        write_loopchain_db(cls.db_path, cls.blocks, cls.tx_results)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.temp_dir)
+
+    def assert_command(self, *args) -> str:
+        process = run_icondbtools(*args, cwd=self.temp_dir)
+        self.assertEqual(0, process.returncode, process.stderr)
+
+        return process.stdout
+
+    def test_read_commands(self):
+        self.assertIn('"height": "0x13"', self.assert_command('lastblock', '--db', self.db_path))
+        self.assertIn('"height": "0x5"', self.assert_command('block', '--db', self.db_path, '--height', '5'))
+
+        tx_hash: str = next(iter(self.tx_results))
+        self.assertIn(tx_hash, self.assert_command('txresult', '--db', self.db_path, '--hash', tx_hash))
+
+    def test_tps(self):
+        # The genesis transaction is counted
+        self.assertIn('transactions: 58', self.assert_command('tps', '--db', self.db_path))
+        self.assertIn('transactions: 58', self.assert_command(
+            'tps', '--db', self.db_path, '--workers', '2', '--chunk-size', '7'))
+
+    def test_invalidtx(self):
+        for start in ('0', '1'):
+            self.assertIn('The number of transactions: 57', self.assert_command(
+                'invalidtx', '--db', self.db_path, '--start', start))
+
+        self.assertIn('The number of transactions: 57', self.assert_command(
+            'invalidtx', '--db', self.db_path, '--start', '0', '--workers', '2', '--chunk-size', '7'))
+
+    def test_verify_chain(self):
+        self.assertIn('issues: 0', self.assert_command('verify-chain', '--db', self.db_path))
+
+    def test_scan(self):
+        output: str = self.assert_command('scan', '--db', self.db_path, '--rules', 'zerofee,failedtx,tps')
+        self.assertIn('zerofee: {"transactions": 57, "invalid_transactions": 0}', output)
+
+    def test_export_time_range(self):
+        output_dir = os.path.join(self.temp_dir, 'export')
+        self.addCleanup(shutil.rmtree, output_dir, True)
+
+        # Blocks are 2 seconds apart from 2018-01-24T18:40:17.223222+00:00
+        output: str = self.assert_command(
+            'export', '--db', self.db_path, '--output', output_dir,
+            '--since', '2018-01-24T18:40:27+00:00', '--until', '2018-01-24T18:40:35+00:00')
+        self.assertIn('exported chunks: 1', output)
+
+        with open(os.path.join(output_dir, 'blocks-000000000005-000000000008.ndjson'), 'rt') as f:
+            self.assertEqual([5, 6, 7, 8], [json.loads(line)['height'] for line in f])
+
+    def test_snapshot(self):
+        self.assertIn('"height": "0x13"', self.assert_command('--snapshot', 'lastblock', '--db', self.db_path))
+        self.assertIn('read_amplification', self.assert_command('--snapshot', 'compact', '--db', self.db_path, '--stats'))
+
+    def test_snapshot_of_writing_commands(self):
+        score, user = f'cx{"1" * 40}', f'hx{"2" * 40}'
+
+        for args in (
+                ('compact', '--db', self.db_path),
+                ('token', '--db', self.db_path, '--score', score, '--user', user, '--balance', '100'),
+                ('token', '--db', self.db_path, '--score', score, '--import-csv', 'balances.csv')):
+            process = run_icondbtools('--snapshot', *args, cwd=self.temp_dir)
+            self.assertEqual(1, process.returncode)
+            self.assertIn('--snapshot can not be used', process.stderr)
+
+        # No checkpoint is left
+        self.assertEqual(['db'], os.listdir(self.temp_dir))
+
+    def test_missing_subcommand(self):
+        for command in ('accounts', 'index'):
+            process = run_icondbtools(command, cwd=self.temp_dir)
+            self.assertEqual(2, process.returncode)
+            self.assertIn('required', process.stderr)
+            self.assertNotIn('Traceback', process.stderr)
+
+
+if __name__ == '__main__':
+    unittest.main()
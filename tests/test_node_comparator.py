@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ICON Foundation Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import contextlib
+import copy
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from icondbtools.node_comparator import NodeComparator
+from loopchain_db import CHANNEL, create_block, create_chain, create_tx_result, get_block_hash, write_loopchain_db
+
+DIVERGENT_HEIGHT = 7
+
+
+class TestNodeComparator(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        blocks, tx_results = create_chain(12, tx_count=2)
+
+        # node1 has the same transactions but a different block hash and transaction result from DIVERGENT_HEIGHT
+        forked_blocks = blocks[:DIVERGENT_HEIGHT]
+        for block in blocks[DIVERGENT_HEIGHT:]:
+            height = int(block['height'], 16)
+            forked_blocks.append(create_block(height, get_block_hash(forked_blocks[-1]), block['transactions'], 'fork'))
+        forked_tx_results = dict(tx_results)
+        forked_tx = blocks[DIVERGENT_HEIGHT]['transactions'][1]
+        forked_tx_results[forked_tx['txHash'][2:]] = create_tx_result(forked_tx, DIVERGENT_HEIGHT, status=0)
+        self.forked_tx_hash = forked_tx['txHash'][2:]
+
+        # node2 has the same block hashes but a different commit_state at height 4
+        state_blocks = copy.deepcopy(blocks)
+        state_blocks[4]['commit_state'][CHANNEL] = '00' * 32
+
+        self.db_paths = []
+        for name, node_blocks, node_tx_results in (
+                ('node0', blocks, tx_results),
+                ('node1', forked_blocks, forked_tx_results),
+                ('node2', state_blocks, tx_results),
+                ('node3', blocks, tx_results)):
+            db_path = os.path.join(self.temp_dir, name)
+            write_loopchain_db(db_path, node_blocks, node_tx_results)
+            self.db_paths.append(db_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def compare(self, db_paths: list, **kwargs) -> tuple:
+        comparator = NodeComparator()
+        output = io.StringIO()
+        try:
+            comparator.open(db_paths)
+            with contextlib.redirect_stdout(output):
+                summary = comparator.run(0, -1, chunk_size=5, **kwargs)
+        finally:
+            comparator.close()
+
+        return summary, output.getvalue()
+
+    def test_agree(self):
+        summary, output = self.compare([self.db_paths[0], self.db_paths[3]])
+
+        self.assertEqual(
+            {'start': 0, 'end': 11, 'nodes': 2, 'different_heights': 0, 'first_different_height': None}, summary)
+        self.assertEqual('', output)
+
+    def test_block_hash(self):
+        summary, output = self.compare(self.db_paths[:2])
+
+        self.assertEqual(12 - DIVERGENT_HEIGHT, summary['different_heights'])
+        self.assertEqual(DIVERGENT_HEIGHT, summary['first_different_height'])
+        self.assertTrue(output.startswith(f'{DIVERGENT_HEIGHT}:\n'))
+        # Only the transaction of which results differ is printed
+        self.assertEqual(1, output.count('results differ'))
+        self.assertIn(f'txHash(0x{self.forked_tx_hash}) results differ', output)
+
+    def test_commit_state(self):
+        db_paths = [self.db_paths[0], self.db_paths[2]]
+
+        summary, _ = self.compare(db_paths)
+        self.assertEqual(0, summary['different_heights'])
+
+        summary, output = self.compare(db_paths, commit_state=True)
+        self.assertEqual(1, summary['different_heights'])
+        self.assertEqual(4, summary['first_different_height'])
+        self.assertIn(f'commit_state({"00" * 32})', output)
+
+    def test_different_genesis(self):
+        db_path = os.path.join(self.temp_dir, 'other')
+        blocks, tx_results = create_chain(12, tx_count=2, salt='other')
+        write_loopchain_db(db_path, blocks, tx_results)
+
+        summary, output = self.compare([self.db_paths[0], db_path])
+
+        self.assertEqual(12, summary['different_heights'])
+        self.assertEqual(0, summary['first_different_height'])
+        self.assertTrue(output.startswith('0:\n'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ICON Foundation Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from icondbtools.invalid_transaction_checker import InvalidTransactionChecker
+from icondbtools.parallel import map_in_order, split_range
+from icondbtools.tps_calculator import TPSCalculator
+from loopchain_db import create_chain, create_tx_result, write_loopchain_db
+
+
+class TestSplitRange(unittest.TestCase):
+    def test_split_range(self):
+        self.assertEqual([(0, 2), (3, 5), (6, 6)], list(split_range(0, 6, 3)))
+        self.assertEqual([(1, 3), (4, 6)], list(split_range(1, 6, 3)))
+
+    def test_empty_range(self):
+        self.assertEqual([], list(split_range(5, 4, 3)))
+        self.assertEqual([], list(split_range(5, -1, 3)))
+
+    def test_chunk_larger_than_range(self):
+        self.assertEqual([(3, 7)], list(split_range(3, 7, 100)))
+        self.assertEqual([(3, 3)], list(split_range(3, 3, 100)))
+
+
+class TestMapInOrder(unittest.TestCase):
+    def test_order(self):
+        def work(i: int) -> int:
+            # Later items finish earlier
+            time.sleep((10 - i) * 0.005)
+            return i * i
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(map_in_order(executor, work, range(10), 4))
+
+        self.assertEqual([i * i for i in range(10)], results)
+
+    def test_max_pending(self):
+        lock = threading.Lock()
+        submitted = []
+
+        def items():
+            for i in range(10):
+                with lock:
+                    submitted.append(i)
+                yield i
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            results = map_in_order(executor, lambda i: i, items(), 3)
+
+            self.assertEqual(0, next(results))
+            # Items are consumed lazily: no more than max_pending ahead of the first result
+            self.assertEqual([0, 1, 2], submitted)
+            self.assertEqual(list(range(1, 10)), list(results))
+
+    def test_empty(self):
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            self.assertEqual([], list(map_in_order(executor, lambda i: i, [], 2)))
+
+    def test_exception(self):
+        def work(i: int) -> int:
+            if i == 3:
+                raise ValueError(i)
+            return i
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            results = map_in_order(executor, work, range(10), 2)
+            self.assertEqual([0, 1, 2], [next(results) for _ in range(3)])
+            with self.assertRaises(ValueError):
+                next(results)
+
+
+class TestParallelCommands(unittest.TestCase):
+    """Output with workers is the same as the one without workers
+
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.temp_dir = tempfile.mkdtemp()
+        cls.db_path = os.path.join(cls.temp_dir, 'db')
+
+        blocks, tx_results = create_chain(25, tx_count=3)
+        # Zero fee transactions in different chunks
+        for height, index in ((2, 0), (9, 2), (10, 1), (23, 0)):
+            tx: dict = blocks[height]['transactions'][index]
+            tx_results[tx['txHash'][2:]] = create_tx_result(tx, height, step_price=0)
+        write_loopchain_db(cls.db_path, blocks, tx_results)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.temp_dir)
+
+    def test_tps(self):
+        for start, end, span_us in ((0, -1, -1), (3, 20, -1), (0, -1, 20_000_000)):
+            expected: str = self._run_tool(TPSCalculator, start, end, span_us)
+            self.assertIn('transactions:', expected)
+
+            for chunk_size in (1, 4, 100):
+                self.assertEqual(expected, self._run_tool(
+                    TPSCalculator, start, end, span_us, workers=2, chunk_size=chunk_size))
+
+    def test_invalidtx(self):
+        for start, end in ((0, -1), (1, 20), (9, 10)):
+            expected: str = self._run_tool(InvalidTransactionChecker, start, end)
+
+            for chunk_size in (1, 4, 100):
+                self.assertEqual(expected, self._run_tool(
+                    InvalidTransactionChecker, start, end, workers=2, chunk_size=chunk_size))
+
+        lines = self._run_tool(InvalidTransactionChecker, 0, -1).splitlines()
+        self.assertEqual(['2', '9', '10', '23'], [line.split(':')[0] for line in lines[:-1]])
+        self.assertEqual('The number of transactions: 72', lines[-1])
+
+    def _run_tool(self, tool_class, *args, **kwargs) -> str:
+        tool = tool_class()
+        output = io.StringIO()
+        try:
+            tool.open(self.db_path)
+            with contextlib.redirect_stdout(output):
+                tool.run(*args, **kwargs)
+        finally:
+            tool.close()
+
+        return output.getvalue()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,246 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ICON Foundation Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import importlib.util
+import json
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+import unittest
+
+import plyvel
+
+from icondbtools.query_server import (
+    QueryError, QueryHandler, QueryServer, parse_query_line,
+    INVALID_PARAMS, INVALID_REQUEST, MAX_LINE_SIZE, METHOD_NOT_FOUND, PARSE_ERROR, SERVER_ERROR)
+
+BLOCK_HASH = 'd7c3ebf769b4988cf83225240d2f2208efc21dd69650fd494906a3336291c9a0'
+TX_HASH = '0a1b2c3d'
+
+HAS_ICONSERVICE = importlib.util.find_spec('iconservice') is not None
+
+
+class TestQueryHandler(unittest.TestCase):
+    def setUp(self):
+        self.db_path = tempfile.mkdtemp()
+
+        db = plyvel.DB(self.db_path, create_if_missing=True)
+        block = {'height': 1, 'block_hash': BLOCK_HASH, 'confirmed_transaction_list': []}
+        db.put(BLOCK_HASH.encode(), json.dumps(block).encode())
+        db.put(b'block_height_key' + (1).to_bytes(12, 'big'), BLOCK_HASH.encode())
+        db.put(b'last_block_key', BLOCK_HASH.encode())
+        db.put(TX_HASH.encode(), json.dumps({'result': {'status': '0x1'}}).encode())
+        db.close()
+
+        self.handler = QueryHandler()
+        self.handler.open(self.db_path)
+
+    def tearDown(self):
+        self.handler.close()
+        shutil.rmtree(self.db_path)
+
+    def test_block(self):
+        response = self.handler.handle({'jsonrpc': '2.0', 'id': 1, 'method': 'block', 'params': {'height': 1}})
+        self.assertEqual(BLOCK_HASH, response['result']['block_hash'])
+
+        response = self.handler.handle({'id': 2, 'method': 'block', 'params': {'hash': f'0x{BLOCK_HASH}'}})
+        self.assertEqual(1, response['result']['height'])
+
+        response = self.handler.handle({'id': 3, 'method': 'block', 'params': {'height': 2}})
+        self.assertIsNone(response['result'])
+
+        response = self.handler.handle({'id': 4, 'method': 'block', 'params': {}})
+        self.assertEqual(INVALID_PARAMS, response['error']['code'])
+
+    def test_txresult(self):
+        response = self.handler.handle({'id': 1, 'method': 'txresult', 'params': {'hash': f'0x{TX_HASH}'}})
+        self.assertEqual('0x1', response['result']['result']['status'])
+
+        response = self.handler.handle({'id': 1, 'method': 'txresult', 'params': {'hash': '0xff'}})
+        self.assertIsNone(response['result'])
+
+    def test_errors(self):
+        response = self.handler.handle({'id': 1, 'method': 'unknown'})
+        self.assertEqual(METHOD_NOT_FOUND, response['error']['code'])
+
+        response = self.handler.handle({'id': 1, 'method': 'block', 'params': {'size': 1}})
+        self.assertEqual(INVALID_PARAMS, response['error']['code'])
+
+        response = self.handler.handle({'id': 1, 'method': 'statelastblock'})
+        self.assertEqual(SERVER_ERROR, response['error']['code'])
+
+        response = json.loads(self.handler.handle_line(b'{"id": 1'))
+        self.assertEqual(PARSE_ERROR, response['error']['code'])
+
+    def test_type_error_in_handler(self):
+        def query_lastblock():
+            raise TypeError('internal error')
+
+        self.handler._query_lastblock = query_lastblock
+        response = self.handler.handle({'id': 1, 'method': 'lastblock'})
+        self.assertEqual(SERVER_ERROR, response['error']['code'])
+
+        response = self.handler.handle({'id': 1, 'method': 'lastblock', 'params': {'height': 1}})
+        self.assertEqual(INVALID_PARAMS, response['error']['code'])
+
+    def test_handle_line(self):
+        # batch with a notification which is not answered
+        line = json.dumps([
+            {'id': 1, 'method': 'lastblock'},
+            {'method': 'lastblock'},
+            {'id': 2, 'method': 'block', 'params': {'height': 1}}]).encode()
+        responses = json.loads(self.handler.handle_line(line))
+        self.assertEqual([1, 2], [response['id'] for response in responses])
+
+        self.assertIsNone(self.handler.handle_line(b'{"method": "lastblock"}'))
+
+    @unittest.skipUnless(HAS_ICONSERVICE, 'iconservice is not installed')
+    def test_account_without_stake(self):
+        class Account(object):
+            def __init__(self, address):
+                self.address = address
+                self.balance = 10
+
+        class StateReader(object):
+            @staticmethod
+            def get_account(address):
+                return Account(address)
+
+            def close(self):
+                pass
+
+        self.handler._state_reader = StateReader()
+        address = f'hx{"ab" * 20}'
+        response = self.handler.handle({'id': 1, 'method': 'account', 'params': {'address': address}})
+        self.assertEqual({'address': address, 'balance': '0xa', 'stake': '0x0'}, response['result'])
+
+
+class TestQueryServer(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        db_path = os.path.join(self.temp_dir, 'db')
+
+        db = plyvel.DB(db_path, create_if_missing=True)
+        block = {'height': 1, 'block_hash': BLOCK_HASH, 'confirmed_transaction_list': []}
+        db.put(BLOCK_HASH.encode(), json.dumps(block).encode())
+        db.put(b'last_block_key', BLOCK_HASH.encode())
+        db.close()
+
+        self.handler = QueryHandler()
+        self.handler.open(db_path)
+
+        self.socket_path = os.path.join(self.temp_dir, 'query.sock')
+        self.server = QueryServer(self.handler)
+        self.server.open(self.socket_path, workers=1)
+        self.thread = threading.Thread(target=self.server.run)
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.close()
+        self.thread.join()
+        self.handler.close()
+        shutil.rmtree(self.temp_dir)
+
+    def _connect(self) -> socket.socket:
+        client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        client.settimeout(5)
+        client.connect(self.socket_path)
+        self.addCleanup(client.close)
+
+        return client
+
+    @staticmethod
+    def _read_lines(client: socket.socket, count: int) -> list:
+        data = b''
+        while data.count(b'\n') < count:
+            chunk = client.recv(65536)
+            if not chunk:
+                break
+            data += chunk
+
+        return [json.loads(line) for line in data.splitlines()]
+
+    def test_line_too_long(self):
+        client = self._connect()
+        client.sendall(b'{"id": 1, "method": "lastblock"}\n' + b' ' * (MAX_LINE_SIZE + 1))
+
+        lines: list = self._read_lines(client, 2)
+        self.assertEqual(1, lines[0]['id'])
+        self.assertEqual(INVALID_REQUEST, lines[1]['error']['code'])
+        # The connection is closed
+        self.assertEqual(b'', client.recv(1))
+
+        # Other clients are served
+        client = self._connect()
+        client.sendall(b'{"id": 2, "method": "lastblock"}\n')
+        self.assertEqual(2, self._read_lines(client, 1)[0]['id'])
+
+    def test_more_clients_than_workers(self):
+        # Idle connections do not hold the only worker
+        clients = [self._connect() for _ in range(4)]
+
+        for i, client in enumerate(reversed(clients)):
+            client.sendall(json.dumps({'id': i, 'method': 'lastblock'}).encode() + b'\n')
+            response = self._read_lines(client, 1)[0]
+            self.assertEqual(i, response['id'])
+            self.assertEqual(BLOCK_HASH, response['result']['block_hash'])
+
+    def test_lines_in_order(self):
+        client = self._connect()
+
+        # Requests split across sends and several requests in one send
+        requests = [json.dumps({'id': i, 'method': 'lastblock'}).encode() + b'\n' for i in range(10)]
+        data = b''.join(requests)
+        client.sendall(data[:5])
+        time.sleep(0.05)
+        client.sendall(data[5:] + b'\n{"method": "lastblock"}\n{"id": 10')
+        client.sendall(b', "method": "unknown"}\n')
+
+        responses = self._read_lines(client, 11)
+        self.assertEqual(list(range(11)), [response['id'] for response in responses])
+        self.assertEqual(METHOD_NOT_FOUND, responses[-1]['error']['code'])
+
+    def test_close_with_idle_clients(self):
+        clients = [self._connect() for _ in range(3)]
+        client = clients[0]
+        client.sendall(b'{"id": 1, "method": "lastblock"}\n')
+        self.assertEqual(1, self._read_lines(client, 1)[0]['id'])
+
+        self.server.close()
+        self.thread.join(5)
+        self.assertFalse(self.thread.is_alive())
+        self.assertFalse(os.path.exists(self.socket_path))
+
+        for client in clients:
+            self.assertEqual(b'', client.recv(1))
+
+
+class TestParseQueryLine(unittest.TestCase):
+    def test_parse_query_line(self):
+        self.assertEqual(('block', {'height': 10}), parse_query_line('block 10'))
+        self.assertEqual(('block', {'hash': f'0x{BLOCK_HASH}'}), parse_query_line(f'block 0x{BLOCK_HASH}'))
+        self.assertEqual(('lastblock', {}), parse_query_line('lastblock'))
+        self.assertEqual(
+            ('token', {'score': 'cx1', 'user': 'hx1'}), parse_query_line('token cx1 hx1'))
+        self.assertEqual(
+            ('token', {'score': 'cx1', 'user': 'hx1', 'name': 'balances'}),
+            parse_query_line('token cx1 hx1 balances'))
+
+        for line in ('block', 'txresult', 'account hx1 hx2', 'unknown 1'):
+            with self.assertRaises(QueryError):
+                parse_query_line(line)
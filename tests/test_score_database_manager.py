@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ICON Foundation Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import csv
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+
+import plyvel
+from iconservice.base.address import Address
+
+from icondbtools.score_database_manager import ScoreDatabaseManager, create_dict_db_prefix
+from test_main import run_icondbtools
+
+SCORE_ADDRESS = f'cx{"ab" * 20}'
+
+
+def create_user_address(index: int) -> str:
+    return f'hx{index:040x}'
+
+
+class TestScoreDatabaseManager(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'db')
+        plyvel.DB(self.db_path, create_if_missing=True).close()
+
+        self.score_address = Address.from_string(SCORE_ADDRESS)
+        self.manager = ScoreDatabaseManager()
+        self.manager.open(self.db_path, self.score_address)
+
+    def tearDown(self):
+        self.manager.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_create_dict_db_prefix(self):
+        self.assertEqual(
+            self.score_address.to_bytes() + b'|\x01|balances|',
+            create_dict_db_prefix(self.score_address, 'balances'))
+
+    def test_prefix_cache(self):
+        prefix: bytes = self.manager._get_dict_db_prefix('balances')
+        self.assertIs(prefix, self.manager._get_dict_db_prefix('balances'))
+        self.assertNotEqual(prefix, self.manager._get_dict_db_prefix('allowances'))
+
+        # Prefixes of the previous SCORE are not used after reopening
+        self.manager.close()
+        other_address = Address.from_string(f'cx{"cd" * 20}')
+        self.manager.open(self.db_path, other_address)
+        self.assertEqual(create_dict_db_prefix(other_address, 'balances'), self.manager._get_dict_db_prefix('balances'))
+
+    def test_write_batch_and_iterate(self):
+        items = [(Address.from_string(create_user_address(i)), (i * 100).to_bytes(2, 'big')) for i in range(1, 6)]
+        self.assertEqual(5, self.manager.write_batch_to_dict_db('balances', iter(items)))
+        self.manager.write_to_dict_db('allowances', items[0][0], b'\x01')
+
+        self.assertEqual(items, list(self.manager.iterate_dict_db('balances')))
+        self.assertEqual([(items[0][0], b'\x01')], list(self.manager.iterate_dict_db('allowances')))
+        self.assertEqual(items[2][1], self.manager.read_from_dict_db('balances', items[2][0]))
+        self.assertEqual([], list(self.manager.iterate_dict_db('unknown')))
+
+    def test_write_batch_failure(self):
+        address = Address.from_string(create_user_address(1))
+        self.manager.write_to_dict_db('balances', address, b'\x01')
+
+        def items():
+            for i in range(2, 5):
+                yield Address.from_string(create_user_address(i)), b'\x02'
+            raise ValueError('invalid row')
+
+        with self.assertRaises(ValueError):
+            self.manager.write_batch_to_dict_db('balances', items())
+
+        self.assertEqual([(address, b'\x01')], list(self.manager.iterate_dict_db('balances')))
+
+
+class TestTokenCommand(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'db')
+        plyvel.DB(self.db_path, create_if_missing=True).close()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _write_csv(self, name: str, rows: list) -> str:
+        path = os.path.join(self.temp_dir, name)
+        with open(path, 'wt', newline='') as f:
+            csv.writer(f).writerows(rows)
+
+        return path
+
+    def _token(self, *args) -> subprocess.CompletedProcess:
+        return run_icondbtools('token', '--db', self.db_path, '--score', SCORE_ADDRESS, *args)
+
+    def _export(self) -> list:
+        path = os.path.join(self.temp_dir, 'export.csv')
+        process = self._token('--export-csv', path)
+        self.assertEqual(0, process.returncode, process.stderr)
+
+        with open(path, 'rt', newline='') as f:
+            return list(csv.reader(f))
+
+    def test_import_and_export(self):
+        path: str = self._write_csv('balances.csv', [
+            ['address', 'balance'],
+            [create_user_address(3), '300'],
+            [create_user_address(1), '0x64'],
+            [],
+            [f' {create_user_address(2)} ', ' 10000000000000000000000 ']])
+
+        process = self._token('--import-csv', path)
+        self.assertEqual(0, process.returncode, process.stderr)
+        self.assertIn('imported balances: 3', process.stdout)
+
+        self.assertEqual([
+            ['address', 'balance'],
+            [create_user_address(1), '100'],
+            [create_user_address(2), '10000000000000000000000'],
+            [create_user_address(3), '300']], self._export())
+
+        process = self._token('--user', create_user_address(3))
+        self.assertIn('token balance: 300', process.stdout)
+
+    def test_import_failure(self):
+        path: str = self._write_csv('balances.csv', [[create_user_address(1), '100']])
+        self.assertEqual(0, self._token('--import-csv', path).returncode)
+
+        # The last row is invalid
+        path = self._write_csv('invalid.csv', [
+            [create_user_address(1), '200'],
+            [create_user_address(2), '200'],
+            [create_user_address(3), 'invalid']])
+        self.assertNotEqual(0, self._token('--import-csv', path).returncode)
+
+        self.assertEqual([['address', 'balance'], [create_user_address(1), '100']], self._export())
+
+
+if __name__ == '__main__':
+    unittest.main()
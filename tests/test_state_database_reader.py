@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ICON Foundation Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import argparse
+import csv
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import plyvel
+from iconservice.base.address import Address
+
+from icondbtools.__main__ import run_command_bulk_account
+from icondbtools.state_database_reader import StateDatabaseReader
+
+EOA_ADDRESSES = [f'hx{i:040x}' for i in (9, 3, 7, 1)]
+SCORE_ADDRESS = f'cx{5:040x}'
+MISSING_ADDRESS = f'hx{4:040x}'
+
+
+class SimpleAccount(object):
+    """Decode an account value written by this test instead of the account layout of iconservice
+
+    It has no stake like the accounts of old iconservice
+    """
+
+    @staticmethod
+    def from_bytes(value: bytes) -> 'SimpleAccount':
+        account = SimpleAccount()
+        account.balance = int.from_bytes(value, 'big')
+        return account
+
+
+@mock.patch('icondbtools.state_database_reader.Account', SimpleAccount)
+class TestStateDatabaseReader(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'db')
+
+        # balance of an address is its index + 1
+        self.balances = {
+            address: i + 1 for i, address in enumerate(EOA_ADDRESSES + [SCORE_ADDRESS])}
+
+        db = plyvel.DB(self.db_path, create_if_missing=True)
+        for address, balance in self.balances.items():
+            db.put(Address.from_string(address).to_bytes(), balance.to_bytes(32, 'big'))
+        db.close()
+
+        self.reader = StateDatabaseReader()
+        self.reader.open(self.db_path)
+
+    def tearDown(self):
+        self.reader.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_get_accounts_in_key_order(self):
+        addresses = [Address.from_string(address) for address in [SCORE_ADDRESS, MISSING_ADDRESS] + EOA_ADDRESSES]
+        results = list(self.reader.get_accounts(addresses))
+
+        # EOA keys (20 bytes) come before SCORE keys (b'\x01' + 20 bytes)
+        expected = sorted(EOA_ADDRESSES + [MISSING_ADDRESS]) + [SCORE_ADDRESS]
+        self.assertEqual(expected, [str(address) for address, _ in results])
+
+        for address, account in results:
+            if str(address) == MISSING_ADDRESS:
+                self.assertIsNone(account)
+            else:
+                self.assertEqual(self.balances[str(address)], account.balance)
+                self.assertIs(address, account.address)
+
+    def test_get_accounts_from_snapshot(self):
+        addresses = [Address.from_string(address) for address in EOA_ADDRESSES]
+        results = self.reader.get_accounts(addresses)
+
+        first_address, _ = next(results)
+        self.assertEqual(f'hx{1:040x}', str(first_address))
+
+        # Changes after the first read are not seen
+        db = self.reader._db
+        db.put(Address.from_string(f'hx{3:040x}').to_bytes(), (100).to_bytes(32, 'big'))
+        db.delete(Address.from_string(f'hx{7:040x}').to_bytes())
+        db.put(Address.from_string(MISSING_ADDRESS).to_bytes(), (100).to_bytes(32, 'big'))
+
+        self.assertEqual(
+            [(f'hx{i:040x}', self.balances[f'hx{i:040x}']) for i in (3, 7, 9)],
+            [(str(address), account.balance) for address, account in results])
+
+        self.assertEqual(100, self.reader.get_account(Address.from_string(MISSING_ADDRESS)).balance)
+        self.assertIsNone(self.reader.get_account(Address.from_string(f'hx{7:040x}')))
+
+    def test_get_accounts_empty(self):
+        self.assertEqual([], list(self.reader.get_accounts([])))
+
+    def test_bulk_account(self):
+        self.reader.close()
+
+        addresses_path = os.path.join(self.temp_dir, 'addresses.txt')
+        with open(addresses_path, 'wt') as f:
+            f.write('\n'.join([
+                '# comment', EOA_ADDRESSES[0], '', 'invalid', f'  {MISSING_ADDRESS}  ', SCORE_ADDRESS, '']))
+
+        output_path = os.path.join(self.temp_dir, 'accounts.csv')
+        run_command_bulk_account(argparse.Namespace(
+            db=self.db_path, addresses_file=addresses_path, format='csv', output=output_path))
+
+        with open(output_path, 'rt', newline='') as f:
+            rows = list(csv.DictReader(f))
+
+        # Invalid addresses first, then accounts in key order
+        self.assertEqual([
+            {'address': 'invalid', 'found': 'False', 'balance': '', 'stake': '', 'error': 'invalid address'},
+            {'address': MISSING_ADDRESS, 'found': 'False', 'balance': '', 'stake': '', 'error': ''},
+            {'address': EOA_ADDRESSES[0], 'found': 'True', 'balance': '1', 'stake': '0', 'error': ''},
+            {'address': SCORE_ADDRESS, 'found': 'True', 'balance': '5', 'stake': '0', 'error': ''}], rows)
+
+        output_path = os.path.join(self.temp_dir, 'accounts.ndjson')
+        run_command_bulk_account(argparse.Namespace(
+            db=self.db_path, addresses_file=addresses_path, format='ndjson', output=output_path))
+
+        with open(output_path, 'rt') as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual({'address': MISSING_ADDRESS, 'found': False}, records[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
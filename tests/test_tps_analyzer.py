@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ICON Foundation Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+import numpy as np
+
+from icondbtools.tps_analyzer import (
+    aggregate_by_period, compute_interval_stats, compute_rolling_tps, find_peak_windows, TPSAnalyzer)
+
+
+class TestTPSAnalyzer(unittest.TestCase):
+    def setUp(self):
+        # A block every 2 seconds
+        self.timestamps_us = np.arange(0, 20, 2, dtype=np.int64) * 10 ** 6
+        self.tx_counts = np.array([1, 1, 1, 10, 10, 1, 1, 1, 1, 1], dtype=np.int64)
+
+    def test_compute_rolling_tps(self):
+        rolling_tps = compute_rolling_tps(self.timestamps_us, self.tx_counts, window_s=4)
+        # window of block i: (t[i] - 4s, t[i]] contains blocks i - 1 and i
+        expected = np.array([1, 2, 2, 11, 20, 11, 2, 2, 2, 2]) / 4
+        self.assertTrue(np.allclose(expected, rolling_tps))
+
+    def test_find_peak_windows(self):
+        rolling_tps = compute_rolling_tps(self.timestamps_us, self.tx_counts, window_s=4)
+        peaks = find_peak_windows(self.timestamps_us, rolling_tps, window_s=4, count=2)
+        self.assertEqual(4, peaks[0])
+        # Windows ending at block 3 and 5 overlap the peak window
+        self.assertNotIn(3, peaks)
+        self.assertNotIn(5, peaks)
+
+    def test_compute_interval_stats(self):
+        stats = compute_interval_stats(self.timestamps_us)
+        self.assertEqual(2.0, stats['min'])
+        self.assertEqual(2.0, stats['p99'])
+        self.assertEqual({}, compute_interval_stats(self.timestamps_us[:1]))
+
+    def test_aggregate_by_period(self):
+        timestamps_us = np.array([0, 1800, 3599, 3600, 7300], dtype=np.int64) * 10 ** 6
+        tx_counts = np.array([1, 2, 3, 4, 5], dtype=np.int64)
+
+        rows = aggregate_by_period(timestamps_us, tx_counts, 3600)
+        self.assertEqual([3, 1, 1], [row['blocks'] for row in rows])
+        self.assertEqual([6, 4, 5], [row['txs'] for row in rows])
+        self.assertEqual([3, 4, 5], [row['max_block_txs'] for row in rows])
+        self.assertEqual('1970-01-01T01:00:00+00:00', rows[1]['start'])
+
+    def test_analyze(self):
+        heights = np.arange(100, 110, dtype=np.int64)
+        report = TPSAnalyzer.analyze(heights, self.timestamps_us, self.tx_counts, window_s=4, peak_count=1)
+
+        self.assertEqual(10, report['blocks'])
+        self.assertEqual(28, report['transactions'])
+        self.assertEqual(28 / 18, report['tps'])
+        self.assertEqual(104, report['peak_windows'][0]['end_height'])
+        self.assertEqual(1, len(report['hour']))
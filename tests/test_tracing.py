@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ICON Foundation Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+import tempfile
+import threading
+import unittest
+
+from icondbtools import tracing
+
+
+@tracing.traced('add', tracing.CATEGORY_COMPUTE)
+def add(a: int, b: int) -> int:
+    return a + b
+
+
+class TestTracing(unittest.TestCase):
+    def tearDown(self):
+        tracing.disable()
+        tracing.reset()
+
+    def test_disabled(self):
+        self.assertFalse(tracing.is_enabled())
+
+        with tracing.span('noop', tracing.CATEGORY_IO, height=1) as span:
+            span.set('count', 1)
+        self.assertEqual(3, add(1, 2))
+
+        self.assertEqual([], tracing.get_events())
+
+    def test_span_measures_when_disabled(self):
+        with tracing.Span('command') as span:
+            pass
+
+        self.assertGreaterEqual(span.duration_s, 0)
+        self.assertEqual([], tracing.get_events())
+
+    def test_nested_spans(self):
+        tracing.enable()
+
+        with tracing.span('outer', tracing.CATEGORY_COMMAND):
+            with tracing.span('inner', tracing.CATEGORY_IO, height=7) as span:
+                span.set('count', 2)
+            self.assertEqual(3, add(1, 2))
+
+        events = tracing.get_events()
+        self.assertEqual(['outer', 'inner', 'add'], [event[2] for event in events])
+
+        outer, inner, traced = events
+        for event in (inner, traced):
+            # A child starts and ends within its parent
+            self.assertGreaterEqual(event[4], outer[4])
+            self.assertLessEqual(event[4] + event[5], outer[4] + outer[5])
+        self.assertEqual({'height': 7, 'count': 2}, inner[6])
+        self.assertEqual(tracing.CATEGORY_COMPUTE, traced[3])
+
+    def test_exception(self):
+        tracing.enable()
+
+        with self.assertRaises(ValueError):
+            with tracing.span('fail'):
+                raise ValueError()
+
+        self.assertEqual(['fail'], [event[2] for event in tracing.get_events()])
+
+    def test_enable_discards_previous_spans(self):
+        tracing.enable()
+        add(1, 2)
+        tracing.enable()
+
+        self.assertEqual([], tracing.get_events())
+
+    def test_threads(self):
+        tracing.enable()
+
+        def work():
+            for _ in range(100):
+                add(1, 2)
+
+        threads = [threading.Thread(target=work, name=f'worker-{i}') for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        events = tracing.get_events()
+        self.assertEqual(400, len(events))
+        self.assertEqual({f'worker-{i}' for i in range(4)}, {event[1] for event in events})
+        self.assertEqual(4, len({event[0] for event in events}))
+
+    def test_write_chrome_trace(self):
+        tracing.enable()
+        with tracing.span('outer', tracing.CATEGORY_COMMAND):
+            add(1, 2)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'trace.json')
+            self.assertEqual(2, tracing.write_chrome_trace(path))
+
+            with open(path, 'rt') as f:
+                trace = json.load(f)
+
+        events = [event for event in trace['traceEvents'] if event['ph'] == 'X']
+        self.assertEqual(['outer', 'add'], [event['name'] for event in events])
+        self.assertEqual(['command', 'compute'], [event['cat'] for event in events])
+        for event in events:
+            self.assertGreaterEqual(event['ts'], 0)
+            self.assertGreaterEqual(event['dur'], 0)
+            self.assertEqual(os.getpid(), event['pid'])
+
+        thread_names = [event for event in trace['traceEvents'] if event['name'] == 'thread_name']
+        self.assertEqual([threading.current_thread().name], [event['args']['name'] for event in thread_names])
+        self.assertEqual(events[0]['tid'], thread_names[0]['tid'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 ICON Foundation Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+import tempfile
+import unittest
+
+from icondbtools.write_profiler import SpaceSaving, WriteProfiler
+
+
+class TestSpaceSaving(unittest.TestCase):
+    def test_exact_within_capacity(self):
+        sketch = SpaceSaving(4)
+        for item, weight in ((b'a', 5), (b'b', 3), (b'c', 1), (b'a', 2)):
+            sketch.add(item, weight)
+
+        self.assertEqual([(b'a', 7, 0), (b'b', 3, 0)], sketch.get_top(2))
+
+    def test_replace_min(self):
+        sketch = SpaceSaving(2)
+        for _ in range(10):
+            sketch.add(b'hot')
+        sketch.add(b'x')
+        sketch.add(b'y')
+
+        self.assertEqual(2, len(sketch))
+        # b'y' replaces b'x' and inherits its count as the error
+        self.assertEqual([(b'hot', 10, 0), (b'y', 2, 1)], sketch.get_top(2))
+
+    def test_bounded_heap(self):
+        sketch = SpaceSaving(8)
+        for i in range(1000):
+            sketch.add(i % 3)
+            sketch.add(1000 + i)
+
+        self.assertEqual(8, len(sketch))
+        self.assertLessEqual(len(sketch._heap), 8 * 4 + 1)
+        top = sketch.get_top(3)
+        self.assertEqual({0, 1, 2}, {item for item, _, _ in top})
+
+
+class TestWriteProfiler(unittest.TestCase):
+    def setUp(self):
+        score_address = b'\x01' + bytes.fromhex('63af7f2e073985a9e9965765e809f66da3b0f238')
+        self.label = 'cx63af7f2e073985a9e9965765e809f66da3b0f238'
+        self.balance_key = b'|'.join([score_address, b'\x01', b'balances', b'\x22' * 20])
+        self.supply_key = b'|'.join([score_address, b'\x02', b'total_supply'])
+        self.account_key = b'\x11' * 20
+
+    def test_add_block_batch(self):
+        profiler = WriteProfiler()
+        profiler.add_block_batch(1, {self.balance_key: b'\x01' * 4, self.account_key: b'\x02' * 8})
+        profiler.add_block_batch(2, {self.balance_key: None, self.supply_key: b'\x03'})
+
+        records = profiler.to_records()
+        self.assertEqual({'type': 'summary', 'blocks': 2, 'last_height': 2}, records[0])
+
+        groups = {record['group']: record for record in records if record['type'] == 'group'}
+        balances = groups[f'{self.label}|dict|balances']
+        self.assertEqual(1, balances['writes'])
+        self.assertEqual(1, balances['deletes'])
+        self.assertEqual(2, balances['blocks'])
+        self.assertEqual(len(self.balance_key) * 2 + 4, balances['bytes'])
+        self.assertEqual(1, groups['account']['writes'])
+        self.assertEqual(1, groups[f'{self.label}|var|total_supply']['blocks'])
+
+        hot_keys = [record for record in records if record['type'] == 'hot_key']
+        self.assertEqual(self.balance_key.hex(), hot_keys[0]['key'])
+        self.assertEqual(2, hot_keys[0]['writes'])
+
+    def test_report(self):
+        profiler = WriteProfiler(top_n=1)
+        profiler.add_block_batch(1, {self.balance_key: b'\x01', self.account_key: b'\x02'})
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'profile.ndjson')
+            profiler.report(path)
+            profiler.report(path)
+
+            with open(path) as f:
+                records = [json.loads(line) for line in f]
+
+        self.assertEqual(['summary', 'group', 'group', 'hot_key'], [record['type'] for record in records])
+
+
+if __name__ == '__main__':
+    unittest.main()